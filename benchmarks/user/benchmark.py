@@ -1,10 +1,13 @@
 from collections import OrderedDict
+import json
+import shlex
+import subprocess
 import sys
 
 import numpy as np
 import click
 import os
-from devito import clear_cache, configuration, warning, set_log_level
+from devito import clear_cache, configuration, info, warning, set_log_level
 from devito.mpi import MPI
 from devito.tools import as_tuple, sweep
 from examples.seismic.acoustic.acoustic_example import run as acoustic_run, acoustic_setup
@@ -44,10 +47,11 @@ def benchmark():
     Benchmarking script for seismic forward operators.
 
     \b
-    There are three main 'execution modes':
+    There are four main 'execution modes':
     run: a single run with given DSE/DLE levels
     bench: complete benchmark with multiple DSE/DLE levels
     test: tests numerical correctness with different parameters
+    advise: find the fastest MPI+OpenMP layout on a single node
 
     Further, this script can generate a roofline plot from a benchmark
     """
@@ -257,6 +261,185 @@ def bench(problem, **kwargs):
     clear_cache()
 
 
+@benchmark.command(name='trial')
+@click.option('-o', '--output', required=True,
+              help='JSON file in which the measured performance is written')
+@click.option('-x', '--repeats', default=3,
+              help='Number of timed runs, following a warm-up run')
+@option_simulation
+@option_performance
+def cli_trial(problem, **kwargs):
+    """
+    A short, timed run, as performed by `advise` for each candidate layout.
+    """
+    configuration['develop-mode'] = False
+    set_log_level('ERROR')
+
+    trial(problem, **kwargs)
+
+
+def trial(problem, **kwargs):
+    """
+    A short, timed run, as performed by `advise` for each candidate layout.
+    The fastest of ``repeats`` runs is retained, the runtime of a run being
+    that of the slowest MPI rank.
+    """
+    setup = model_type[problem]['setup']
+    output = kwargs.pop('output')
+    repeats = kwargs.pop('repeats')
+
+    time_order = kwargs.pop('time_order')[0]
+    space_order = kwargs.pop('space_order')[0]
+    autotune = kwargs.pop('autotune')
+    if kwargs.pop('block_shape'):
+        warning("Ignoring `block-shape` in `trial` mode")
+
+    solver = setup(space_order=space_order, time_order=time_order, **kwargs)
+
+    # The warm-up run also takes care of JIT compilation and autotuning
+    solver.forward(autotune=autotune)
+
+    comm = solver.model.grid.distributor.comm if configuration['mpi'] else None
+
+    results = []
+    for _ in range(repeats):
+        _, _, summary = solver.forward()
+        try:
+            time = summary.globals['fdlike'].time
+        except KeyError:
+            time = sum(v.time for v in summary.values())
+        if comm is not None:
+            time = comm.allreduce(time, op=MPI.MAX)
+        results.append(time)
+
+    if comm is None or comm.rank == 0:
+        with open(output, 'w') as f:
+            json.dump({'time': min(results), 'times': results}, f)
+
+
+@benchmark.command(name='advise')
+@click.option('-r', '--resultsdir', default='results',
+              help='Directory in which the trial results are recorded')
+@click.option('-x', '--repeats', default=3,
+              help='Number of timed runs per trial')
+@click.option('-np', '--nprocs', type=int, multiple=True,
+              help='Number of MPI processes to try. Defaults to all divisors '
+                   'of the number of physical cores')
+@click.option('--mpi', multiple=True,
+              default=['basic', 'diag', 'overlap', 'overlap2', 'full'],
+              type=click.Choice([i for i in configuration._accepted['mpi']
+                                 if isinstance(i, str)]),
+              help='Devito MPI mode(s) to try')
+@click.option('--launcher', default='mpirun -n {np} --map-by ppr:{np}:node:pe={nt}',
+              help='Command launching `{np}` MPI processes, each bound to `{nt}` '
+                   'dedicated cores, e.g. `srun -n {np} -c {nt} --cpu-bind=cores`')
+@option_simulation
+@option_performance
+def cli_advise(problem, **kwargs):
+    """
+    Find the fastest MPI+OpenMP layout on a single node.
+    """
+    advise(problem, **kwargs)
+
+
+def advise(problem, **kwargs):
+    """
+    Find the fastest MPI+OpenMP layout on a single node.
+
+    A short `trial` is run for each combination of number of MPI processes,
+    number of OpenMP threads per process and MPI mode, such that all physical
+    cores of the node are used. The trial results are recorded in ``resultsdir``,
+    in JSON format, and the fastest layout is returned.
+    """
+    resultsdir = kwargs.pop('resultsdir')
+    repeats = kwargs.pop('repeats')
+    nprocs = kwargs.pop('nprocs')
+    modes = kwargs.pop('mpi')
+    launcher = kwargs.pop('launcher')
+
+    platform = configuration['platform']
+    ncores = platform.cores_physical
+
+    # Unless told otherwise, we try all layouts using all physical cores, but
+    # those in which an MPI process would span more than one NUMA node
+    if not nprocs:
+        nprocs = [i for i in range(1, ncores + 1) if ncores % i == 0 and
+                  (i == 1 or i % platform.numa_nodes == 0)]
+    layouts = []
+    for np_ in nprocs:
+        if np_ > ncores or ncores % np_ != 0:
+            warning("Skipping `%d` MPI processes, as they can't evenly share `%d` "
+                    "physical cores" % (np_, ncores))
+            continue
+        # A single MPI process doesn't need halo exchanges at all
+        for mode in (modes if np_ > 1 else [0]):
+            layouts.append((np_, ncores // np_, mode))
+
+    # The arguments shared by all trials
+    args = [sys.executable, os.path.abspath(__file__), 'trial', '-P', problem,
+            '-d'] + ['%d' % i for i in kwargs['shape']]
+    args += ['-s'] + ['%s' % i for i in kwargs['spacing']]
+    args += ['-n', '%d' % kwargs['nbpml'], '-t', '%s' % kwargs['tn'],
+             '-so', '%d' % kwargs['space_order'][0],
+             '-to', '%d' % kwargs['time_order'][0],
+             '--dse', kwargs['dse'], '--dle', kwargs['dle'],
+             '-a', kwargs['autotune'] or 'off', '-x', '%d' % repeats]
+
+    if not os.path.exists(resultsdir):
+        os.makedirs(resultsdir)
+    name = '%s_shape[%s]_so[%d]_to[%d]_arch[%s]' % (
+        problem, ','.join('%d' % i for i in kwargs['shape']),
+        kwargs['space_order'][0], kwargs['time_order'][0], kwargs['arch'])
+
+    results = []
+    for np_, nt, mode in layouts:
+        output = os.path.join(resultsdir, 'trial_%s_np[%d]_nt[%d]_mpi[%s].json'
+                              % (name, np_, nt, mode))
+
+        # Each MPI process must be bound to its own `nt` cores, and its OpenMP
+        # threads to one core each, or else the trial would measure oversubscription
+        env = dict(os.environ)
+        env.update({'DEVITO_MPI': str(mode), 'DEVITO_OPENMP': '1',
+                    'OMP_NUM_THREADS': str(nt), 'OMP_PLACES': 'cores',
+                    'OMP_PROC_BIND': 'close'})
+        if np_ > 1:
+            cmd = shlex.split(launcher.format(np=np_, nt=nt)) + args + ['-o', output]
+        else:
+            cmd = args + ['-o', output]
+
+        info("Trial: %d MPI process(es) x %d OpenMP thread(s), mpi=%s"
+             % (np_, nt, mode))
+        try:
+            subprocess.check_call(cmd, env=env)
+            with open(output, 'r') as f:
+                time = json.load(f)['time']
+            os.remove(output)
+        except (OSError, subprocess.CalledProcessError, ValueError, KeyError):
+            warning("Trial failed, skipping layout")
+            time = None
+        info("  >>> %s" % ("%.3f s" % time if time is not None else "n/a"))
+
+        results.append({'nprocs': np_, 'nthreads': nt, 'mpi': mode, 'time': time})
+
+    completed = [i for i in results if i['time'] is not None]
+    best = min(completed, key=lambda i: i['time']) if completed else None
+
+    filename = os.path.join(resultsdir, 'advise_%s.json' % name)
+    with open(filename, 'w') as f:
+        json.dump({'platform': str(platform), 'cores_physical': ncores,
+                   'sockets': platform.sockets, 'numa_nodes': platform.numa_nodes,
+                   'results': results, 'best': best}, f, indent=2)
+
+    if best is None:
+        warning("No trial completed successfully")
+    else:
+        info("Fastest layout, per node: %d MPI process(es) x %d OpenMP thread(s), "
+             "DEVITO_MPI=%s (%.3f s). Results recorded in `%s`"
+             % (best['nprocs'], best['nthreads'], best['mpi'], best['time'], filename))
+
+    return best
+
+
 @benchmark.command(name='plot')
 @click.option('--backend', default='core',
               type=click.Choice(configuration._accepted['backend']),
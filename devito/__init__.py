@@ -64,9 +64,14 @@ def _reinit_compiler(val):  # noqa
                                        mpi=configuration['mpi'])
     return bool(val) if isinstance(val, int) else val
 configuration.add('openmp', 0, [0, 1], callback=_reinit_compiler)  # noqa
-configuration.add('mpi', 0, [0, 1, 'basic', 'diag', 'overlap', 'overlap2', 'full'],
+configuration.add('mpi', 0, [0, 1, 'basic', 'diag', 'overlap', 'overlap2', 'full',
+                             'progress', 'persistent', 'deep'],
                   callback=_reinit_compiler)
 
+# Multiplier for the space_order-derived halo of Functions; deeper halos allow
+# the `deep` MPI mode to exchange them less frequently
+configuration.add('halo-depth', 1, [1, 2, 3, 4, 5, 6, 7, 8])
+
 # Autotuning setup
 at_levels = ['off', 'basic', 'aggressive', 'max']
 at_modes = ['preemptive', 'destructive', 'runtime']
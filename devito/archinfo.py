@@ -1,6 +1,7 @@
 """Collection of utilities to detect properties of the underlying architecture."""
 
 from subprocess import PIPE, Popen
+import os
 
 import numpy as np
 import cpuinfo
@@ -88,6 +89,47 @@ def get_cpu_info():
                 physical = 1
     cpu_info['physical'] = physical
 
+    # Detect number of sockets and NUMA nodes
+    sockets = len(mapper)
+    if not sockets:
+        try:
+            sockets = lscpu()['Socket(s)']
+        except KeyError:
+            sockets = 1
+    cpu_info['sockets'] = sockets
+    try:
+        numa_nodes = len([i for i in os.listdir(os.path.join('/sys', 'devices', 'system',
+                                                             'node'))
+                          if i.startswith('node') and i[4:].isdigit()])
+    except OSError:
+        # Not on Linux; assume one NUMA node per socket
+        numa_nodes = lscpu().get('NUMA node(s)', sockets)
+    cpu_info['numa_nodes'] = numa_nodes or sockets
+
+    # Detect the size of the data caches, in bytes, as a mapper from cache level
+    # to the size of a single cache instance
+    cpu_info['caches'] = {}
+    path = os.path.join('/sys', 'devices', 'system', 'cpu', 'cpu0', 'cache')
+
+    def read(index, key):
+        with open(os.path.join(path, index, key), 'r') as f:
+            return f.read().strip()
+
+    try:
+        for i in sorted(os.listdir(path)):
+            if not i.startswith('index') or read(i, 'type') == 'Instruction':
+                continue
+            size = read(i, 'size')
+            units = {'K': 2**10, 'M': 2**20, 'G': 2**30}
+            if size[-1] in units:
+                size = int(size[:-1])*units[size[-1]]
+            else:
+                size = int(size)
+            cpu_info['caches'][int(read(i, 'level'))] = size
+    except (OSError, ValueError):
+        # Not on Linux, or unexpected sysfs format
+        pass
+
     return cpu_info
 
 
@@ -157,6 +199,9 @@ class Platform(object):
         self.cores_logical = kwargs.get('cores_logical', cpu_info['logical'])
         self.cores_physical = kwargs.get('cores_physical', cpu_info['physical'])
         self.isa = kwargs.get('isa', self._detect_isa())
+        self.caches = kwargs.get('caches', cpu_info['caches'])
+        self.sockets = kwargs.get('sockets', cpu_info['sockets'])
+        self.numa_nodes = kwargs.get('numa_nodes', cpu_info['numa_nodes'])
 
     def __call__(self):
         return self
@@ -179,6 +224,14 @@ class Platform(object):
         """Size in bytes of a SIMD register."""
         return isa_registry.get(self.isa, 0)
 
+    @property
+    def llc_size(self):
+        """Size in bytes of the last-level cache, or None if unknown."""
+        try:
+            return self.caches[max(self.caches)]
+        except ValueError:
+            return None
+
     def simd_items_per_reg(self, dtype):
         """Number of items of type ``dtype`` that can fit in a SIMD register."""
         assert self.simd_reg_size % np.dtype(dtype).itemsize == 0
@@ -221,6 +274,9 @@ class Device(Platform):
         self.cores_logical = cores_logical
         self.cores_physical = cores_physical
         self.isa = isa
+        self.caches = {}
+        self.sockets = 1
+        self.numa_nodes = 1
 
 
 # CPUs
@@ -6,8 +6,9 @@ from sympy import Abs, Pow
 import numpy as np
 
 import devito as dv
+from devito.parameters import configuration
 
-__all__ = ['assign', 'smooth', 'norm', 'sumall', 'inner', 'mmin', 'mmax']
+__all__ = ['assign', 'first_touch', 'smooth', 'norm', 'sumall', 'inner', 'mmin', 'mmax']
 
 
 def assign(f, v=0):
@@ -24,6 +25,38 @@ def assign(f, v=0):
     dv.Operator(dv.Eq(f, v), name='assign')()
 
 
+def first_touch(f, **kwargs):
+    """
+    Zero-initialize a Function in parallel, through an Operator whose loop
+    structure (blocking, collapse, OpenMP schedule) mirrors that of the
+    time-stepping Operators computing on the Function. On NUMA systems, under a
+    first-touch page placement policy, this makes each page land on the socket
+    of the thread that will later compute on it.
+
+    Parameters
+    ----------
+    f : Function
+        The Function to be initialized.
+    **kwargs
+        Runtime arguments, such as the block shape and ``nthreads``, of the
+        consuming Operator. Only those also accepted by the first-touch
+        Operator are used; the others are ignored.
+    """
+    # Time-stepping Operators always block their loop nests, so here we force
+    # blocking too, even in absence of a time loop (e.g., for Functions)
+    dle = configuration['dle-options'].copy()
+    dle['blockalways'] = True
+    op = dv.Operator(dv.Eq(f, 0), name='first_touch',
+                     dle=(configuration['dle'], dle))
+
+    args = {k: v for k, v in kwargs.items() if k in op._known_arguments}
+    if f.is_TimeFunction and f._time_buffering:
+        # Touch all of the buffer slots
+        args[f.time_dim.min_name] = 0
+        args[f.time_dim.max_name] = f._time_size - 1
+    op.apply(**args)
+
+
 def smooth(f, g, axis=None):
     """
     Smooth a Function through simple moving average.
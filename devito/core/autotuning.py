@@ -97,6 +97,8 @@ def autotune(operator, args, level, mode):
             tunable = []
             tunable.append(generate_block_shapes(blockable, args, level))
             tunable.append(generate_nthreads(operator.nthreads, args, level))
+            tunable.append(generate_halo_periods(operator.halo_period, args, mode,
+                                                 timesteps))
             tunable = list(product(*tunable))
         except ValueError:
             # Some arguments are cumpolsory, otherwise autotuning is skipped
@@ -105,13 +107,13 @@ def autotune(operator, args, level, mode):
         # Symbolic number of loop-blocking blocks per thread
         nblocks_per_thread = calculate_nblocks(tree, blockable) / operator.nthreads
 
-        for bs, nt in tunable:
+        for bs, nt, hp in tunable:
             # Can we safely autotune over the given time range?
             if not check_time_bounds(stepper, at_args, args, mode):
                 break
 
             # Update `at_args` to use the new tunable arguments
-            run = [(k, v) for k, v in bs + nt if k in at_args]
+            run = [(k, v) for k, v in bs + nt + hp if k in at_args]
             at_args.update(dict(run))
 
             # Drop run if not at least one block per thread
@@ -133,7 +135,7 @@ def autotune(operator, args, level, mode):
             operator.cfunction(*list(at_args.values()))
             elapsed = operator._profiler.timer.total
 
-            timings.setdefault(nt, OrderedDict()).setdefault(n, {})[bs] = elapsed
+            timings.setdefault(nt + hp, OrderedDict()).setdefault(n, {})[bs] = elapsed
             log("run <%s> took %f (s) in %d timesteps" %
                 (','.join('%s=%s' % i for i in run), elapsed, timesteps))
 
@@ -161,6 +163,13 @@ def autotune(operator, args, level, mode):
         warning("couldn't perform any runs")
         return args, {}
 
+    # All MPI ranks must agree on the halo period, otherwise they'd deadlock
+    halo_period = operator.halo_period
+    if halo_period is not None and halo_period.name in best:
+        comm = [i.grid.distributor.comm for i in operator.input
+                if i.is_DiscreteFunction and i.grid is not None].pop()
+        best[halo_period.name] = comm.bcast(best[halo_period.name], root=0)
+
     # Update the argument list with the tuned arguments
     args.update(best)
 
@@ -357,6 +366,19 @@ def generate_nthreads(nthreads, args, level):
     return filter_ordered(ret)
 
 
+def generate_halo_periods(halo_period, args, mode, timesteps):
+    # The halo exchanges are disabled in non-runtime modes, which would make
+    # the longest period always win
+    if halo_period is None or mode != 'runtime':
+        return [((None, 1),)]
+
+    ret = [((halo_period.name, args[halo_period.name]),)]
+    ret.extend([((halo_period.name, i),)
+                for i in range(1, min(halo_period.max_value, timesteps) + 1)])
+
+    return filter_ordered(ret)
+
+
 options = {
     'squeezer': 4,
     'blocksize-l0': (8, 16, 24, 32, 64, 96, 128),
@@ -1,6 +1,7 @@
 from devito.core.autotuning import autotune
 from devito.dle import NThreads
 from devito.ir.support import align_accesses
+from devito.mpi.routines import HaloPeriod
 from devito.parameters import configuration
 from devito.operator import Operator
 
@@ -46,3 +47,12 @@ class OperatorCore(Operator):
         else:
             assert len(nthreads) == 1
             return nthreads.pop()
+
+    @property
+    def halo_period(self):
+        halo_period = [i for i in self.input if isinstance(i, HaloPeriod)]
+        if len(halo_period) == 0:
+            return None
+        else:
+            assert len(halo_period) == 1
+            return halo_period.pop()
@@ -1,8 +1,10 @@
 import abc
+import atexit
 from functools import reduce
 from operator import mul
 import mmap
 import os
+import tempfile
 
 import numpy as np
 import ctypes
@@ -13,8 +15,10 @@ from devito.parameters import configuration
 from devito.tools import dtype_to_ctype
 
 __all__ = ['ALLOC_FLAT', 'ALLOC_NUMA_LOCAL', 'ALLOC_NUMA_ANY',
-           'ALLOC_KNL_MCDRAM', 'ALLOC_KNL_DRAM', 'ALLOC_GUARD',
-           'default_allocator']
+           'ALLOC_KNL_MCDRAM', 'ALLOC_KNL_DRAM', 'ALLOC_GUARD', 'ALLOC_ANON',
+           'ALLOC_MMAP', 'ALLOC_HUGE', 'ALLOC_HUGE_NUMA_LOCAL', 'ALLOC_SHM',
+           'MmapAllocator', 'PoolAllocator', 'ExternalAllocator',
+           'SharedMemoryAllocator', 'default_allocator']
 
 
 class MemoryAllocator(object):
@@ -26,6 +30,9 @@ class MemoryAllocator(object):
     is_Posix = False
     is_Numa = False
 
+    is_zeroed = False
+    """True if the allocated memory is guaranteed to be zero-initialized."""
+
     _attempted_init = False
     lib = None
 
@@ -101,6 +108,24 @@ class MemoryAllocator(object):
         """
         return
 
+    def _attach(self, memfree_args):
+        """
+        A MemoryAllocator through which another process can access the memory
+        described by ``memfree_args``, or None if the memory isn't shareable.
+        """
+        return None
+
+    def _is_zeroed(self, memfree_args):
+        """True if the memory described by ``memfree_args`` is zero-initialized."""
+        return self.is_zeroed
+
+    def _is_initialized(self, memfree_args):
+        """
+        True if the memory described by ``memfree_args`` already carries meaningful
+        values, hence it must be neither first-touched nor zero-initialized.
+        """
+        return False
+
     @abc.abstractmethod
     def free(self, *args):
         """
@@ -219,6 +244,146 @@ class GuardAllocator(PosixAllocator):
         self.lib.free(c_pointer)
 
 
+class AnonymousAllocator(MemoryAllocator):
+
+    """
+    Memory allocator based on anonymous memory mappings. The allocated memory
+    is aligned to page boundaries and is zero-initialized. Physical pages are
+    only assigned (and zeroed) by the operating system upon the first touch,
+    so no time is spent initializing the memory at allocation time; this also
+    implies that, as long as the first touch occurs in a parallel loop, the
+    pages are placed on the NUMA node of the thread using them.
+    """
+
+    is_zeroed = True
+
+    @classmethod
+    def initialize(cls):
+        handle = find_library('c')
+        if handle is None:
+            return
+        lib = ctypes.CDLL(handle)
+        # Required because mmap returns a pointer
+        lib.mmap.restype = ctypes.c_void_p
+        lib.mmap.argtypes = [ctypes.c_void_p, ctypes.c_size_t, ctypes.c_int,
+                             ctypes.c_int, ctypes.c_int, ctypes.c_long]
+        lib.munmap.argtypes = [ctypes.c_void_p, ctypes.c_size_t]
+        lib.madvise.argtypes = [ctypes.c_void_p, ctypes.c_size_t, ctypes.c_int]
+        cls.lib = lib
+
+    def _mmap(self, nbytes, flags=mmap.MAP_PRIVATE | mmap.MAP_ANONYMOUS, fd=-1):
+        c_pointer = self.lib.mmap(None, nbytes, mmap.PROT_READ | mmap.PROT_WRITE,
+                                  flags, fd, 0)
+        # Note: MAP_FAILED is `(void *) -1`
+        if c_pointer is None or c_pointer == ctypes.c_void_p(-1).value:
+            return None
+        return c_pointer
+
+    def _alloc_C_libcall(self, size, ctype):
+        if not self.available():
+            raise RuntimeError("Couldn't find `libc`'s `mmap` to allocate memory")
+
+        # Work around the fact that `mmap` fails when the size is 0
+        nbytes = max(size * ctypes.sizeof(ctype), 1)
+
+        c_pointer = self._mmap(nbytes)
+        if c_pointer is None:
+            return None, None
+        c_pointer = ctypes.c_void_p(c_pointer)
+
+        return c_pointer, (c_pointer, nbytes)
+
+    def free(self, c_pointer, nbytes):
+        self.lib.munmap(c_pointer, nbytes)
+
+
+class HugePageAllocator(AnonymousAllocator):
+
+    """
+    Memory allocator based on anonymous memory mappings. The allocated memory
+    is zero-initialized and aligned to huge page boundaries (2 MB), and the
+    kernel is asked to back it with transparent huge pages via ``madvise``,
+    thus reducing the TLB misses when sweeping over large arrays. Through the
+    argument ``node`` it is possible to specify a NUMA placement policy, as in
+    NumaAllocator.
+
+    Parameters
+    ----------
+    node : int or str, optional
+        If an integer, it indicates a specific NUMA node. If ``local``, memory
+        is placed on the NUMA node of the thread touching it first. Defaults to
+        None, that is, the system's default policy is used.
+    """
+
+    hugepage_size = 2*1024*1024
+    """Size of a transparent huge page, in bytes."""
+
+    threshold = 64*1024*1024
+    """
+    Used by ``default_allocator`` to pick a HugePageAllocator for allocations of
+    at least this many bytes. Below it, the memory wasted to round up the
+    allocation to a multiple of ``hugepage_size`` isn't worth it.
+    """
+
+    # Not inherited from AnonymousAllocator, as the availability of transparent
+    # huge pages must be checked regardless of whether `mmap` was already found
+    _attempted_init = False
+    lib = None
+
+    @classmethod
+    def initialize(cls):
+        path = os.path.join('/sys', 'kernel', 'mm', 'transparent_hugepage', 'enabled')
+        try:
+            with open(path, 'r') as f:
+                if '[never]' in f.read():
+                    return
+        except IOError:
+            # Not on Linux or transparent huge pages not supported
+            return
+        super(HugePageAllocator, cls).initialize()
+
+    def __init__(self, node=None):
+        super(HugePageAllocator, self).__init__()
+        self._node = node
+
+    def _alloc_C_libcall(self, size, ctype):
+        if not self.available():
+            raise RuntimeError("Couldn't find `libc`'s `mmap` or support for "
+                               "transparent huge pages to allocate memory")
+
+        # Round up to a multiple of the huge page size, as a partially used
+        # huge page could not be given back to the system anyway
+        nbytes = max(size * ctypes.sizeof(ctype), 1)
+        nbytes = -(-nbytes // self.hugepage_size) * self.hugepage_size
+
+        # Over-allocate by one huge page, then trim the mapping so that it
+        # starts at a huge page boundary
+        base = self._mmap(nbytes + self.hugepage_size)
+        if base is None:
+            return None, None
+        start = -(-base // self.hugepage_size) * self.hugepage_size
+        if start > base:
+            self.lib.munmap(base, start - base)
+        self.lib.munmap(start + nbytes, base + self.hugepage_size - start)
+        c_pointer = ctypes.c_void_p(start)
+
+        # If these fail, don't worry about failing the entire allocation
+        if self.lib.madvise(c_pointer, nbytes, getattr(mmap, 'MADV_HUGEPAGE', 14)):
+            logger.warning("couldn't madvise memory")
+        if self._node is not None and NumaAllocator.available():
+            c_bytesize = ctypes.c_size_t(nbytes)
+            if isinstance(self._node, int):
+                NumaAllocator.lib.numa_tonode_memory(c_pointer, c_bytesize, self._node)
+            elif self._node == 'local':
+                NumaAllocator.lib.numa_setlocal_memory(c_pointer, c_bytesize)
+
+        return c_pointer, (c_pointer, nbytes)
+
+    @property
+    def node(self):
+        return self._node
+
+
 class NumaAllocator(MemoryAllocator):
 
     """
@@ -237,6 +402,9 @@ class NumaAllocator(MemoryAllocator):
 
     is_Numa = True
 
+    # The `numa_alloc_*` functions are based on anonymous memory mappings
+    is_zeroed = True
+
     @classmethod
     def initialize(cls):
         handle = find_library('numa')
@@ -306,12 +474,366 @@ class NumaAllocator(MemoryAllocator):
         return self._node == 'local'
 
 
+class MmapAllocator(AnonymousAllocator):
+
+    """
+    Memory allocator based on a shared memory mapping of a (sparse) file. The
+    allocated memory is aligned to page boundaries, and it is paged out to the
+    file by the operating system when the physical memory runs short. This is
+    useful for data that largely exceeds the available memory, but which is
+    accessed only a little at a time, such as the wavefield snapshots of a
+    TimeFunction with ``save=nt``.
+
+    Parameters
+    ----------
+    path : str, optional
+        The directory in which the backing files are created. Ideally, this
+        should be on a fast, local device. Defaults to the system's temporary
+        directory.
+    advice : str, optional
+        The expected access pattern, passed to ``madvise``. Accepted values are
+        ``normal``, ``sequential``, ``random`` and ``willneed``. Defaults to
+        ``sequential``.
+
+    Notes
+    -----
+    The backing files are unlinked as soon as they are mapped, so they are
+    removed by the operating system once the memory is freed, or if the
+    process terminates abruptly.
+    """
+
+    _advices = {'normal': 0, 'random': 1, 'sequential': 2, 'willneed': 3}
+
+    def __init__(self, path=None, advice='sequential'):
+        super(MmapAllocator, self).__init__()
+        if advice not in self._advices:
+            raise ValueError("Unknown advice `%s`; accepted values are %s"
+                             % (advice, list(self._advices)))
+        self.path = path
+        self.advice = advice
+
+    def _alloc_C_libcall(self, size, ctype):
+        if not self.available():
+            raise RuntimeError("Couldn't find `libc`'s `mmap` to allocate memory")
+
+        # Work around the fact that `mmap` fails when the size is 0
+        nbytes = max(size * ctypes.sizeof(ctype), 1)
+
+        fd, filename = tempfile.mkstemp(prefix='devito-mmap-', dir=self.path)
+        try:
+            # Extend the file without writing to it, so that the file is
+            # sparse and reads as zeros
+            os.ftruncate(fd, nbytes)
+            c_pointer = self._mmap(nbytes, mmap.MAP_SHARED, fd)
+        finally:
+            os.close(fd)
+            os.unlink(filename)
+        if c_pointer is None:
+            return None, None
+        c_pointer = ctypes.c_void_p(c_pointer)
+
+        # If this fails, don't worry about failing the entire allocation
+        if self.lib.madvise(c_pointer, nbytes, self._advices[self.advice]):
+            logger.warning("couldn't madvise memory")
+
+        return c_pointer, (c_pointer, nbytes)
+
+
+class SharedMemoryAllocator(AnonymousAllocator):
+
+    """
+    Memory allocator based on POSIX shared memory. Each allocation is backed by
+    a named segment, i.e. a file in a memory-backed filesystem, which other
+    processes on the same node can map as well. A DiscreteFunction whose data
+    lives in shared memory is pickled by reference, that is only the name of
+    the segment is sent, so that, for example, the model parameters may be
+    shared by all the workers of a process pool rather than copied into each
+    of them.
+
+    Parameters
+    ----------
+    path : str, optional
+        The directory in which the segments are created. Defaults to ``/dev/shm``.
+    segment : str, optional
+        The name of an existing segment. If provided, the allocator maps it
+        rather than creating a new one. This is how unpickled DiscreteFunctions
+        attach to the data of the original ones.
+
+    Notes
+    -----
+    A segment is removed when the data of the process that created it is freed.
+    Processes that attached to it before that retain access to the data, while
+    those attaching afterwards fail. All processes see each other's writes, so
+    shared data should be treated as read-only. The memory of a process
+    attaching to a segment is never initialized, as it belongs to its creator.
+
+    Processes terminating abruptly, such as the workers of a process pool, leave
+    their segments behind. These may be removed through ``cleanup``.
+    """
+
+    _owned = {}
+    """The segments created by this process, removed at exit if still alive."""
+
+    _prefix = 'devito-shm-'
+
+    def __init__(self, path='/dev/shm', segment=None):
+        super(SharedMemoryAllocator, self).__init__()
+        self.path = path
+        self.segment = segment
+
+    @classmethod
+    def _cleanup(cls):
+        # Forked children inherit `_owned`, but the segments aren't theirs
+        for filename, pid in list(cls._owned.items()):
+            if pid == os.getpid() and os.path.exists(filename):
+                os.unlink(filename)
+        cls._owned.clear()
+
+    @classmethod
+    def cleanup(cls, path='/dev/shm'):
+        """
+        Remove the segments in ``path`` created by this process, as well as those
+        left behind by processes that no longer exist. The processes mapping any
+        of these segments retain access to the data.
+        """
+        for i in os.listdir(path):
+            if not i.startswith(cls._prefix):
+                continue
+            try:
+                pid = int(i[len(cls._prefix):].split('-')[0])
+            except ValueError:
+                continue
+            if pid != os.getpid():
+                try:
+                    os.kill(pid, 0)
+                    continue
+                except ProcessLookupError:
+                    # The creator process is gone
+                    pass
+                except PermissionError:
+                    # The creator process exists, but it isn't ours
+                    continue
+            filename = os.path.join(path, i)
+            cls._owned.pop(filename, None)
+            try:
+                os.unlink(filename)
+            except FileNotFoundError:
+                pass
+
+    @classmethod
+    def available(cls):
+        return super(SharedMemoryAllocator, cls).available() and \
+            os.path.isdir('/dev/shm')
+
+    def _alloc_C_libcall(self, size, ctype):
+        if not self.available():
+            raise RuntimeError("Couldn't find `libc`'s `mmap` to allocate memory")
+
+        # Work around the fact that `mmap` fails when the size is 0
+        nbytes = max(size * ctypes.sizeof(ctype), 1)
+
+        if self.segment is None:
+            # The creator's pid is encoded in the name, for `cleanup`
+            fd, filename = tempfile.mkstemp(prefix='%s%d-' % (self._prefix, os.getpid()),
+                                            dir=self.path)
+            os.ftruncate(fd, nbytes)
+            owner = True
+        else:
+            filename = os.path.join(self.path, self.segment)
+            fd = os.open(filename, os.O_RDWR)
+            segment_nbytes = os.fstat(fd).st_size
+            if segment_nbytes != nbytes:
+                os.close(fd)
+                raise ValueError("Shared memory segment `%s` has size %d, but %d "
+                                 "bytes are required"
+                                 % (self.segment, segment_nbytes, nbytes))
+            owner = False
+        try:
+            c_pointer = self._mmap(nbytes, mmap.MAP_SHARED, fd)
+        finally:
+            os.close(fd)
+        if c_pointer is None:
+            if owner:
+                os.unlink(filename)
+            return None, None
+        c_pointer = ctypes.c_void_p(c_pointer)
+        if owner:
+            self._owned[filename] = os.getpid()
+
+        return c_pointer, (c_pointer, nbytes, filename, owner)
+
+    def _is_initialized(self, memfree_args):
+        # An attached segment carries the data of its creator
+        owner = memfree_args[-1]
+        return not owner
+
+    def free(self, c_pointer, nbytes, filename, owner):
+        self.lib.munmap(c_pointer, nbytes)
+        if owner and self._owned.pop(filename, None) == os.getpid():
+            try:
+                os.unlink(filename)
+            except FileNotFoundError:
+                # Already removed, e.g. through `cleanup`
+                pass
+
+    def _attach(self, memfree_args):
+        _, _, filename, _ = memfree_args
+        path, segment = os.path.split(filename)
+        return SharedMemoryAllocator(path, segment)
+
+
+class PoolAllocator(MemoryAllocator):
+
+    """
+    Memory allocator recycling freed memory. Rather than being released, the
+    freed buffers are kept in a pool, up to a given budget, and handed back to
+    subsequent requests of the same size. This avoids the allocation, and
+    the page faults following it, when objects of the same shape are created
+    and destroyed over and over again, e.g. the TimeFunctions of a multi-shot
+    loop.
+
+    Parameters
+    ----------
+    allocator : MemoryAllocator, optional
+        The MemoryAllocator performing the actual allocations. Defaults to
+        ``default_allocator()``.
+    budget : int, optional
+        The maximum number of bytes kept in the pool. Defaults to 1 GB.
+    zero : bool, optional
+        If True, recycled buffers are zero-initialized, as any new allocation.
+        If False, they retain their previous content, and neither first touch
+        nor zero-initialization take place; this is only safe if all of the
+        Functions using them are fully written before being read. Defaults
+        to True.
+
+    Notes
+    -----
+    The ``stats`` dictionary tracks the number of requests served from the
+    pool (``hits``), those requiring an actual allocation (``misses``) and
+    the buffers released since they didn't fit in the pool (``evictions``).
+    """
+
+    def __init__(self, allocator=None, budget=2**30, zero=True):
+        super(PoolAllocator, self).__init__()
+        self._allocator = allocator or default_allocator()
+        self.budget = budget
+        self.zero = zero
+
+        self._pool = {}
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    @property
+    def guaranteed_alignment(self):
+        return self._allocator.guaranteed_alignment
+
+    @classmethod
+    def available(cls):
+        return True
+
+    @property
+    def pooled(self):
+        """The number of bytes currently kept in the pool."""
+        return sum(k*len(v) for k, v in self._pool.items())
+
+    def _alloc_C_libcall(self, size, ctype):
+        nbytes = size * ctypes.sizeof(ctype)
+
+        try:
+            c_pointer, memfree_args = self._pool[nbytes].pop()
+            self.stats['hits'] += 1
+            recycled = True
+        except (KeyError, IndexError):
+            c_pointer, memfree_args = self._allocator._alloc_C_libcall(size, ctype)
+            if c_pointer is None:
+                return None, None
+            self.stats['misses'] += 1
+            recycled = False
+
+        return c_pointer, (nbytes, c_pointer, memfree_args, recycled)
+
+    def _is_zeroed(self, memfree_args):
+        _, _, memfree_args, recycled = memfree_args
+        return not recycled and self._allocator._is_zeroed(memfree_args)
+
+    def _is_initialized(self, memfree_args):
+        recycled = memfree_args[-1]
+        return recycled and not self.zero
+
+    def free(self, nbytes, c_pointer, memfree_args, recycled):
+        if self.pooled + nbytes <= self.budget:
+            self._pool.setdefault(nbytes, []).append((c_pointer, memfree_args))
+        else:
+            self._allocator.free(*memfree_args)
+            self.stats['evictions'] += 1
+
+    def clear(self):
+        """Release all of the buffers kept in the pool."""
+        for v in self._pool.values():
+            for _, memfree_args in v:
+                self._allocator.free(*memfree_args)
+        self._pool.clear()
+
+
+class ExternalAllocator(MemoryAllocator):
+
+    """
+    Memory "allocator" adopting a caller-owned buffer, which is used as-is, i.e.
+    without any copy. Devito neither initializes nor frees the buffer, so it
+    must outlive the objects using it.
+
+    Parameters
+    ----------
+    array : numpy.ndarray
+        The caller-owned buffer. It must be C-contiguous, aligned to
+        ``guaranteed_alignment`` bytes, and its shape and dtype must match those
+        of the allocation request, e.g. the ``shape_allocated`` of a Function,
+        which includes the halo and the padding.
+    """
+
+    def __init__(self, array):
+        super(ExternalAllocator, self).__init__()
+        if not isinstance(array, np.ndarray):
+            raise ValueError("Expected a numpy.ndarray, not %s" % type(array))
+        if not array.flags.c_contiguous:
+            raise ValueError("The external buffer must be C-contiguous")
+        if array.ctypes.data % self.guaranteed_alignment != 0:
+            raise ValueError("The external buffer must be aligned to %d bytes"
+                             % self.guaranteed_alignment)
+        self.array = array
+
+    @classmethod
+    def available(cls):
+        return True
+
+    def alloc(self, shape, dtype):
+        if self.array.shape != tuple(shape):
+            raise ValueError("The external buffer has shape %s, but %s is required"
+                             % (self.array.shape, tuple(shape)))
+        if self.array.dtype != dtype:
+            raise ValueError("The external buffer has dtype %s, but %s is required"
+                             % (self.array.dtype, np.dtype(dtype)))
+        return self.array, None
+
+    def _is_initialized(self, memfree_args):
+        # The buffer is initialized by the caller
+        return True
+
+    def free(self, *args):
+        return
+
+
 ALLOC_GUARD = GuardAllocator(1048576)
 ALLOC_FLAT = PosixAllocator()
 ALLOC_KNL_DRAM = NumaAllocator(0)
 ALLOC_KNL_MCDRAM = NumaAllocator(1)
 ALLOC_NUMA_ANY = NumaAllocator('any')
 ALLOC_NUMA_LOCAL = NumaAllocator('local')
+ALLOC_ANON = AnonymousAllocator()
+ALLOC_MMAP = MmapAllocator()
+ALLOC_HUGE = HugePageAllocator()
+ALLOC_HUGE_NUMA_LOCAL = HugePageAllocator('local')
+ALLOC_SHM = SharedMemoryAllocator()
+atexit.register(SharedMemoryAllocator._cleanup)
 
 
 def infer_knl_mode():
@@ -319,7 +841,7 @@ def infer_knl_mode():
     return 'flat' if os.path.exists(path) else 'cache'
 
 
-def default_allocator():
+def default_allocator(nbytes=None):
     """
     Return a suitable MemoryAllocator for the architecture on which the process
     is running. Possible allocators are: ::
@@ -334,23 +856,47 @@ def default_allocator():
         * ALLOC_KNL_MCDRAM: On a Knights Landing platform, allocate memory in MCDRAM.
                             Falls back to DRAM if there isn't enough space.
         * ALLOC_KNL_DRAM: On a Knights Landing platform, allocate memory in DRAM.
+        * ALLOC_ANON: Allocate zero-initialized memory through an anonymous
+                      memory mapping.
+        * ALLOC_HUGE: Align memory to huge page boundaries and back it with
+                      transparent huge pages.
+        * ALLOC_HUGE_NUMA_LOCAL: As ALLOC_HUGE, but the memory is placed in the
+                                 "closest" NUMA node.
+        * ALLOC_MMAP: Allocate memory through a shared memory mapping of a file.
+                      This is never chosen by default, but it may be provided
+                      to a Function via the ``allocator`` argument.
+        * ALLOC_SHM: Allocate memory in named POSIX shared memory segments, which
+                     other processes on the same node can map too. As ALLOC_MMAP,
+                     this is never chosen by default.
 
     The default allocator is chosen based on the following algorithm: ::
 
         * If running in DEVELOP mode (env var DEVITO_DEVELOP), return ALLOC_FLAT;
-        * If ``libnuma`` is not available on the system, return ALLOC_FLAT (though
-          it typically is available, at least on relatively recent Linux distributions);
         * If on a Knights Landing platform (codename ``knl``, see ``print_defaults()``)
-          return ALLOC_KNL_MCDRAM;
-        * If on a multi-socket Intel Xeon platform, return ALLOC_NUMA_LOCAL;
+          in flat mode, return ALLOC_KNL_MCDRAM;
+        * If ``nbytes`` is at least ``HugePageAllocator.threshold`` and transparent
+          huge pages are supported, return ALLOC_HUGE_NUMA_LOCAL if ``libnuma``
+          is available, ALLOC_HUGE otherwise;
+        * If ``libnuma`` is available, return ALLOC_NUMA_LOCAL;
         * In all other cases, return ALLOC_FLAT.
+
+    Parameters
+    ----------
+    nbytes : int, optional
+        The size of the allocation, in bytes.
     """
     if configuration['develop-mode']:
         return ALLOC_GUARD
-    elif NumaAllocator.available():
-        if configuration['platform'].name == 'knl' and infer_knl_mode() == 'flat':
-            return ALLOC_KNL_MCDRAM
+    elif NumaAllocator.available() and configuration['platform'].name == 'knl' and \
+            infer_knl_mode() == 'flat':
+        return ALLOC_KNL_MCDRAM
+    elif nbytes is not None and nbytes >= HugePageAllocator.threshold and \
+            HugePageAllocator.available():
+        if NumaAllocator.available():
+            return ALLOC_HUGE_NUMA_LOCAL
         else:
-            return ALLOC_NUMA_LOCAL
+            return ALLOC_HUGE
+    elif NumaAllocator.available():
+        return ALLOC_NUMA_LOCAL
     else:
         return ALLOC_FLAT
@@ -41,6 +41,12 @@ class Data(np.ndarray):
     Any view or copy created from ``self``, for instance via a slice operation
     or a universal function ("ufunc" in NumPy jargon), will still be of type
     Data.
+
+    Being a numpy.ndarray, Data exposes the buffer protocol and, with NumPy >= 1.22,
+    DLPack (``__dlpack__``). Hence it can be shared with other in-process
+    libraries without copies, e.g. via ``numpy.from_dlpack(f.data_with_halo)``.
+    Conversely, a caller-owned buffer may back a Function through an
+    ExternalAllocator. With MPI, only the rank-local data is exported.
     """
 
     def __new__(cls, shape, dtype, decomposition=None, modulo=None, allocator=ALLOC_FLAT,
@@ -179,42 +185,25 @@ class Data(np.ndarray):
             local_val = super(Data, self).__getitem__(data_idx)
 
             comm = self._distributor.comm
-            rank = comm.Get_rank()
 
-            owners, send, global_si, local_si = \
+            send_counts, send_perm, recv_counts, recv_perm = \
                 mpi_index_maps(loc_idx, local_val.shape, self._distributor.topology,
                                self._distributor.all_coords, comm)
 
+            # Pack the local data by destination rank, exchange it in one go, and
+            # finally unpack it into the result
+            sendbuf = np.ascontiguousarray(local_val.view(np.ndarray))
+            sendbuf = sendbuf.reshape(-1)[send_perm]
+            recvbuf = np.empty(recv_counts.sum(), dtype=local_val.dtype)
+            send_displs = np.concatenate([[0], np.cumsum(send_counts)[:-1]])
+            recv_displs = np.concatenate([[0], np.cumsum(recv_counts)[:-1]])
+            comm.Alltoallv([sendbuf, (send_counts, send_displs)],
+                           [recvbuf, (recv_counts, recv_displs)])
+
             retval = Data(local_val.shape, local_val.dtype.type,
                           decomposition=local_val._decomposition,
                           modulo=local_val._modulo)
-            it = np.nditer(owners, flags=['refs_ok', 'multi_index'])
-            # Iterate over each element of data
-            while not it.finished:
-                index = it.multi_index
-                if rank == owners[index] and rank == send[index]:
-                    # Current index and destination index are on the same rank
-                    loc_ind = local_si[index]
-                    send_ind = local_si[global_si[index]]
-                    retval.data[send_ind] = local_val.data[loc_ind]
-                elif rank == owners[index]:
-                    # Current index is on this rank and hence need to send
-                    # the data to the appropriate rank
-                    loc_ind = local_si[index]
-                    send_rank = send[index]
-                    send_ind = global_si[index]
-                    send_val = local_val.data[loc_ind]
-                    reqs = comm.isend([send_ind, send_val], dest=send_rank)
-                    reqs.wait()
-                elif rank == send[index]:
-                    # Current rank is required to receive data from this index
-                    recval = comm.irecv(source=owners[index])
-                    local_dat = recval.wait()
-                    loc_ind = local_si[local_dat[0]]
-                    retval.data[loc_ind] = local_dat[1]
-                else:
-                    pass
-                it.iternext()
+            retval.view(np.ndarray).reshape(-1)[recv_perm] = recvbuf
             return retval
         elif loc_idx is NONLOCAL:
             # Caller expects a scalar. However, `glb_idx` doesn't belong to
@@ -155,20 +155,26 @@ def loc_data_idx(loc_idx):
 
 def mpi_index_maps(loc_idx, shape, topology, coords, comm):
     """
-    Generate various data structures used to determine what MPI communication
-    is required. The function creates the following:
-
-    owners: An array of shape ``shape`` where each index signifies the rank on which
-    that data is stored.
-
-    send: An array of shape ``shape`` where each index signifies the rank to which
-    data beloning to that index should be sent.
-
-    global_si: An array of ``shape`` shape where each index contains the global index
-    to which that index should be sent.
-
-    local_si: An array of shape ``shape`` where each index contains the local index
-    (on the destination rank) to which that index should be sent.
+    Generate the bulk index maps describing the MPI communication required to
+    retrieve a distributed array indexed with negative steps, e.g. ``A[::-1]``,
+    which, unlike positive steps, moves data across ranks.
+
+    Each rank contributes its local portion of the indexed data, of shape
+    ``shape``. The global data is the concatenation of the local portions, laid
+    out as the ranks in ``topology``. The result has the same layout, and the
+    element at global position ``q`` is that at position ``T(q)`` in the
+    global data, with ``T`` reversing the Dimensions indexed with negative steps.
+
+    Returns
+    -------
+    send_counts, send_perm, recv_counts, recv_perm
+        ``send_perm`` packs the (flattened) local data into a buffer ordered
+        by destination rank, ``send_counts[r]`` being the number of items sent to
+        rank ``r``. ``recv_perm`` are the (flattened) positions in the result into
+        which the buffer received from all ranks, ordered by source rank, is
+        unpacked, ``recv_counts[r]`` being the number of items received from
+        rank ``r``. Within each rank's chunk, items are ordered by their position
+        on the sender.
 
     Examples
     --------
@@ -186,148 +192,70 @@ def mpi_index_maps(loc_idx, shape, topology, coords, comm):
     A = [[ 2, 3],
          [ 6, 7]],
 
-    on rank 2:
-
-    A = [[  8,  9],
-         [ 12, 13]],
-
-    on rank 3:
-
-    A = [[ 10, 11],
-         [ 14, 15]].
-
-    Taking the slice A[2:0:-1, 2:0:-1] the expected output (in serial) is
-
-    [[  0,  1,  2,  3],
-     [  4, 10,  9,  7],
-     [  8,  6,  5, 11],
-     [ 12, 13, 14, 15]],
-
-    Hence, in this case the following would be generated:
-
-    owners = [[0, 1],
-              [2, 3]],
-
-    send = [[3, 2],
-            [1, 0]],
+    and so on. Taking the slice A[::-1, ::-1], rank 0 sends its whole portion
+    to rank 3, hence ``send_counts = [0, 0, 0, 4]`` and ``send_perm = [0, 1, 2, 3]``,
+    while it receives the portion of rank 3, hence ``recv_counts = [0, 0, 0, 4]``
+    and ``recv_perm = [3, 2, 1, 0]``.
+    """
+    nprocs = comm.Get_size()
+    ndim = len(shape)
+
+    # The Dimensions indexed with negative steps get reversed
+    reverse = [isinstance(i, slice) and i.step is not None and i.step < 0
+               for i in as_tuple(loc_idx)]
+    assert len(reverse) == ndim
+
+    # The extent of the local portions along each Dimension. Empty portions, i.e.
+    # of ranks not holding any of the indexed data, do not contribute
+    shapes = comm.allgather(tuple(shape))
+    sizes = [np.zeros(i, dtype=np.int64) for i in topology]
+    for c, s in zip(coords, shapes):
+        if all(j > 0 for j in s):
+            for d in range(ndim):
+                sizes[d][c[d]] = s[d]
+    offsets = [np.concatenate([[0], np.cumsum(i)]) for i in sizes]
+
+    # Map topology coordinates to ranks
+    ranks = np.zeros(topology, dtype=np.int64)
+    for r, c in enumerate(coords):
+        ranks[c] = r
+
+    def maps(positions):
+        """
+        The rank owning, and the flattened local index of, the items at the
+        given global positions (one array per Dimension), after reversal.
+        """
+        owner = []
+        index = []
+        for d in range(ndim):
+            p = positions[d]
+            if reverse[d]:
+                p = offsets[d][-1] - 1 - p
+            c = np.searchsorted(offsets[d], p, side='right') - 1
+            owner.append(c)
+            index.append(p - offsets[d][c])
+        owner = np.ix_(*owner)
+        rank = ranks[owner]
+        flat = np.zeros(rank.shape, dtype=np.int64)
+        for d in range(ndim):
+            flat = flat*sizes[d][owner[d]] + np.ix_(*index)[d]
+        return rank.ravel(), flat.ravel()
+
+    # The global positions of the local portion of the data
+    mycoords = coords[comm.Get_rank()]
+    if all(j > 0 for j in shape):
+        positions = [offsets[d][mycoords[d]] + np.arange(shape[d]) for d in range(ndim)]
+    else:
+        positions = [np.arange(0) for d in range(ndim)]
 
-    global_si = [[(2, 2), (2, 1)],
-                 [(1, 2), (1, 1)]],
+    # As `T` is an involution, the same maps tell where to send each local item
+    # and where each item of the result comes from
+    rank, flat = maps(positions)
 
-    local_si = [[(0, 0), (0, 1)],
-                [(1, 0), (1, 1)]].
-    """
+    send_perm = np.argsort(rank, kind='stable')
+    send_counts = np.bincount(rank, minlength=nprocs)
 
-    nprocs = comm.Get_size()
+    recv_perm = np.lexsort((flat, rank))
+    recv_counts = send_counts
 
-    # Gather data structures from all ranks in order to produce the
-    # relevant mappings.
-    dat_len = np.zeros(topology, dtype=tuple)
-    for j in range(nprocs):
-        dat_len[coords[j]] = comm.bcast(shape, root=j)
-        if any(k == 0 for k in dat_len[coords[j]]):
-            dat_len[coords[j]] = as_tuple([0]*len(dat_len[coords[j]]))
-    # Work out the cumulative data shape
-    dat_len_cum = np.zeros(topology, dtype=tuple)
-    for i in range(nprocs):
-        my_coords = coords[i]
-        if i == 0:
-            dat_len_cum[my_coords] = dat_len[my_coords]
-            continue
-        left_neighbours = []
-        for j in range(len(my_coords)):
-            left_coord = list(my_coords)
-            left_coord[j] -= 1
-            left_neighbours.append(as_tuple(left_coord))
-        left_neighbours = as_tuple(left_neighbours)
-        n_dat = []  # Normalised data size
-        for j in range(len(my_coords)):
-            if left_neighbours[j][j] < 0:
-                c_dat = dat_len[my_coords][j]
-                n_dat.append(c_dat)
-            else:
-                c_dat = dat_len[my_coords][j]  # Current length
-                p_dat = dat_len[left_neighbours[j]][j]  # Previous length
-                n_dat.append(c_dat+p_dat)
-        dat_len_cum[my_coords] = as_tuple(n_dat)
-    # This 'transform' will be required to produce the required maps
-    transform = []
-    for i in as_tuple(loc_idx):
-        if isinstance(i, slice):
-            if i.step is not None:
-                transform.append(slice(None, None, np.sign(i.step)))
-            else:
-                transform.append(slice(None, None, None))
-        else:
-            transform.append(0)
-    transform = as_tuple(transform)
-
-    global_size = dat_len_cum[coords[-1]]
-
-    indices = np.zeros(global_size, dtype=tuple)
-    global_si = np.zeros(global_size, dtype=tuple)
-    it = np.nditer(indices, flags=['refs_ok', 'multi_index'])
-    while not it.finished:
-        index = it.multi_index
-        indices[index] = index
-        it.iternext()
-    global_si[:] = indices[transform]
-
-    # Create the 'rank' slices
-    rank_slice = []
-    for j in coords:
-        this_rank = []
-        for k in dat_len[j]:
-            this_rank.append(slice(0, k, 1))
-        rank_slice.append(this_rank)
-    # Normalize the slices:
-    n_rank_slice = []
-    for i in range(len(rank_slice)):
-        my_coords = coords[i]
-        if any([j.stop == j.start for j in rank_slice[i]]):
-            n_rank_slice.append(as_tuple([None]*len(rank_slice[i])))
-            continue
-        if i == 0:
-            n_rank_slice.append(as_tuple(rank_slice[i]))
-            continue
-        left_neighbours = []
-        for j in range(len(my_coords)):
-            left_coord = list(my_coords)
-            left_coord[j] -= 1
-            left_neighbours.append(as_tuple(left_coord))
-        left_neighbours = as_tuple(left_neighbours)
-        n_slice = []
-        for j in range(len(my_coords)):
-            if left_neighbours[j][j] < 0:
-                start = 0
-                stop = dat_len_cum[my_coords][j]
-            else:
-                start = dat_len_cum[left_neighbours[j]][j]
-                stop = dat_len_cum[my_coords][j]
-            n_slice.append(slice(start, stop, 1))
-        n_rank_slice.append(as_tuple(n_slice))
-    n_rank_slice = as_tuple(n_rank_slice)
-
-    # Now fill each elements owner:
-    owners = np.zeros(global_size, dtype=np.int32)
-    send = np.zeros(global_size, dtype=np.int32)
-    for i in range(len(n_rank_slice)):
-        if any([j is None for j in n_rank_slice[i]]):
-            continue
-        else:
-            owners[n_rank_slice[i]] = i
-    send[:] = owners[transform]
-
-    # Construct local_si
-    local_si = np.zeros(global_size, dtype=tuple)
-    it = np.nditer(local_si, flags=['refs_ok', 'multi_index'])
-    while not it.finished:
-        index = it.multi_index
-        owner = owners[index]
-        my_slice = n_rank_slice[owner]
-        rnorm_index = []
-        for j, k in zip(my_slice, index):
-            rnorm_index.append(k-j.start)
-        local_si[index] = as_tuple(rnorm_index)
-        it.iternext()
-    return owners, send, global_si, local_si
+    return send_counts, send_perm, recv_counts, recv_perm
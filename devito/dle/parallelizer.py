@@ -1,16 +1,21 @@
 from collections import OrderedDict
+from distutils import version
 import os
 
 import numpy as np
 import cgen as c
-from sympy import Function, Or
-
-from devito.ir import (Call, Conditional, Block, Expression, List, Prodder,
-                       FindSymbols, FindNodes, Return, COLLAPSED, Transformer,
-                       IsPerfectIteration, retrieve_iteration_tree, filter_iterations)
-from devito.symbolics import CondEq
+from sympy import Function, Gt, Lt, Not, Or
+
+from devito.compiler import CustomCompiler, GNUCompiler, IntelCompiler
+from devito.exceptions import InvalidArgument
+from devito.ir import (Call, Conditional, Block, DummyEq, Expression, HaloCopy,
+                       HaloOverlap, Increment, Iteration, List, LocalExpression, Node,
+                       Prodder, FindSymbols, FindNodes, Return, Section, TimedList,
+                       COLLAPSED, Scope, Transformer, IsPerfectIteration,
+                       retrieve_iteration_tree, filter_iterations)
+from devito.symbolics import CondEq, ccode
 from devito.parameters import configuration
-from devito.tools import is_integer, prod
+from devito.tools import as_tuple, filter_ordered, generator, is_integer, prod
 from devito.types import Constant, Symbol
 
 
@@ -22,6 +27,29 @@ def nhyperthreads():
     return configuration['platform'].threads_per_core
 
 
+def array_reductions():
+    """
+    True if the backend compiler supports reductions over array sections
+    (e.g., `reduction(+:n[0:1])`), introduced in OpenMP 4.5, False otherwise.
+    """
+    compiler = configuration['compiler']
+    if isinstance(compiler, IntelCompiler):
+        minver = version.StrictVersion("17.0.0")
+    elif isinstance(compiler, (GNUCompiler, CustomCompiler)):
+        # A CustomCompiler is a GNU compiler, unless told otherwise via `CC`
+        if 'icc' in os.path.basename(compiler.CC):
+            minver = version.StrictVersion("17.0.0")
+        else:
+            minver = version.StrictVersion("6.0.0")
+    else:
+        return True
+    try:
+        return compiler.version >= minver
+    except (TypeError, ValueError):
+        # Unknown version -- scalar reductions are always supported
+        return False
+
+
 class NThreads(Constant):
 
     @classmethod
@@ -33,6 +61,24 @@ class NThreads(Constant):
                                             value=NThreads.default_value())
 
 
+class NThreadsComm(Constant):
+
+    """
+    The number of threads reserved to drive the halo exchanges overlapped with
+    computation; the other threads perform the computation.
+    """
+
+    def __new__(cls, **kwargs):
+        return super(NThreadsComm, cls).__new__(cls, name=kwargs['name'],
+                                                dtype=np.int32, value=1)
+
+    def _arg_check(self, args, intervals):
+        super(NThreadsComm, self)._arg_check(args, intervals)
+        if args[self.name] < 1:
+            raise InvalidArgument("Illegal `%s=%d`: at least one thread must drive "
+                                  "the halo exchanges" % (self.name, args[self.name]))
+
+
 class ParallelRegion(Block):
 
     def __init__(self, body, nthreads, private=None):
@@ -50,6 +96,31 @@ class ParallelRegion(Block):
         return (self.nthreads,)
 
 
+class ThreadedTimedList(TimedList):
+
+    """
+    A TimedList within a parallel region. Each thread gets its own timers,
+    but only the master thread updates the Timer.
+    """
+
+    def __init__(self, timer, lname, body):
+        super(ThreadedTimedList, self).__init__(timer, lname, body)
+        self.footer = self.footer[:-1] + (c.Pragma('omp master'),) + self.footer[-1:]
+
+
+class StepGuard(Conditional):
+
+    """
+    Return if ``condition`` holds, which happens when the step increment of
+    a parallel Iteration is 0.
+    """
+
+    _traversable = []
+
+    def __init__(self, condition):
+        super(StepGuard, self).__init__(condition, Return())
+
+
 class SingleThreadProdder(Conditional, Prodder):
 
     _traversable = []
@@ -85,11 +156,16 @@ class Ompizer(object):
     lang = {
         'for-static': lambda i: c.Pragma('omp for collapse(%d) schedule(static)' % i),
         'for-static-1': lambda i: c.Pragma('omp for collapse(%d) schedule(static,1)' % i),
+        'for-static-nowait': lambda i: c.Pragma('omp for collapse(%d) schedule(static) '
+                                                'nowait' % i),
         'par-for': lambda i, j: c.Pragma('omp parallel for collapse(%d) '
                                          'schedule(static,1) num_threads(%d)' % (i, j)),
+        'par-region': lambda i: c.Pragma('omp parallel num_threads(%d)' % i),
         'simd-for': c.Pragma('omp simd'),
         'simd-for-aligned': lambda i, j: c.Pragma('omp simd aligned(%s:%d)' % (i, j)),
-        'atomic': c.Pragma('omp atomic update')
+        'atomic': c.Pragma('omp atomic update'),
+        'reduction': lambda i: 'reduction(+:%s)' % ','.join(i),
+        'nowait': 'nowait'
     }
     """
     Shortcuts for the OpenMP language.
@@ -107,16 +183,75 @@ class Ompizer(object):
         else:
             self.key = lambda i: i.is_ParallelRelaxed and not i.is_Vectorizable
         self.nthreads = NThreads(name='nthreads')
+        self.nthreads_comm = NThreadsComm(name='nthreads_comm')
+        # Unique names for the reduction accumulators, disjoint from the DSE's
+        self._gen_redkey = generator()
 
-    def _make_atomic_incs(self, partree):
+    def _make_reductions(self, partree):
         if not partree.is_ParallelAtomic:
-            return partree
-        # Introduce one `omp atomic` pragma for each increment
+            return [], partree, []
+
+        # Collect expressions inducing reductions
         exprs = FindNodes(Expression).visit(partree)
         exprs = [i for i in exprs if i.is_Increment and not i.is_ForeignExpression]
-        mapper = {i: List(header=self.lang['atomic'], body=i) for i in exprs}
+
+        # An increment whose target is invariant in all of the Iterations within
+        # `partree` (e.g., `n[0] += f[x][y]`) is a reduction, so it can be
+        # implemented through an OpenMP reduction clause (i.e., thread-private
+        # accumulators combined at the end). All other increments may still
+        # write to the same memory location from different threads, so they
+        # are made atomic
+        variants = {i.write for i in FindNodes(Expression).visit(partree)}
+        for i in FindNodes(Iteration).visit(partree):
+            variants.update(i.dim._defines)
+            variants.update(*[j._defines for j in i.uindices])
+        variants = {i.name for i in variants}
+        reductions = []
+        init = []
+        finalize = []
+        mapper = {}
+        for i in exprs:
+            indices = i.output.indices if i.is_tensor else ()
+            if i.is_tensor and not any(variants & {j.name for j in k.free_symbols}
+                                       for k in indices):
+                if array_reductions():
+                    sections = ''.join('[%s:1]' % ccode(j) for j in indices)
+                    reductions.append('%s%s' % (i.write.name, sections))
+                    continue
+                # Compilers predating OpenMP 4.5 only support scalar reductions,
+                # so we reduce into a scalar, which is then added to the target
+                # once the parallel region is over
+                #
+                # float red0 = 0;
+                # #pragma omp parallel
+                #   #pragma omp for reduction(+:red0)
+                #   for (...)
+                #     red0 += ...
+                # n[0] += red0;
+                r = Symbol(name='red%d' % self._gen_redkey(), dtype=i.dtype)
+                reductions.append(r.name)
+                init.append(LocalExpression(DummyEq(r, 0)))
+                finalize.append(Increment(DummyEq(i.output, r)))
+                mapper[i] = i._rebuild(expr=i.expr.xreplace({i.output: r}))
+            else:
+                mapper[i] = List(header=self.lang['atomic'], body=i)
         partree = Transformer(mapper).visit(partree)
-        return partree
+
+        if not reductions:
+            return init, partree, finalize
+
+        # Attach the reduction clause to all `omp for` pragmas, including those
+        # introduced by nested parallelism
+        clause = self.lang['reduction'](filter_ordered(reductions))
+        mapper = {}
+        for i in FindNodes(Iteration).visit(partree):
+            if i.ncollapsed:
+                pragmas = [c.Pragma('%s %s' % (j.value, clause))
+                           if j.value.startswith('omp') else j for j in i.pragmas]
+                mapper[i] = i._rebuild(pragmas=pragmas)
+        partree = Transformer(mapper, nested=True).visit(partree)
+
+        return init, partree, finalize
 
     def _make_atomic_prodders(self, partree):
         # Atomic-ize any single-thread Prodders in the parallel tree
@@ -192,7 +327,7 @@ class Ompizer(object):
         cond = [CondEq(i.step, 0) for i in collapsed if isinstance(i.step, Symbol)]
         cond = Or(*cond)
         if cond != False:  # noqa: `cond` may be a sympy.False which would be == False
-            partree = List(body=[Conditional(cond, Return()), partree])
+            partree = List(body=[StepGuard(cond), partree])
         return partree
 
     def _make_nested_partree(self, partree):
@@ -240,6 +375,136 @@ class Ompizer(object):
 
         return partree
 
+    def _is_independent(self, parregions, parregion):
+        exprs0 = [i.expr for i in FindNodes(Expression).visit(parregions)]
+        exprs1 = [i.expr for i in FindNodes(Expression).visit(parregion)]
+        scope = Scope(exprs0 + exprs1)
+
+        # Scalar temporaries written in both groups (e.g., the interpolation
+        # weights) are defined within the loop bodies, hence they are private
+        # to each thread and do not induce dependences
+        private = ({e.lhs for e in exprs0 if e.lhs.is_Symbol} &
+                   {e.lhs for e in exprs1 if e.lhs.is_Symbol})
+
+        # Any other dependence between the two groups of expressions, regardless
+        # of its distance, prevents the concurrent execution
+        n = len(exprs0)
+        for d in scope.d_all:
+            if (d.source.timestamp < n) == (d.sink.timestamp < n) or \
+                    d.function in private:
+                continue
+            # Different slots of a buffer (e.g., `u[t0][...]` and `u[t1][...]`,
+            # with t0 = time % 3 and t1 = (time + 1) % 3) never overlap
+            if any(self._is_disjoint_modulo(i, j) for i, j in zip(d.source, d.sink)):
+                continue
+            return False
+        return True
+
+    def _is_disjoint_modulo(self, i, j):
+        if not (getattr(i, 'is_Modulo', False) and getattr(j, 'is_Modulo', False)):
+            return False
+        if i.parent is not j.parent or i.modulo != j.modulo:
+            return False
+        offset = i.offset - j.offset
+        return is_integer(offset) and offset % i.modulo != 0
+
+    def _unwrap_parregion(self, node):
+        """
+        If ``node`` is a ParallelRegion, possibly guarded (see ``_make_guard``)
+        and timed (i.e., a profiled Section), return the ParallelRegion as well
+        as a callable rebuilding the guard and the timers around a given body.
+        Return None otherwise.
+        """
+        if isinstance(node, ParallelRegion):
+            return node, lambda body: body
+        elif isinstance(node, TimedList):
+            if len(node.body) != 1 or not isinstance(node.body[0], Section):
+                return None
+            section = node.body[0]
+            if len(section.body) != 1:
+                return None
+            unwrapped = self._unwrap_parregion(section.body[0])
+            if unwrapped is None:
+                return None
+            parregion, rebuild = unwrapped
+            return parregion, lambda body: ThreadedTimedList(
+                timer=node.timer, lname=node.name,
+                body=section._rebuild(body=rebuild(body))
+            )
+        elif type(node) is List and len(node.body) == 2:
+            guard, parregion = node.body
+            if not (isinstance(guard, StepGuard) and
+                    isinstance(parregion, ParallelRegion)):
+                return None
+            # Within a parallel region, the guard skips the loop rather than
+            # returning; all threads take the same branch, as required by the
+            # OpenMP worksharing constructs
+            return parregion, lambda body: Conditional(Not(guard.condition), body)
+        return None
+
+    def _make_concurrent(self, iet):
+        # Group adjacent and mutually independent parallel regions. E.g.:
+        #
+        # #pragma omp parallel      #pragma omp parallel
+        #   #pragma omp for           {
+        #   for (x = ...)               #pragma omp for nowait
+        #     ...                       for (x = ...)
+        # #pragma omp parallel    -->     ...
+        #   #pragma omp for             #pragma omp for
+        #   for (xi = ...)              for (xi = ...)
+        #     ...                         ...
+        #                             }
+        #
+        # Threads do not have to synchronize at the end of the first loop, and
+        # only one team of threads is activated. The parallel regions may also
+        # belong to different Sections (e.g., source injection followed by
+        # receiver interpolation), in which case the timers are moved inside
+        # the shared parallel region, or be guarded against 0-valued steps
+        #
+        # Parallel regions are first grouped within each Section, and then
+        # across Sections, hence we iterate until there is nothing left to group
+        while True:
+            mapper = {}
+            for n in FindNodes(Node).visit(iet):
+                for children in n.children:
+                    if not isinstance(children, tuple):
+                        continue
+
+                    groups = []
+                    for i in children:
+                        unwrapped = self._unwrap_parregion(i)
+                        if unwrapped is None or FindNodes(Call).visit(i):
+                            # Calls may have arbitrary side effects
+                            groups.append(None)
+                        elif groups and groups[-1] and \
+                                self._is_independent([j for j, _ in groups[-1]], i):
+                            groups[-1].append((i, unwrapped))
+                        else:
+                            groups.append([(i, unwrapped)])
+
+                    for group in [i for i in groups if i and len(i) > 1]:
+                        body = []
+                        for k, (_, (parregion, rebuild)) in enumerate(group, 1):
+                            partree = []
+                            for i in parregion.body:
+                                if k < len(group) and i.is_Iteration:
+                                    pragmas = [c.Pragma('%s %s' % (j.value,
+                                                                   self.lang['nowait']))
+                                               if j.value.startswith('omp for') else j
+                                               for j in i.pragmas]
+                                    i = i._rebuild(pragmas=pragmas)
+                                partree.append(i)
+                            body.extend(as_tuple(rebuild(partree)))
+
+                        mapper[group[0][0]] = self._make_parregion(body)
+                        mapper.update({i: None for i, _ in group[1:]})
+
+            if not mapper:
+                break
+            iet = Transformer(mapper).visit(iet)
+
+        return iet
+
     def make_parallel(self, iet):
         """Transform ``iet`` by introducing shared-memory parallelism."""
         mapper = OrderedDict()
@@ -249,14 +514,23 @@ class Ompizer(object):
             if not candidates:
                 continue
 
+            if candidates[0].is_Orphaned:
+                # The parallel region is opened by the caller (see HaloCopy); as
+                # there might be several of these Iterations in a row, the threads
+                # do not synchronize at the end of each of them
+                root, partree, _ = self._make_partree(candidates,
+                                                      self.lang['for-static-nowait'])
+                mapper[root] = partree
+                continue
+
             # Outer parallelism
             root, partree, collapsed = self._make_partree(candidates)
 
             # Nested parallelism
             partree = self._make_nested_partree(partree)
 
-            # Ensure increments are atomic
-            partree = self._make_atomic_incs(partree)
+            # Ensure increments are either reductions or atomic
+            init, partree, finalize = self._make_reductions(partree)
 
             # Ensure single-thread prodders are atomic
             partree = self._make_atomic_prodders(partree)
@@ -267,9 +541,79 @@ class Ompizer(object):
             # Protect the parallel region in case of 0-valued step increments
             parregion = self._make_guard(parregion, collapsed)
 
+            # Scalar reductions, if any, are set up and completed outside of
+            # the parallel region
+            if init or finalize:
+                parregion = List(body=init + [parregion] + finalize)
+
             mapper[root] = parregion
 
+        # The halo copies share a single fork/join
+        copies = {i: self._make_parregion(i.body) for i in FindNodes(HaloCopy).visit(iet)}
+        mapper.update(copies)
+
+        iet = Transformer(mapper).visit(iet)
+
+        # Independent parallel regions share a single fork/join
+        iet = self._make_concurrent(iet)
+
+        # Reserve threads to drive the halo exchanges
+        iet, overlaps = self._make_progress(iet)
+
+        parregions = [i for i in mapper.values() if not isinstance(i, Iteration)]
+        args = [self.nthreads] if parregions or overlaps else []
+        args += [self.nthreads_comm] if overlaps else []
+
+        return iet, {'args': args, 'includes': ['omp.h']}
+
+    def _make_progress(self, iet):
+        # Split the threads into two groups. The master thread starts and completes
+        # the halo exchange, using `nthreads_comm` threads for the copies in and
+        # out of the message buffers (so MPI is only ever called by the master
+        # thread), while the other group computes over the CORE region
+        #
+        # <HaloOverlap>                   if (nthreads > nthreads_comm)
+        #   haloupdate(..., nthreads)       #pragma omp parallel num_threads(2)
+        #   compute(..., nthreads)   -->    if (omp_get_thread_num() == 0)
+        #   halowait(..., nthreads)           haloupdate(..., nthreads_comm)
+        #                                     halowait(..., nthreads_comm)
+        #                                   else
+        #                                     compute(..., nthreads - nthreads_comm)
+        #                                 else
+        #                                   <HaloOverlap>
+        #
+        # The nested parallel regions require nested parallelism to be enabled; the
+        # maximum number of active levels is raised only for the duration of the
+        # overlap, and then restored, as it is a process-wide OpenMP setting
+        mapper = {}
+        for i in FindNodes(HaloOverlap).visit(iet):
+            comm = {self.nthreads: self.nthreads_comm}
+            update = [j._rebuild(arguments=[comm.get(k, k) for k in j.arguments])
+                      for j in i.update]
+            wait = [j._rebuild(arguments=[comm.get(k, k) for k in j.arguments])
+                    for j in i.wait]
+            compute = {self.nthreads: self.nthreads - self.nthreads_comm}
+            compute = [j._rebuild(arguments=[compute.get(k, k) for k in j.arguments])
+                       for j in i.compute]
+
+            # Just in case the team ends up with a single thread
+            single = Conditional(CondEq(Function('omp_get_num_threads')(), 1), compute)
+
+            master = CondEq(Function('omp_get_thread_num')(), 0)
+            body = Conditional(master, update + [single] + wait, compute)
+            parregion = Block(header=self.lang['par-region'](2), body=body)
+
+            levels = 3 if nhyperthreads() > Ompizer.NESTED else 2
+            maxlevels = Symbol(name='maxlevels')
+            save = LocalExpression(DummyEq(maxlevels,
+                                           Function('omp_get_max_active_levels')()))
+            nesting = Conditional(Lt(maxlevels, levels),
+                                  Call('omp_set_max_active_levels', levels))
+            restore = Conditional(Lt(maxlevels, levels),
+                                  Call('omp_set_max_active_levels', maxlevels))
+
+            mapper[i] = Conditional(Gt(self.nthreads, self.nthreads_comm),
+                                    [save, nesting, parregion, restore], i)
         iet = Transformer(mapper).visit(iet)
 
-        return iet, {'args': [self.nthreads] if mapper else [],
-                     'includes': ['omp.h']}
+        return iet, list(mapper)
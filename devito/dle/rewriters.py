@@ -4,17 +4,20 @@ from functools import partial
 from time import time
 
 import cgen
+import numpy as np
 
 from devito.dle.blocking_utils import Blocker, BlockDimension
 from devito.dle.parallelizer import Ompizer
 from devito.exceptions import DLEException
-from devito.ir.iet import (Call, Iteration, List, HaloSpot, Prodder, PARALLEL,
-                           FindSymbols, FindNodes, FindAdjacent, MapNodes, Transformer,
-                           filter_iterations, retrieve_iteration_tree)
+from devito.ir.iet import (Call, ExpressionBundle, Iteration, List, HaloSpot, Prodder,
+                           PARALLEL, FindSymbols, FindNodes, FindAdjacent, MapNodes,
+                           Transformer, filter_iterations, retrieve_iteration_tree)
+from devito.ir.support import IntervalGroup
 from devito.logger import perf_adv, dle_warning as warning
-from devito.mpi import HaloExchangeBuilder, HaloScheme
+from devito.mpi import HaloExchangeBuilder, HaloScheme, MPIProfile
 from devito.parameters import configuration
-from devito.tools import DAG, as_tuple, filter_ordered, generator
+from devito.symbolics import retrieve_indexed
+from devito.tools import DAG, as_tuple, filter_ordered, flatten, generator
 
 __all__ = ['PlatformRewriter', 'CPU64Rewriter', 'Intel64Rewriter', 'PowerRewriter',
            'ArmRewriter', 'SpeculativeRewriter', 'DeviceOffloadingRewriter',
@@ -163,6 +166,12 @@ class PlatformRewriter(AbstractRewriter):
     3 => "blocks", "sub-blocks", and "sub-sub-blocks", ...
     """
 
+    _ntstores_cache_ratio = 2
+    """
+    Use nontemporal stores in a loop nest only if its working set exceeds the
+    last-level cache size by at least this factor.
+    """
+
     def __init__(self, params, platform):
         super(PlatformRewriter, self).__init__(params, platform)
 
@@ -323,15 +332,42 @@ class PlatformRewriter(AbstractRewriter):
         parallel code.
         """
         # To produce unique object names
-        generators = {'msg': generator(), 'comm': generator(), 'comp': generator()}
-        sync_heb = HaloExchangeBuilder('basic', **generators)
-        user_heb = HaloExchangeBuilder(self.params['mpi'], **generators)
+        generators = {'msg': generator(), 'comm': generator(), 'comp': generator(),
+                      'timer': generator()}
+
+        # With advanced profiling, the halo exchanges collect per-neighbour statistics
+        if self.params['profiling'] == 'advanced':
+            profile = MPIProfile(name='mpiprofile')
+        else:
+            profile = None
+
+        user_heb = HaloExchangeBuilder(self.params['mpi'], profile, **generators)
+        if self.params['mpi'] in ('persistent', 'deep'):
+            # Synchronous, hence suitable for all HaloSpots
+            sync_heb = user_heb
+        else:
+            sync_heb = HaloExchangeBuilder('basic', profile, **generators)
+        hebs = filter_ordered([sync_heb, user_heb])
+
+        # Deep halo exchange applies to the time-stepping Iterations as a whole;
+        # the HaloSpots elsewhere are handled as usual
+        if self.params['mpi'] == 'deep':
+            mapper = {}
+            for i in FindNodes(Iteration).visit(iet):
+                if i.dim.is_Time and FindNodes(HaloSpot).visit(i):
+                    if not any(i in FindNodes(Iteration).visit(j) for j in mapper):
+                        mapper[i] = user_heb.make_deep(i)
+            mapper = {k: v for k, v in mapper.items() if v is not None}
+            iet = Transformer(mapper, nested=True).visit(iet)
+
         mapper = {}
         for hs in FindNodes(HaloSpot).visit(iet):
             heb = user_heb if hs.is_Overlappable else sync_heb
             mapper[hs] = heb.make(hs)
-        efuncs = sync_heb.efuncs + user_heb.efuncs
-        objs = sync_heb.objs + user_heb.objs
+        efuncs = flatten(i.efuncs for i in hebs)
+        objs = flatten(i.objs for i in hebs)
+        if profile is not None and profile.functions:
+            objs.append(profile)
         iet = Transformer(mapper, nested=True).visit(iet)
 
         # Must drop the PARALLEL tag from the Iterations within which halo
@@ -348,7 +384,7 @@ class PlatformRewriter(AbstractRewriter):
                     break
         iet = Transformer(mapper, nested=True).visit(iet)
 
-        return iet, {'includes': ['mpi.h'], 'efuncs': efuncs, 'args': objs}
+        return iet, {'includes': ['mpi.h', 'string.h'], 'efuncs': efuncs, 'args': objs}
 
     @dle_pass
     def _simdize(self, iet):
@@ -384,6 +420,56 @@ class PlatformRewriter(AbstractRewriter):
         """
         return self._node_parallelizer.make_parallel(iet)
 
+    @dle_pass
+    def _nontemporal_stores(self, iet):
+        """
+        Add compiler-specific pragmas and instructions to generate nontemporal
+        stores (i.e., non-cached stores) for the Functions which, according to
+        a simple cost model, won't be re-read before being evicted from cache.
+
+        The working set of a loop nest is estimated from the compulsory traffic
+        of its ExpressionBundles and the shape of the accessed Functions. If it
+        exceeds the last-level cache size, then any Function written, but not
+        read back, within the loop nest (e.g., ``u.forward`` in a time-marching
+        scheme, or a TimeFunction storing snapshots) is stored nontemporally.
+        """
+        pragma = self._backend_compiler_pragma('ntstores')
+        fence = self._backend_compiler_pragma('storefence')
+        llc_size = self.platform.llc_size
+        if not pragma or not fence or not llc_size:
+            return iet, {}
+
+        mapper = {}
+        for tree in retrieve_iteration_tree(iet):
+            vector_iterations = [i for i in tree if i.is_Vectorizable]
+            if not vector_iterations:
+                continue
+            bundles = FindNodes(ExpressionBundle).visit(tree.inner)
+            wss = estimate_working_set(bundles)
+            if wss is None or wss < self._ntstores_cache_ratio*llc_size:
+                continue
+            streamable = find_streamable(bundles)
+            if not streamable:
+                continue
+            ntstores = pragma(streamable)
+            for i in vector_iterations:
+                mapper[i] = i._rebuild(pragmas=i.pragmas + (ntstores,))
+        processed = Transformer(mapper).visit(iet)
+        ntstores = [i.pragmas[-1] for i in mapper.values()]
+
+        # Fence the nontemporal stores at the end of the parallel loop nest
+        mapper = {}
+        for tree in retrieve_iteration_tree(processed):
+            if not any(j is k for i in tree for j in i.pragmas for k in ntstores):
+                continue
+            for i in tree:
+                if i.is_Parallel:
+                    mapper[i] = List(body=i, footer=fence)
+                    break
+        processed = Transformer(mapper).visit(processed)
+
+        return processed, {}
+
     @dle_pass
     def _minimize_remainders(self, iet):
         """
@@ -447,6 +533,7 @@ class CPU64Rewriter(PlatformRewriter):
             self._dist_parallelize(state)
         self._loop_blocking(state)
         self._simdize(state)
+        self._nontemporal_stores(state)
         if self.params['openmp']:
             self._node_parallelize(state)
         self._minimize_remainders(state)
@@ -457,7 +544,7 @@ class Intel64Rewriter(CPU64Rewriter):
 
     lang_intel_common = {
         'ignore-deps': cgen.Pragma('ivdep'),
-        'ntstores': cgen.Pragma('vector nontemporal'),
+        'ntstores': lambda i: cgen.Pragma('vector nontemporal(%s)' % ','.join(i)),
         'storefence': cgen.Statement('_mm_sfence()'),
         'noinline': cgen.Pragma('noinline')
     }
@@ -514,39 +601,12 @@ class SpeculativeRewriter(CPU64Rewriter):
             self._dist_parallelize(state)
         self._loop_blocking(state)
         self._simdize(state)
+        self._nontemporal_stores(state)
         if self.params['openmp']:
             self._node_parallelize(state)
         self._minimize_remainders(state)
         self._hoist_prodders(state)
 
-    @dle_pass
-    def _nontemporal_stores(self, nodes):
-        """
-        Add compiler-specific pragmas and instructions to generate nontemporal
-        stores (ie, non-cached stores).
-        """
-        pragma = self._backend_compiler_pragma('ntstores')
-        fence = self._backend_compiler_pragma('storefence')
-        if not pragma or not fence:
-            return {}
-
-        mapper = {}
-        for tree in retrieve_iteration_tree(nodes):
-            for i in tree:
-                if i.is_Parallel:
-                    mapper[i] = List(body=i, footer=fence)
-                    break
-        processed = Transformer(mapper).visit(nodes)
-
-        mapper = {}
-        for tree in retrieve_iteration_tree(processed):
-            for i in tree:
-                if i.is_Vectorizable:
-                    mapper[i] = List(header=pragma, body=i)
-        processed = Transformer(mapper).visit(processed)
-
-        return processed, {}
-
 
 class CustomRewriter(SpeculativeRewriter):
 
@@ -558,6 +618,7 @@ class CustomRewriter(SpeculativeRewriter):
         'openmp': SpeculativeRewriter._node_parallelize,
         'mpi': SpeculativeRewriter._dist_parallelize,
         'simd': SpeculativeRewriter._simdize,
+        'ntstores': SpeculativeRewriter._nontemporal_stores,
         'minrem': SpeculativeRewriter._minimize_remainders,
         'prodders': SpeculativeRewriter._hoist_prodders
     }
@@ -577,3 +638,56 @@ class CustomRewriter(SpeculativeRewriter):
     def _pipeline(self, state):
         for i in self.passes:
             CustomRewriter.passes_mapper[i](self, state)
+
+
+def estimate_working_set(bundles):
+    """
+    Estimate the working set, in bytes, of a sequence of ExpressionBundles
+    within a time-stepping Iteration, that is the amount of data accessed in
+    one time step. The compulsory traffic of each ExpressionBundle is evaluated
+    using the shape of the accessed Functions. Return None if the estimate
+    cannot be computed at compilation time.
+    """
+    mapper = {}
+    for i in bundles:
+        for (f, mode), intervals in i.traffic.items():
+            mapper.setdefault((f, mode), []).append(intervals)
+
+    ret = 0
+    for (f, _), v in mapper.items():
+        intervals = IntervalGroup.generate('union', *v)
+        intervals = intervals.drop([d for d in intervals.dimensions if d.is_Time])
+        subs = {}
+        for d, s in zip(f.dimensions, f.shape):
+            subs[d.root.symbolic_min] = 0
+            subs[d.root.symbolic_max] = s - 1
+        try:
+            ret += int(intervals.size.subs(subs))*np.dtype(f.dtype).itemsize
+        except (TypeError, AttributeError):
+            return None
+    return ret
+
+
+def find_streamable(bundles):
+    """
+    Return the names of the DiscreteFunctions written, but not read back, within
+    a sequence of ExpressionBundles. For TimeFunctions, only reads from the
+    same time slot as the write count.
+    """
+    exprs = flatten(i.exprs for i in bundles)
+    reads = flatten(retrieve_indexed(i.expr.rhs) for i in exprs)
+
+    ret = []
+    for e in exprs:
+        f = e.write
+        if not (e.is_tensor and f.is_DiscreteFunction) or e.is_Increment:
+            continue
+        if f.is_TimeFunction:
+            key = lambda i: i.indices[f._time_position] == \
+                e.output.indices[f._time_position]
+        else:
+            key = lambda i: True
+        if any(i.function is f and key(i) for i in reads):
+            continue
+        ret.append(f.name)
+    return tuple(filter_ordered(ret))
@@ -65,6 +65,9 @@ def transform(iet, mode='advanced', options=None):
     options : dict, optional
         - ``openmp``: Enable/disable OpenMP. Defaults to `configuration['openmp']`.
         - ``mpi``: Enable/disable MPI. Defaults to `configuration['mpi']`.
+        - ``profiling``: The profiling level. With ``advanced`` profiling, the
+                         MPI halo exchanges collect per-neighbour statistics.
+                         Defaults to `configuration['profiling']`.
         - ``blockinner``: Enable/disable blocking of innermost loops. By default,
                           this is disabled to maximize SIMD vectorization. Pass True
                           to override this heuristic.
@@ -84,6 +87,7 @@ def transform(iet, mode='advanced', options=None):
     params['blocklevels'] = configuration['dle-options'].get('blocklevels', None)
     params['openmp'] = configuration['openmp']
     params['mpi'] = configuration['mpi']
+    params['profiling'] = configuration['profiling']
 
     # Parse input options (potentially replacing defaults)
     for k, v in (options or {}).items():
@@ -12,7 +12,8 @@ import cgen as c
 from devito.data import FULL
 from devito.ir.equations import ClusterizedEq
 from devito.ir.iet import (IterationProperty, SEQUENTIAL, PARALLEL, PARALLEL_IF_ATOMIC,
-                           VECTOR, WRAPPABLE, ROUNDABLE, AFFINE, OVERLAPPABLE)
+                           ORPHANED, VECTOR, WRAPPABLE, ROUNDABLE, AFFINE,
+                           OVERLAPPABLE)
 from devito.ir.support import Forward, detect_io
 from devito.symbolics import ListInitializer, FunctionFromPointer, as_symbol, ccode
 from devito.tools import (Signer, as_tuple, filter_ordered, filter_sorted, flatten,
@@ -22,8 +23,8 @@ from devito.types.basic import AbstractFunction
 
 __all__ = ['Node', 'Block', 'Expression', 'Element', 'Callable', 'Call', 'Conditional',
            'Iteration', 'List', 'LocalExpression', 'Section', 'TimedList', 'Prodder',
-           'MetaCall', 'ArrayCast', 'ForeignExpression', 'HaloSpot', 'IterationTree',
-           'ExpressionBundle', 'Increment', 'Return']
+           'MetaCall', 'ArrayCast', 'ForeignExpression', 'HaloSpot', 'HaloOverlap',
+           'HaloCopy', 'IterationTree', 'ExpressionBundle', 'Increment', 'Return']
 
 # First-class IET nodes
 
@@ -417,6 +418,10 @@ class Iteration(Node):
     def is_ParallelRelaxed(self):
         return self.is_Parallel or self.is_ParallelAtomic
 
+    @property
+    def is_Orphaned(self):
+        return ORPHANED in self.properties
+
     @property
     def is_Vectorizable(self):
         return VECTOR in self.properties
@@ -655,15 +660,21 @@ class ArrayCast(Node):
 
     """
     A node encapsulating a cast of a raw C pointer to a multi-dimensional array.
+
+    If ``shape`` is provided, then it is used in place of the symbolic shape
+    of ``function``, e.g. to cast with compile-time constant strides.
     """
 
-    def __init__(self, function):
+    def __init__(self, function, shape=None):
         self.function = function
+        self.shape = as_tuple(shape) or None
 
     @property
     def castshape(self):
         """The shape used in the left-hand side and right-hand side of the ArrayCast."""
-        if self.function.is_Array:
+        if self.shape is not None:
+            return self.shape[1:]
+        elif self.function.is_Array:
             return self.function.symbolic_shape[1:]
         else:
             return tuple(self.function._C_get_field(FULL, d).size
@@ -923,6 +934,45 @@ class HaloSpot(Node):
         return ()
 
 
+class HaloOverlap(List):
+
+    """
+    A sequence of Calls overlapping a halo exchange with computation: ``update``
+    starts the halo exchange, ``compute`` computes over the CORE region, and
+    ``wait`` completes the halo exchange.
+
+    Functionally, a HaloOverlap is identical to a List. However, it exposes the
+    role of each Call, so that these may be assigned to different threads upon
+    shared-memory parallelization.
+    """
+
+    _traversable = ['update', 'compute', 'wait']
+
+    def __init__(self, update=None, compute=None, wait=None):
+        self.update = as_tuple(update)
+        self.compute = as_tuple(compute)
+        self.wait = as_tuple(wait)
+        super(HaloOverlap, self).__init__(body=self.update + self.compute + self.wait)
+
+    def __repr__(self):
+        return "<%s (%d, %d, %d)>" % (self.__class__.__name__, len(self.update),
+                                      len(self.compute), len(self.wait))
+
+
+class HaloCopy(List):
+
+    """
+    A sequence of Calls copying data into, or out of, the buffers of one or more
+    halo exchange messages. The Calls are mutually independent.
+
+    Functionally, a HaloCopy is identical to a List. However, upon shared-memory
+    parallelization, all of the copies are performed within a single parallel
+    region, over which the ORPHANED Iterations of the Calls are distributed.
+    """
+
+    pass
+
+
 # Utility classes
 
 
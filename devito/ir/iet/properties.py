@@ -27,6 +27,13 @@ guaranteed to be atomic."""
 COLLAPSED = lambda i: IterationProperty('collapsed', i)
 """The Iteration is the root of a nest of ``i`` collapsed Iterations."""
 
+ORPHANED = IterationProperty('orphaned')
+"""
+The Iteration is PARALLEL, but its iterations are to be distributed over the
+threads of a parallel region opened by the caller, if any, rather than over
+the threads of a parallel region of its own.
+"""
+
 VECTOR = IterationProperty('vector-dim')
 """The Iteration can be SIMD-vectorized."""
 
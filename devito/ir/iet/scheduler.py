@@ -104,7 +104,7 @@ def iet_lower_dimensions(iet):
     return iet
 
 
-def iet_insert_casts(iet, parameters):
+def iet_insert_casts(iet, parameters, shapes=None):
     """
     Transform the input IET inserting the necessary type casts.
     The type casts are placed at the top of the IET.
@@ -115,7 +115,12 @@ def iet_insert_casts(iet, parameters):
         The input Iteration/Expression tree.
     parameters : tuple, optional
         The symbol that might require casting.
+    shapes : dict, optional
+        A mapper from symbols to known shapes, to be used in place of the
+        symbolic shapes in the type casts.
     """
+    shapes = shapes or {}
+
     # Make the generated code less verbose: if a non-Array parameter does not
     # appear in any Expression, that is, if the parameter is merely propagated
     # down to another Call, then there's no need to cast it
@@ -123,7 +128,7 @@ def iet_insert_casts(iet, parameters):
     need_cast = {i for i in set().union(*[i.functions for i in exprs]) if i.is_Tensor}
     need_cast.update({i for i in parameters if i.is_Array})
 
-    casts = [ArrayCast(i) for i in parameters if i in need_cast]
+    casts = [ArrayCast(i, shapes.get(i)) for i in parameters if i in need_cast]
     iet = List(body=casts + [iet])
     return iet
 
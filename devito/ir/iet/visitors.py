@@ -9,17 +9,19 @@ from collections.abc import Iterable
 from operator import attrgetter
 
 import cgen as c
+from sympy import Basic
 
 from devito.exceptions import VisitorException
 from devito.ir.iet.nodes import Node, Iteration, Expression, Call
 from devito.ir.support.space import Backward
 from devito.symbolics import ccode
 from devito.tools import GenericVisitor, as_tuple, filter_sorted, flatten
+from devito.types.basic import AbstractFunction
 
 
 __all__ = ['FindNodes', 'FindSections', 'FindSymbols', 'MapSections', 'MapNodes',
-           'IsPerfectIteration', 'XSubs', 'printAST', 'CGen', 'Transformer',
-           'FindAdjacent']
+           'IsPerfectIteration', 'XSubs', 'Specializer', 'printAST', 'CGen',
+           'Transformer', 'FindAdjacent']
 
 
 class Visitor(GenericVisitor):
@@ -753,5 +755,47 @@ class XSubs(Transformer):
         return o._rebuild(expr=self.replacer(o.expr))
 
 
+class Specializer(Transformer):
+    """
+    Transformer replacing symbols with known values in Expressions, Iteration
+    limits, Conditionals and Call arguments. Unlike XSubs, this can be used to
+    turn runtime arguments (e.g., loop bounds) into compile-time constants.
+
+    Parameters
+    ----------
+    mapper : dict
+        The substitution rules.
+    """
+
+    def __init__(self, mapper):
+        super(Specializer, self).__init__()
+        self.subs = mapper
+
+    def _xreplace(self, i):
+        if isinstance(i, Basic) and not isinstance(i, AbstractFunction):
+            return i.xreplace(self.subs)
+        else:
+            return i
+
+    def visit_Expression(self, o):
+        return o._rebuild(expr=o.expr.xreplace(self.subs))
+
+    def visit_Iteration(self, o):
+        nodes = self._visit(o.nodes)
+        limits = tuple(self._xreplace(i) for i in o.limits)
+        return o._rebuild(nodes, limits=limits)
+
+    def visit_Conditional(self, o):
+        then_body = self._visit(o.then_body)
+        else_body = self._visit(o.else_body)
+        return o._rebuild(condition=self._xreplace(o.condition),
+                          then_body=then_body, else_body=else_body)
+
+    def visit_Call(self, o):
+        arguments = [self._visit(i) if isinstance(i, Call) else self._xreplace(i)
+                     for i in o.arguments]
+        return o._rebuild(arguments=arguments)
+
+
 def printAST(node, verbose=True):
     return PrintAST(verbose=verbose)._visit(node)
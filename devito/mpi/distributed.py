@@ -1,3 +1,4 @@
+from collections import defaultdict
 from ctypes import c_int, c_void_p, sizeof
 from itertools import groupby, product
 from math import ceil
@@ -48,7 +49,8 @@ except ImportError:
             return None
 
 
-__all__ = ['Distributor', 'SparseDistributor', 'MPI']
+__all__ = ['Distributor', 'SparseDistributor', 'MPI', 'balanced_splits',
+           'cost_from_summary']
 
 
 class AbstractDistributor(ABC):
@@ -171,11 +173,33 @@ class Distributor(AbstractDistributor):
     comm : MPI communicator, optional
         The set of processes over which the domain is distributed. Defaults to
         MPI.COMM_WORLD.
+    topology : tuple, optional
+        The number of processes along each decomposed Dimension; ``'*'`` entries
+        are computed so as to minimize the halo surface. Defaults to ``'*'``
+        along all Dimensions. See :func:`compute_dims` for more info.
+    halo : int or tuple of ints, optional
+        The expected halo width along each decomposed Dimension, used to weigh
+        the halo surface when computing the topology. Defaults to 1.
+    splits : tuple, optional
+        The split points along each decomposed Dimension, that is the global
+        indices at which the subdomains after the first one begin. An entry may
+        be None, in which case the Dimension is split evenly. Along the other
+        Dimensions, the number of processes is implied by the split points.
+        Defaults to None along all Dimensions. See :func:`balanced_splits` to
+        compute load-balanced split points.
     """
 
-    def __init__(self, shape, dimensions, input_comm=None):
+    def __init__(self, shape, dimensions, input_comm=None, topology=None, halo=None,
+                 splits=None):
         super(Distributor, self).__init__(shape, dimensions)
 
+        splits = as_tuple(splits) or tuple(None for _ in range(len(shape)))
+        if len(splits) != len(shape):
+            raise ValueError("Expected split points for %d Dimensions, got `%s`"
+                             % (len(shape), splits))
+        splits = tuple(None if i is None else normalize_splits(i, n)
+                       for i, n in zip(splits, shape))
+
         if configuration['mpi']:
             # First time we enter here, we make sure MPI is initialized
             if not MPI.Is_initialized():
@@ -189,14 +213,22 @@ class Distributor(AbstractDistributor):
                     self._input_comm.Free()
             atexit.register(cleanup)
 
-            # `MPI.Compute_dims` sets the dimension sizes to be as close to each other
-            # as possible, using an appropriate divisibility algorithm. Thus, in 3D:
-            # * topology[0] >= topology[1] >= topology[2]
-            # * topology[0] * topology[1] * topology[2] == self._input_comm.size
-            # However, `MPI.Compute_dims` is distro-dependent, so we have to enforce
-            # some properties through our own wrapper (e.g., OpenMPI v3 does not
-            # guarantee that 9 ranks are arranged into a 3x3 grid when shape=(9, 9))
-            self._topology = compute_dims(self._input_comm.size, len(shape))
+            # Unlike `MPI.Compute_dims`, which only aims at balancing the number
+            # of processes along each dimension, we select the topology minimizing
+            # the halo surface for the given `shape` (e.g., with 64 ranks a
+            # 2000x2000x400 domain is cut as 8x8x1 rather than 4x4x4). With
+            # cubic shapes, this boils down to an even split
+            # Custom split points pin the number of processes along a Dimension
+            topology = list(as_tuple(topology) or ('*',)*len(shape))
+            for n, i in enumerate(splits):
+                if i is None or len(topology) != len(shape):
+                    continue
+                if topology[n] not in ('*', len(i) + 1):
+                    raise ValueError("The split points `%s` are incompatible with "
+                                     "the topology `%s`" % (i, tuple(topology)))
+                topology[n] = len(i) + 1
+            self._topology = compute_dims(self._input_comm.size, len(shape),
+                                          shape=shape, halo=halo, topology=topology)
 
             if self._input_comm is not input_comm:
                 # By default, Devito arranges processes into a cartesian topology.
@@ -211,10 +243,14 @@ class Distributor(AbstractDistributor):
             self._input_comm = None
             self._comm = MPI.COMM_NULL
             self._topology = tuple(1 for _ in range(len(shape)))
+            splits = tuple(None for _ in range(len(shape)))
 
         # The domain decomposition
-        self._decomposition = [Decomposition(np.array_split(range(i), j), c)
-                               for i, j, c in zip(shape, self.topology, self.mycoords)]
+        self._splits = splits
+        self._decomposition = [Decomposition(np.array_split(range(i), j if s is None
+                                                            else s), c)
+                               for i, j, s, c in zip(shape, self.topology, splits,
+                                                     self.mycoords)]
 
     @property
     def comm(self):
@@ -245,6 +281,14 @@ class Distributor(AbstractDistributor):
     def topology(self):
         return self._topology
 
+    @property
+    def splits(self):
+        """
+        The split points along each decomposed Dimension, or None if the
+        Dimension is split evenly.
+        """
+        return self._splits
+
     @cached_property
     def all_coords(self):
         """
@@ -372,8 +416,14 @@ class Distributor(AbstractDistributor):
         return MPINeighborhood(self.neighborhood)
 
     def _rebuild(self, shape=None, dimensions=None, comm=None):
-        return Distributor(shape or self.shape, dimensions or self.dimensions,
-                           comm or self.comm)
+        dimensions = dimensions or self.dimensions
+        # Retain the process topology, unless the decomposed Dimensions change
+        if dimensions == self.dimensions:
+            topology, splits = self.topology, self.splits
+        else:
+            topology, splits = None, None
+        return Distributor(shape or self.shape, dimensions, comm or self.comm,
+                           topology=topology, splits=splits)
 
 
 class SparseDistributor(AbstractDistributor):
@@ -518,7 +568,87 @@ class MPINeighborhood(CompositeObject):
     _pickle_args = ['neighborhood']
 
 
-def compute_dims(nprocs, ndim):
+def compute_dims(nprocs, ndim, shape=None, halo=None, topology=None):
+    """
+    Arrange ``nprocs`` MPI processes into an ``ndim``-dimensional Cartesian
+    topology.
+
+    Parameters
+    ----------
+    nprocs : int
+        The number of MPI processes.
+    ndim : int
+        The number of decomposed Dimensions.
+    shape : tuple of ints, optional
+        The shape of the decomposed domain. If supplied, the topology minimizing
+        the total halo surface -- that is, the amount of data exchanged at each
+        halo update -- is selected. Otherwise, ``nprocs`` is split as evenly as
+        possible over the ``ndim`` Dimensions.
+    halo : int or tuple of ints, optional
+        The halo width along each Dimension, used to weigh the halo surface.
+        Defaults to 1 along all Dimensions.
+    topology : tuple, optional
+        The number of processes along each Dimension. Each entry may be either
+        an int, to pin the number of processes along that Dimension (e.g., 1
+        to leave it undecomposed), or ``'*'``, to let it be computed. Defaults
+        to ``'*'`` along all Dimensions.
+    """
+    topology = as_tuple(topology) or tuple('*' for _ in range(ndim))
+    if len(topology) != ndim:
+        raise ValueError("Expected a topology with %d entries, got `%s`"
+                         % (ndim, topology))
+    if any(i != '*' and not (is_integer(i) and i > 0) for i in topology):
+        raise ValueError("Topology entries must be positive ints or '*', got `%s`"
+                         % (topology,))
+
+    npinned = np.prod([i for i in topology if i != '*'], dtype=int)
+    if nprocs % npinned != 0:
+        raise ValueError("Cannot arrange %d processes into the topology `%s`"
+                         % (nprocs, topology))
+    free = [n for n, i in enumerate(topology) if i == '*']
+    if not free:
+        if npinned != nprocs:
+            raise ValueError("Cannot arrange %d processes into the topology `%s`"
+                             % (nprocs, topology))
+        return tuple(topology)
+
+    if shape is None:
+        dims = compute_even_dims(nprocs // npinned, len(free))
+    else:
+        shape = as_tuple(shape)
+        halo = as_tuple(halo) if halo is not None else (1,)*ndim
+        if len(halo) == 1:
+            halo = halo*ndim
+
+        candidates = []
+        for dims in factorizations(nprocs // npinned, len(free)):
+            v = list(topology)
+            for n, i in zip(free, dims):
+                v[n] = i
+            candidates.append(tuple(v))
+
+        # Prefer topologies in which no process ends up with an empty subdomain
+        candidates = [i for i in candidates
+                      if all(j <= k for j, k in zip(i, shape))] or candidates
+
+        # Along each Dimension `d`, the `p_d` processes are separated by `p_d - 1`
+        # cuts, each one cutting through a cross section of the domain. As ties
+        # are typical (e.g., permutations with a cubic shape), we favour the
+        # topologies decomposing the outermost Dimensions the most, as these
+        # preserve the contiguity of the innermost Dimension
+        def surface(topology):
+            return sum((p - 1)*w*np.prod(shape[:n] + shape[n+1:], dtype=float)
+                       for n, (p, w) in enumerate(zip(topology, halo)))
+
+        return min(candidates, key=lambda i: (surface(i), tuple(-j for j in i)))
+
+    ret = list(topology)
+    for n, i in zip(free, dims):
+        ret[n] = i
+    return tuple(ret)
+
+
+def compute_even_dims(nprocs, ndim):
     # We don't do anything clever here. In fact, we do something very basic --
     # we just try to distribute `nprocs` evenly over the number of dimensions,
     # and if we can't we fallback to whatever MPI.Compute_dims gives...
@@ -532,3 +662,126 @@ def compute_dims(nprocs, ndim):
     else:
         v = int(v)
     return tuple(v for _ in range(ndim))
+
+
+def factorizations(n, ndim):
+    """
+    Generate all the ordered ``ndim``-tuples of positive ints whose product
+    is ``n``.
+    """
+    if ndim == 1:
+        yield (n,)
+        return
+    for i in range(1, n + 1):
+        if n % i == 0:
+            for j in factorizations(n // i, ndim - 1):
+                yield (i,) + j
+
+
+def normalize_splits(splits, size):
+    """
+    Turn ``splits`` into a list of split points within a domain of ``size``
+    indices, checking that no subdomain is empty.
+    """
+    splits = [int(i) for i in as_tuple(splits)]
+    if any(i >= j for i, j in zip([0] + splits, splits + [size])):
+        raise ValueError("The split points `%s` must be strictly increasing "
+                         "and within (0, %d)" % (splits, size))
+    return splits
+
+
+def balanced_splits(cost, topology):
+    """
+    Compute split points such that the cost of the subdomains is balanced.
+
+    Parameters
+    ----------
+    cost : array_like or tuple of array_like
+        Either the cost of each point of the domain, as an array with the
+        shape of the domain (e.g., a PML mask, or the density of sparse
+        points), or a tuple with, for each Dimension, the cost of each index
+        along it (that is, the cost of each cross section of the domain).
+    topology : tuple of ints
+        The number of processes along each Dimension.
+
+    Returns
+    -------
+    A tuple with the split points along each Dimension, which may be passed
+    to Grid as the ``splits`` argument.
+
+    Examples
+    --------
+    >>> balanced_splits([1, 1, 1, 1, 4, 4], (3,))
+    ([4, 5],)
+    >>> balanced_splits(([1, 1, 1, 1, 4, 4], [1, 1, 1, 1]), (2, 2))
+    ([4], [2])
+    """
+    topology = as_tuple(topology)
+    if isinstance(cost, tuple):
+        if len(cost) != len(topology):
+            raise ValueError("Expected the cost along %d Dimensions, got %d"
+                             % (len(topology), len(cost)))
+        marginals = [np.asarray(i, dtype=float) for i in cost]
+    else:
+        cost = np.asarray(cost, dtype=float)
+        if cost.ndim != len(topology):
+            raise ValueError("Expected a cost array with %d Dimensions, got %d"
+                             % (len(topology), cost.ndim))
+        marginals = [cost.sum(axis=tuple(j for j in range(cost.ndim) if j != n))
+                     for n in range(cost.ndim)]
+
+    ret = []
+    for c, p in zip(marginals, topology):
+        size = c.size
+        if p > size:
+            raise ValueError("Cannot split %d indices over %d processes" % (size, p))
+        cumsum = np.cumsum(c)
+        splits = []
+        for k in range(1, p):
+            # The subdomain boundary closest to the ideal cumulative cost ...
+            target = cumsum[-1]*k/p
+            i = int(np.searchsorted(cumsum, target))
+            if i > 0 and target - cumsum[i-1] <= cumsum[min(i, size-1)] - target:
+                i -= 1
+            # ... such that no subdomain is empty
+            i = min(max(i + 1, (splits[-1] + 1) if splits else 1), size - (p - k))
+            splits.append(i)
+        ret.append(splits)
+    return tuple(ret)
+
+
+def cost_from_summary(summary, distributor, sections=None):
+    """
+    Estimate the cost of each index along each decomposed Dimension from the
+    per-rank timings of a previous run, assuming each rank's time is evenly
+    spread over the points of its subdomain.
+
+    Parameters
+    ----------
+    summary : PerformanceSummary
+        The performance data, as returned by ``Operator.apply`` with MPI.
+    distributor : Distributor
+        The Distributor used in the run that produced ``summary``.
+    sections : str or list of str, optional
+        The sections whose timings are accounted for. Defaults to all sections.
+
+    Returns
+    -------
+    A tuple with the cost of each index along each Dimension, which may be
+    passed to :func:`balanced_splits`.
+    """
+    sections = as_tuple(sections)
+    times = defaultdict(float)
+    for k, v in summary.items():
+        if not sections or k.name in sections:
+            times[k.rank or 0] += v.time
+
+    ret = tuple(np.zeros(i) for i in distributor.glb_shape)
+    for rank, numb in enumerate(distributor.all_numb):
+        npoints = np.prod([len(i) for i in numb])
+        if npoints == 0:
+            continue
+        for i, c in zip(numb, ret):
+            # Each index along a Dimension accounts for a cross section
+            c[i] += times[rank]/len(i)
+    return ret
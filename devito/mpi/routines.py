@@ -1,24 +1,34 @@
 import abc
-from collections import OrderedDict
-from ctypes import POINTER, c_void_p, c_int, sizeof
+from collections import OrderedDict, defaultdict
+from ctypes import POINTER, c_double, c_void_p, c_int, sizeof
 from functools import reduce
 from itertools import product
 from operator import mul
 
-from sympy import Integer
+import numpy as np
+from frozendict import frozendict
+from sympy import Function, Ge, Integer, Mod
 
 from devito.data import OWNED, HALO, NOPAD, LEFT, CENTER, RIGHT, default_allocator
+from devito.exceptions import InvalidArgument
 from devito.ir.equations import DummyEq
 from devito.ir.iet import (Call, Callable, Conditional, Expression, ExpressionBundle,
-                           Iteration, LocalExpression, List, Prodder, PARALLEL,
-                           make_efunc, FindNodes, Transformer)
+                           HaloCopy, HaloOverlap, HaloSpot, Increment, Iteration,
+                           LocalExpression, List, Prodder, ORPHANED, PARALLEL, VECTOR,
+                           make_efunc, FindNodes, MapNodes, Transformer)
+from devito.ir.support import Backward
+from devito.logger import warning
 from devito.mpi import MPI
-from devito.symbolics import (Byref, CondNe, FieldFromPointer, FieldFromComposite,
-                              IndexedPointer, Macro)
-from devito.tools import dtype_to_mpitype, dtype_to_ctype, flatten, generator
-from devito.types import Array, Dimension, Symbol, LocalObject, CompositeObject
+from devito.mpi.halo_scheme import Halo, HaloScheme, HaloSchemeEntry
+from devito.symbolics import (Byref, CondEq, CondNe, FieldFromPointer,
+                              FieldFromComposite, IndexedPointer, IntDiv, Macro,
+                              retrieve_indexed)
+from devito.tools import (as_tuple, dtype_to_cstr, dtype_to_mpitype, dtype_to_ctype,
+                          flatten, generator)
+from devito.types import (Array, Constant, Dimension, Symbol, LocalObject, Object,
+                          CompositeObject)
 
-__all__ = ['HaloExchangeBuilder']
+__all__ = ['HaloExchangeBuilder', 'MPIProfile']
 
 
 class HaloExchangeBuilder(object):
@@ -27,7 +37,7 @@ class HaloExchangeBuilder(object):
     Build IET-based routines to implement MPI halo exchange.
     """
 
-    def __new__(cls, mode, **generators):
+    def __new__(cls, mode, profile=None, **generators):
         if mode is True or mode == 'basic':
             obj = object.__new__(BasicHaloExchangeBuilder)
         elif mode == 'diag':
@@ -38,6 +48,12 @@ class HaloExchangeBuilder(object):
             obj = object.__new__(Overlap2HaloExchangeBuilder)
         elif mode == 'full':
             obj = object.__new__(FullHaloExchangeBuilder)
+        elif mode == 'progress':
+            obj = object.__new__(ProgressHaloExchangeBuilder)
+        elif mode == 'persistent':
+            obj = object.__new__(PersistentHaloExchangeBuilder)
+        elif mode == 'deep':
+            obj = object.__new__(DeepHaloExchangeBuilder)
         else:
             assert False, "unexpected value `mode=%s`" % mode
 
@@ -45,6 +61,10 @@ class HaloExchangeBuilder(object):
         obj._gen_msgkey = generators.get('msg', generator())
         obj._gen_commkey = generators.get('comm', generator())
         obj._gen_compkey = generators.get('comp', generator())
+        obj._gen_timerkey = generators.get('timer', generator())
+
+        # The MPIProfile collecting the per-neighbour statistics, if any
+        obj._profile = profile
 
         obj._cache_halo = OrderedDict()
         obj._cache_dims = OrderedDict()
@@ -114,18 +134,67 @@ class HaloExchangeBuilder(object):
             self._efuncs.append(remainder)
 
         # Now build up the HaloSpot body, with explicit Calls to the constructed Callables
-        body = [callcompute]
-        for i, (f, hse) in enumerate(hs.fmapper.items()):
+        haloupdates = []
+        halowaits = []
+        for f, hse in hs.fmapper.items():
             msg = self._msgs[(f, hse)]
             haloupdate, halowait = self._cache_halo[(f.ndim, hse)]
-            body.insert(i, self._call_haloupdate(haloupdate.name, f, hse, msg))
+            haloupdates.append(self._call_haloupdate(haloupdate.name, f, hse, msg))
             if halowait is not None:
-                body.append(self._call_halowait(halowait.name, f, hse, msg))
+                halowaits.append(self._call_halowait(halowait.name, f, hse, msg))
+
+        return self._make_body(callcompute, remainder, haloupdates, halowaits)
+
+    def _make_body(self, callcompute, remainder, haloupdates, halowaits):
+        """
+        Construct the IET replacing a HaloSpot, given the Calls to the constructed
+        Callables.
+        """
+        body = haloupdates + [callcompute] + halowaits
         if remainder is not None:
             body.append(self._call_remainder(remainder))
 
         return List(body=body)
 
+    @property
+    def _profile_params(self):
+        """
+        The extra parameters of the halo exchange Callables, that is the MPIProfile
+        if the per-neighbour statistics were requested.
+        """
+        return [self._profile] if self._profile is not None else []
+
+    def _profile_args(self, f):
+        """
+        The extra arguments of the Calls to the halo exchange Callables of ``f``,
+        that is a pointer to the MPIProfile entries of ``f``.
+        """
+        if self._profile is None:
+            return []
+        return [Byref(IndexedPointer(self._profile, self._profile.offset(f)))]
+
+    def _make_profiled(self, body, metric, peer, nbytes=None):
+        """
+        Wrap ``body`` so that its execution time is accumulated into the MPIProfile
+        entry ``metric`` of the neighbour ``peer``. If provided, ``nbytes`` is
+        accumulated into the entry ``nbytes``. Without an MPIProfile, ``body`` is
+        returned as is.
+        """
+        if self._profile is None:
+            return List(body=body) if isinstance(body, list) else body
+
+        timer = Symbol(name='t%s%d' % (metric, self._gen_timerkey()), dtype=np.float64)
+        start = LocalExpression(DummyEq(timer, Function('MPI_Wtime')()))
+        update = [Increment(DummyEq(self._profile.entry(peer, metric),
+                                    Function('MPI_Wtime')() - timer))]
+        if nbytes is not None:
+            update.append(Increment(DummyEq(self._profile.entry(peer, 'nbytes'),
+                                            nbytes)))
+        # The statistics of MPI.PROC_NULL, i.e. the domain boundary, are dropped
+        update = Conditional(CondNe(peer, Macro('MPI_PROC_NULL')), update)
+
+        return List(body=[start] + list(as_tuple(body)) + [update])
+
     @abc.abstractmethod
     def _make_region(self, hs, key):
         """
@@ -268,6 +337,12 @@ class BasicHaloExchangeBuilder(HaloExchangeBuilder):
     A HaloExchangeBuilder making use of synchronous MPI routines only.
     """
 
+    MEMCPY_ROW = 16
+    """
+    Copy the rows of a halo buffer through ``memcpy`` if their length (in number
+    of items) is at least this threshold, and through a SIMD loop otherwise.
+    """
+
     def _make_msg(self, f, hse, key):
         return
 
@@ -316,10 +391,36 @@ class BasicHaloExchangeBuilder(HaloExchangeBuilder):
             eq = DummyEq(f[f_indices], buf[buf_indices])
             name = 'scatter_%s' % key
 
-        iet = Expression(eq)
-        for i, d in reversed(list(zip(buf_indices, buf_dims))):
-            # The -1 below is because an Iteration, by default, generates <=
-            iet = Iteration(iet, i, d.symbolic_size - 1, properties=PARALLEL)
+        # The innermost Dimension is contiguous in both `buf` and `f`, so a row
+        # is either copied at once, through `memcpy`, or through a SIMD loop,
+        # if too short for `memcpy` to pay off (e.g., the rows of a halo
+        # orthogonal to the innermost Dimension)
+        i, d = buf_indices[-1], buf_dims[-1]
+        # The -1 below is because an Iteration, by default, generates <=
+        loop = Iteration(Expression(eq), i, d.symbolic_size - 1,
+                         properties=(PARALLEL, VECTOR))
+        nbytes = d.symbolic_size*Macro('sizeof(%s)' % dtype_to_cstr(f.dtype))
+        memcpy = Call('memcpy', [Byref(eq.lhs.subs(i, 0)), Byref(eq.rhs.subs(i, 0)),
+                                 nbytes])
+        body = [Conditional(Ge(d.symbolic_size, self.MEMCPY_ROW), memcpy, loop)]
+
+        # The rows are distributed over a single, flattened Iteration, so that
+        # all of them may be copied in parallel, regardless of the orientation
+        # of the halo (e.g., a halo orthogonal to the outermost Dimension has
+        # only as many outermost indices as the halo is thick)
+        row = Dimension(name='row')
+        index = row
+        for n, (i, d) in reversed(list(enumerate(zip(buf_indices, buf_dims)))[:-1]):
+            if n > 0:
+                body.insert(0, LocalExpression(DummyEq(i, Mod(index, d.symbolic_size))))
+                index = IntDiv(index, d.symbolic_size)
+            else:
+                body.insert(0, LocalExpression(DummyEq(i, index)))
+        # The rows are distributed over the threads of the parallel region
+        # enclosing the Calls to this Callable (see HaloCopy), so that the copies
+        # of several messages may share a single fork/join
+        nrows = reduce(mul, [d.symbolic_size for d in buf_dims[:-1]], 1)
+        iet = Iteration(body, row, nrows - 1, properties=(PARALLEL, ORPHANED))
 
         parameters = [buf] + list(buf.shape) + [f] + f_offsets
         return Callable(name, iet, 'void', parameters, ('static',))
@@ -344,10 +445,12 @@ class BasicHaloExchangeBuilder(HaloExchangeBuilder):
         scatter = Call('scatter_%s' % key, [bufs] + list(bufs.shape) + [f] + ofss)
 
         # The `gather` is unnecessary if sending to MPI.PROC_NULL
-        gather = Conditional(CondNe(torank, Macro('MPI_PROC_NULL')), gather)
+        gather = Conditional(CondNe(torank, Macro('MPI_PROC_NULL')),
+                             HaloCopy(body=gather))
         # The `scatter` must be guarded as we must not alter the halo values along
         # the domain boundary, where the sender is actually MPI.PROC_NULL
-        scatter = Conditional(CondNe(fromrank, Macro('MPI_PROC_NULL')), scatter)
+        scatter = Conditional(CondNe(fromrank, Macro('MPI_PROC_NULL')),
+                              HaloCopy(body=scatter))
 
         count = reduce(mul, bufs.shape, 1)
         rrecv = MPIRequestObject(name='rrecv')
@@ -360,12 +463,19 @@ class BasicHaloExchangeBuilder(HaloExchangeBuilder):
         waitrecv = Call('MPI_Wait', [rrecv, Macro('MPI_STATUS_IGNORE')])
         waitsend = Call('MPI_Wait', [rsend, Macro('MPI_STATUS_IGNORE')])
 
-        iet = List(body=[recv, gather, send, waitsend, waitrecv, scatter])
-        parameters = ([f] + list(bufs.shape) + ofsg + ofss + [fromrank, torank, comm])
+        # Optionally, collect per-neighbour statistics
+        nbytes = count*np.dtype(f.dtype).itemsize
+        gather = self._make_profiled(gather, 'pack', torank, nbytes)
+        wait = self._make_profiled([waitsend, waitrecv], 'wait', fromrank)
+        scatter = self._make_profiled(scatter, 'unpack', fromrank)
+
+        iet = List(body=[recv, gather, send, wait, scatter])
+        parameters = ([f] + list(bufs.shape) + ofsg + ofss + [fromrank, torank, comm] +
+                      self._profile_params)
         return Callable('sendrecv_%s' % key, iet, 'void', parameters, ('static',))
 
     def _call_sendrecv(self, name, *args, **kwargs):
-        return Call(name, flatten(args))
+        return Call(name, flatten(args) + self._profile_params)
 
     def _make_haloupdate(self, f, hse, key, **kwargs):
         distributor = f.grid.distributor
@@ -418,13 +528,13 @@ class BasicHaloExchangeBuilder(HaloExchangeBuilder):
                 body.append(self._call_sendrecv(sendrecv.name, *args, **kwargs))
 
         iet = List(body=body)
-        parameters = [f, comm, nb] + list(fixed.values())
+        parameters = [f, comm, nb] + list(fixed.values()) + self._profile_params
         return Callable('haloupdate%d' % key, iet, 'void', parameters, ('static',))
 
     def _call_haloupdate(self, name, f, hse, *args):
         comm = f.grid.distributor._obj_comm
         nb = f.grid.distributor._obj_neighborhood
-        args = [f, comm, nb] + list(hse.loc_indices.values())
+        args = [f, comm, nb] + list(hse.loc_indices.values()) + self._profile_args(f)
         return Call(name, flatten(args))
 
     def _make_compute(self, *args):
@@ -492,7 +602,7 @@ class DiagHaloExchangeBuilder(BasicHaloExchangeBuilder):
                                             fromrank, torank, comm, **kwargs))
 
         iet = List(body=body)
-        parameters = [f, comm, nb] + list(fixed.values())
+        parameters = [f, comm, nb] + list(fixed.values()) + self._profile_params
         return Callable('haloupdate%d' % key, iet, 'void', parameters, ('static',))
 
 
@@ -546,7 +656,8 @@ class OverlapHaloExchangeBuilder(DiagHaloExchangeBuilder):
 
         gather = Call('gather_%s' % key, [bufg] + sizes + [f] + ofsg)
         # The `gather` is unnecessary if sending to MPI.PROC_NULL
-        gather = Conditional(CondNe(torank, Macro('MPI_PROC_NULL')), gather)
+        gather = Conditional(CondNe(torank, Macro('MPI_PROC_NULL')),
+                             HaloCopy(body=gather))
 
         count = reduce(mul, sizes, 1)
         rrecv = Byref(FieldFromPointer(msg._C_field_rrecv, msg))
@@ -556,8 +667,12 @@ class OverlapHaloExchangeBuilder(DiagHaloExchangeBuilder):
         send = Call('MPI_Isend', [bufg, count, Macro(dtype_to_mpitype(f.dtype)),
                                   torank, Integer(13), comm, rsend])
 
+        # Optionally, collect per-neighbour statistics
+        nbytes = count*np.dtype(f.dtype).itemsize
+        gather = self._make_profiled(gather, 'pack', torank, nbytes)
+
         iet = List(body=[recv, gather, send])
-        parameters = ([f] + ofsg + [fromrank, torank, comm, msg])
+        parameters = ([f] + ofsg + [fromrank, torank, comm, msg] + self._profile_params)
         return Callable('sendrecv_%s' % key, iet, 'void', parameters, ('static',))
 
     def _call_sendrecv(self, name, *args, msg=None, haloid=None):
@@ -566,7 +681,8 @@ class OverlapHaloExchangeBuilder(DiagHaloExchangeBuilder):
         # to collect and scatter the result of an MPI_Irecv
         f, _, ofsg, _, fromrank, torank, comm = args
         msg = Byref(IndexedPointer(msg, haloid))
-        return Call(name, [f] + ofsg + [fromrank, torank, comm, msg])
+        return Call(name, [f] + ofsg + [fromrank, torank, comm, msg] +
+                    self._profile_params)
 
     def _make_haloupdate(self, f, hse, key, msg=None):
         iet = super(OverlapHaloExchangeBuilder, self)._make_haloupdate(f, hse, key,
@@ -605,15 +721,20 @@ class OverlapHaloExchangeBuilder(DiagHaloExchangeBuilder):
 
         # The `scatter` must be guarded as we must not alter the halo values along
         # the domain boundary, where the sender is actually MPI.PROC_NULL
-        scatter = Conditional(CondNe(fromrank, Macro('MPI_PROC_NULL')), scatter)
+        scatter = Conditional(CondNe(fromrank, Macro('MPI_PROC_NULL')),
+                              HaloCopy(body=scatter))
 
         rrecv = Byref(FieldFromPointer(msg._C_field_rrecv, msg))
         waitrecv = Call('MPI_Wait', [rrecv, Macro('MPI_STATUS_IGNORE')])
         rsend = Byref(FieldFromPointer(msg._C_field_rsend, msg))
         waitsend = Call('MPI_Wait', [rsend, Macro('MPI_STATUS_IGNORE')])
 
-        iet = List(body=[waitsend, waitrecv, scatter])
-        parameters = ([f] + ofss + [fromrank, msg])
+        # Optionally, collect per-neighbour statistics
+        wait = self._make_profiled([waitsend, waitrecv], 'wait', fromrank)
+        scatter = self._make_profiled(scatter, 'unpack', fromrank)
+
+        iet = List(body=[wait, scatter])
+        parameters = ([f] + ofss + [fromrank, msg] + self._profile_params)
         return Callable('wait_%s' % key, iet, 'void', parameters, ('static',))
 
     def _make_halowait(self, f, hse, key, msg=None):
@@ -635,15 +756,17 @@ class OverlapHaloExchangeBuilder(DiagHaloExchangeBuilder):
 
             msgi = Byref(IndexedPointer(msg, len(body)))
 
-            body.append(Call(wait.name, [f] + ofss + [fromrank, msgi]))
+            body.append(Call(wait.name, [f] + ofss + [fromrank, msgi] +
+                             self._profile_params))
 
         iet = List(body=body)
-        parameters = [f] + list(fixed.values()) + [nb, msg]
+        parameters = [f] + list(fixed.values()) + [nb, msg] + self._profile_params
         return Callable('halowait%d' % key, iet, 'void', parameters, ('static',))
 
     def _call_halowait(self, name, f, hse, msg):
         nb = f.grid.distributor._obj_neighborhood
-        return Call(name, [f] + list(hse.loc_indices.values()) + [nb, msg])
+        return Call(name, [f] + list(hse.loc_indices.values()) + [nb, msg] +
+                    self._profile_args(f))
 
     def _make_remainder(self, hs, key, callcompute, *args):
         assert callcompute.is_Call
@@ -728,13 +851,25 @@ class Overlap2HaloExchangeBuilder(OverlapHaloExchangeBuilder):
 
         # The -1 below is because an Iteration, by default, generates <=
         ncomms = Symbol(name='ncomms')
-        iet = Iteration([recv, gather, send], dim, ncomms - 1)
-        parameters = ([f, comm, msg, ncomms]) + list(fixed.values())
+        if self._profile is None:
+            # All messages are packed within a single HaloCopy, and the sends are
+            # posted once the copies are over
+            iet = List(body=[Iteration(recv, dim, ncomms - 1),
+                             HaloCopy(body=Iteration(gather, dim, ncomms - 1)),
+                             Iteration(send, dim, ncomms - 1)])
+        else:
+            # Collect per-neighbour statistics, hence one message at a time
+            nbytes = count*np.dtype(f.dtype).itemsize
+            gather = self._make_profiled(HaloCopy(body=gather), 'pack', torank, nbytes)
+            iet = Iteration([recv, gather, send], dim, ncomms - 1)
+        parameters = (([f, comm, msg, ncomms]) + list(fixed.values()) +
+                      self._profile_params)
         return Callable('haloupdate%d' % key, iet, 'void', parameters, ('static',))
 
     def _call_haloupdate(self, name, f, hse, msg):
         comm = f.grid.distributor._obj_comm
-        return Call(name, [f, comm, msg, msg.npeers] + list(hse.loc_indices.values()))
+        return Call(name, [f, comm, msg, msg.npeers] + list(hse.loc_indices.values()) +
+                    self._profile_args(f))
 
     def _make_sendrecv(self, *args):
         return
@@ -771,12 +906,22 @@ class Overlap2HaloExchangeBuilder(OverlapHaloExchangeBuilder):
 
         # The -1 below is because an Iteration, by default, generates <=
         ncomms = Symbol(name='ncomms')
-        iet = Iteration([waitsend, waitrecv, scatter], dim, ncomms - 1)
-        parameters = ([f] + list(fixed.values()) + [msg, ncomms])
+        if self._profile is None:
+            # All messages are unpacked within a single HaloCopy, once received
+            iet = List(body=[Iteration([waitsend, waitrecv], dim, ncomms - 1),
+                             HaloCopy(body=Iteration(scatter, dim, ncomms - 1))])
+        else:
+            # Collect per-neighbour statistics, hence one message at a time
+            wait = self._make_profiled([waitsend, waitrecv], 'wait', fromrank)
+            scatter = self._make_profiled(HaloCopy(body=scatter), 'unpack', fromrank)
+            iet = Iteration([wait, scatter], dim, ncomms - 1)
+        parameters = ([f] + list(fixed.values()) + [msg, ncomms] +
+                      self._profile_params)
         return Callable('halowait%d' % key, iet, 'void', parameters, ('static',))
 
     def _call_halowait(self, name, f, hse, msg):
-        return Call(name, [f] + list(hse.loc_indices.values()) + [msg, msg.npeers])
+        return Call(name, [f] + list(hse.loc_indices.values()) + [msg, msg.npeers] +
+                    self._profile_args(f))
 
     def _make_wait(self, *args):
         return
@@ -843,6 +988,360 @@ class FullHaloExchangeBuilder(Overlap2HaloExchangeBuilder):
         return Prodder(poke.name, poke.parameters, single_thread=True, periodic=True)
 
 
+class ProgressHaloExchangeBuilder(Overlap2HaloExchangeBuilder):
+
+    """
+    A Overlap2HaloExchangeBuilder which, rather than poking the MPI runtime from
+    within the computation over the CORE region, leaves the halo exchange to a
+    set of reserved threads. The Calls starting and completing the halo exchange
+    as well as the Call computing over the CORE region are gathered in a
+    HaloOverlap, so that the threads may be given their role upon shared-memory
+    parallelization. Without shared-memory parallelism, this boils down to a
+    Overlap2HaloExchangeBuilder.
+    """
+
+    def _make_body(self, callcompute, remainder, haloupdates, halowaits):
+        body = [HaloOverlap(haloupdates, callcompute, halowaits)]
+        if remainder is not None:
+            body.append(self._call_remainder(remainder))
+
+        return List(body=body)
+
+
+class PersistentHaloExchangeBuilder(Overlap2HaloExchangeBuilder):
+
+    """
+    A synchronous HaloExchangeBuilder relying on persistent communication. The
+    send/recv buffers as well as the MPI requests (through ``MPI_Send_init`` and
+    ``MPI_Recv_init``) are created in Python-land, once per Operator run, and
+    carried by an MPIMsgPersistent. Thus, the per-step overhead of a halo exchange
+    boils down to starting and waiting on the requests.
+    """
+
+    def _make_region(self, hs, key):
+        return
+
+    def _make_msg(self, f, hse, key):
+        # Only retain the halos required by the Diag scheme
+        halos = sorted(i for i in hse.halos if isinstance(i.dim, tuple))
+        return MPIMsgPersistent('msg%d' % key, f, halos)
+
+    def _make_all(self, f, hse, msg):
+        df = f.__class__.__base__(name='a', grid=f.grid, shape=f.shape_global,
+                                  dimensions=f.dimensions)
+
+        if f.dimensions not in self._cache_dims:
+            key = self._gen_commkey()
+            gather = self._make_copy(df, hse, key)
+            scatter = self._make_copy(df, hse, key, swap=True)
+            haloupdate = self._make_haloupdate(df, hse, key, msg=msg)
+            self._cache_dims[f.dimensions] = [gather, scatter, haloupdate]
+            self._efuncs.extend([gather, scatter, haloupdate])
+        else:
+            _, _, haloupdate = self._cache_dims[f.dimensions]
+
+        self._cache_halo[(f.ndim, hse)] = (haloupdate, None)
+
+        return haloupdate, None
+
+    def _make_haloupdate(self, f, hse, key, msg=None):
+        fixed = {d: Symbol(name="o%s" % d.root) for d in hse.loc_indices}
+
+        dim = Dimension(name='i')
+
+        msgi = IndexedPointer(msg, dim)
+
+        bufg = FieldFromComposite(msg._C_field_bufg, msgi)
+        bufs = FieldFromComposite(msg._C_field_bufs, msgi)
+
+        fromrank = FieldFromComposite(msg._C_field_from, msgi)
+        torank = FieldFromComposite(msg._C_field_to, msgi)
+
+        sizes = [FieldFromComposite('%s[%d]' % (msg._C_field_sizes, i), msgi)
+                 for i in range(len(f._dist_dimensions))]
+        ofsg = [FieldFromComposite('%s[%d]' % (msg._C_field_ofsg, i), msgi)
+                for i in range(len(f._dist_dimensions))]
+        ofsg = [fixed.get(d) or ofsg.pop(0) for d in f.dimensions]
+        ofss = [FieldFromComposite('%s[%d]' % (msg._C_field_ofss, i), msgi)
+                for i in range(len(f._dist_dimensions))]
+        ofss = [fixed.get(d) or ofss.pop(0) for d in f.dimensions]
+
+        # The `gather` is unnecessary if sending to MPI.PROC_NULL
+        gather = Call('gather_%s' % key, [bufg] + sizes + [f] + ofsg)
+        gather = Conditional(CondNe(torank, Macro('MPI_PROC_NULL')), gather)
+
+        # The `scatter` must be guarded as we must not alter the halo values along
+        # the domain boundary, where the sender is actually MPI.PROC_NULL
+        scatter = Call('scatter_%s' % key, [bufs] + sizes + [f] + ofss)
+        scatter = Conditional(CondNe(fromrank, Macro('MPI_PROC_NULL')), scatter)
+
+        # The requests are persistent, so we just (re)start them
+        rrecv = Byref(FieldFromComposite(msg._C_field_rrecv, msgi))
+        rsend = Byref(FieldFromComposite(msg._C_field_rsend, msgi))
+        recv = Call('MPI_Start', [rrecv])
+        send = Call('MPI_Start', [rsend])
+        waitrecv = Call('MPI_Wait', [rrecv, Macro('MPI_STATUS_IGNORE')])
+        waitsend = Call('MPI_Wait', [rsend, Macro('MPI_STATUS_IGNORE')])
+
+        # The -1 below is because an Iteration, by default, generates <=
+        ncomms = Symbol(name='ncomms')
+        if self._profile is None:
+            # All messages are packed, and then unpacked, within a single HaloCopy
+            iet = List(body=[Iteration(recv, dim, ncomms - 1),
+                             HaloCopy(body=Iteration(gather, dim, ncomms - 1)),
+                             Iteration(send, dim, ncomms - 1),
+                             Iteration([waitsend, waitrecv], dim, ncomms - 1),
+                             HaloCopy(body=Iteration(scatter, dim, ncomms - 1))])
+        else:
+            # Collect per-neighbour statistics, hence one message at a time
+            nbytes = reduce(mul, sizes, 1)*np.dtype(f.dtype).itemsize
+            gather = self._make_profiled(HaloCopy(body=gather), 'pack', torank, nbytes)
+            wait = self._make_profiled([waitsend, waitrecv], 'wait', fromrank)
+            scatter = self._make_profiled(HaloCopy(body=scatter), 'unpack', fromrank)
+            iet = List(body=[Iteration([recv, gather, send], dim, ncomms - 1),
+                             Iteration([wait, scatter], dim, ncomms - 1)])
+        parameters = ([f, msg, ncomms]) + list(fixed.values()) + self._profile_params
+        return Callable('haloupdate%d' % key, iet, 'void', parameters, ('static',))
+
+    def _call_haloupdate(self, name, f, hse, msg):
+        return Call(name, [f, msg, msg.npeers] + list(hse.loc_indices.values()) +
+                    self._profile_args(f))
+
+    def _make_compute(self, *args):
+        return
+
+    def _call_compute(self, hs, *args):
+        return hs.body
+
+    def _make_remainder(self, *args):
+        return
+
+    def _call_remainder(self, *args):
+        return
+
+
+class DeepHaloExchangeBuilder(BasicHaloExchangeBuilder):
+
+    """
+    A BasicHaloExchangeBuilder trading redundant computation for fewer messages.
+    Within a time-stepping Iteration, the halos are exchanged only once every
+    ``halo_period`` timesteps. In between, the Iteration nests are extended into
+    the halo, so that the values which would otherwise be received from the
+    neighbours are recomputed locally. The deeper the halos (see the
+    ``halo-depth`` configuration parameter), the longer the period can be.
+    """
+
+    def make_deep(self, iteration):
+        """
+        Construct an IET equivalent to the time-stepping ``iteration``, but with
+        halo exchanges performed once every ``halo_period`` timesteps. Return
+        None if ``iteration`` cannot be transformed, in which case its HaloSpots
+        should be treated as usual.
+        """
+        try:
+            kmax, reach, incoming, extended = self._analyze_deep(iteration)
+        except ValueError as e:
+            warning("Cannot use deep halo exchange in the `%s` loop (%s); "
+                    "falling back to basic halo exchange" % (iteration.dim, e))
+            return
+
+        # One HaloPeriod per Operator, valid for all time-stepping Iterations
+        if getattr(self, '_period', None) is None:
+            self._period = HaloPeriod(name='halo_period', value=kmax)
+        elif kmax < self._period.max_value:
+            self._period.data = self._period.max_value = kmax
+        period = self._period
+
+        # The position of the current timestep within the period
+        hstep = Symbol(name='hstep')
+        if iteration.direction is Backward:
+            offset = iteration.symbolic_max - iteration.dim
+        else:
+            offset = iteration.dim - iteration.symbolic_min
+        body = [Expression(DummyEq(hstep, Mod(offset, period)))]
+
+        # The extension of the Iteration nests into the halo, which decreases at
+        # each timestep of the period, and is zero along the domain boundary
+        distributor = next(iter(incoming))[0].grid.distributor
+        nb = distributor._obj_neighborhood
+        exts = {}
+        for (d, side), v in reach.items():
+            if v == 0:
+                continue
+            tag = 'l' if side is LEFT else 'r'
+            ext = Symbol(name='%s_%sext' % (d.name, tag))
+            name = ''.join(tag if i is d else 'c' for i in distributor.dimensions)
+            peer = FieldFromPointer(name, nb)
+            body.append(Expression(DummyEq(ext, 0)))
+            body.append(Conditional(CondNe(peer, Macro('MPI_PROC_NULL')),
+                                    Expression(DummyEq(ext, v*(period - hstep - 1)))))
+            exts[(d, side)] = ext
+
+        # Halo exchanges: once for the time-invariant Functions, once per period
+        # for the Functions computed within `iteration`, and at every timestep
+        # for the time-varying Functions computed elsewhere
+        dims = {d for d, _ in exts}
+        pre = []
+        block = []
+        for (f, loc_indices), mode in incoming.items():
+            halos = frozenset(Halo(d, s) for d in f._dist_dimensions if d in dims
+                              for s in (LEFT, RIGHT))
+            if not halos:
+                continue
+            hse = HaloSchemeEntry(loc_indices, halos)
+            call = self.make(HaloSpot(HaloScheme.build({f: hse}, {})))
+            if mode == 'pre':
+                pre.append(call)
+            elif mode == 'block':
+                block.append(call)
+            else:
+                body.append(call)
+        if block:
+            body.append(Conditional(CondEq(hstep, 0), block))
+
+        # Extend the Iteration nests and drop the HaloSpots
+        mapper = {}
+        for i in extended:
+            _min, _max, step = i.limits
+            _min = _min - exts.get((i.dim, LEFT), 0)
+            _max = _max + exts.get((i.dim, RIGHT), 0)
+            mapper[i] = i._rebuild(limits=(_min, _max, step))
+        nodes = Transformer(mapper, nested=True).visit(iteration.nodes)
+        mapper = {hs: hs.body for hs in FindNodes(HaloSpot).visit(nodes)}
+        nodes = Transformer(mapper, nested=True).visit(nodes)
+
+        return List(body=pre + [iteration._rebuild(nodes=tuple(body) + nodes)])
+
+    def _analyze_deep(self, iteration):
+        """
+        Analyze the accesses performed within the time-stepping ``iteration``.
+        Raise ValueError if ``iteration`` doesn't consist of stencil updates
+        over MPI-distributed Functions only.
+        """
+        time = iteration.dim.root
+
+        chains = {}
+        mapper = MapNodes(Iteration, Expression, 'groupby').visit(iteration.nodes)
+        for k, v in mapper.items():
+            chains.update({e: k for e in v})
+        exprs = FindNodes(Expression).visit(iteration.nodes)
+
+        def access(indexed, dims):
+            f = indexed.function
+            loc_indices = {}
+            offsets = {}
+            for d, i in zip(f.dimensions, indexed.indices):
+                if d in f._dist_dimensions:
+                    v = i - d
+                    if d not in dims or not v.is_Integer:
+                        raise ValueError("non-affine access `%s`" % indexed)
+                    offsets[d] = int(v) - f._offset_domain[d]
+                else:
+                    loc_indices[d] = i
+            return frozendict(loc_indices), offsets
+
+        def toffset(index):
+            origin = index.origin if getattr(index, 'is_Modulo', False) else index
+            dims = [i for i in origin.free_symbols if getattr(i, 'root', None) is time]
+            if len(dims) != 1 or not (origin - dims[0]).is_Integer:
+                raise ValueError("unsupported time index `%s`" % index)
+            return int(origin - dims[0])
+
+        # The written Functions, and the timesteps at which they're written
+        writes = OrderedDict()
+        for e in exprs:
+            if e.is_scalar:
+                continue
+            f = e.write
+            dims = [i.dim for i in chains.get(e, [])]
+            if not (f.is_DiscreteFunction and f._dist_dimensions):
+                raise ValueError("write to non-distributed object `%s`" % f.name)
+            if any(d.root in f._dist_dimensions and d is not d.root for d in dims):
+                raise ValueError("Iteration over SubDimension")
+            loc_indices, _ = access(e.expr.lhs, dims)
+            writes.setdefault(f, set()).add(loc_indices)
+
+        # The read Functions, with their stencil reach. A value is `incoming` if
+        # it's read before being (if ever) computed within the same timestep
+        reach = defaultdict(int)
+        freach = defaultdict(int)
+        incoming = OrderedDict()
+        seen = set()
+        for e in exprs:
+            dims = [i.dim for i in chains.get(e, [])]
+            reads = list(retrieve_indexed(e.expr.rhs))
+            if e.is_Increment and e.is_tensor:
+                reads.append(e.expr.lhs)
+            for indexed in reads:
+                f = indexed.function
+                if not (f.is_DiscreteFunction and f._dist_dimensions):
+                    continue
+                loc_indices, offsets = access(indexed, dims)
+                for d, v in offsets.items():
+                    for side, r in ((LEFT, -v), (RIGHT, v)):
+                        reach[(d, side)] = max(reach[(d, side)], r)
+                        freach[(f, d, side)] = max(freach[(f, d, side)], r)
+                    if v != 0 and loc_indices in writes.get(f, ()):
+                        raise ValueError("stencil over `%s`, which is computed "
+                                         "within the same timestep" % f.name)
+                if (f, loc_indices) in seen:
+                    continue
+                if f in writes:
+                    mode = 'block'
+                elif any(getattr(i, 'root', None) is time
+                         for i in flatten(i.free_symbols for i in loc_indices.values())):
+                    mode = 'step'
+                else:
+                    mode = 'pre'
+                incoming[(f, loc_indices)] = mode
+            if e.is_tensor:
+                seen.add((e.write, access(e.expr.lhs, dims)[0]))
+
+        # The values read at a given timestep must have been either received at
+        # the beginning of the period or computed at a previous timestep
+        for f, v in writes.items():
+            tdims = [d for d in f.dimensions if d.is_Time]
+            if not tdims:
+                continue
+            d = tdims.pop()
+            offsets = {toffset(i[d]) for g, i in incoming if g is f}
+            top = max(toffset(i[d]) for i in v)
+            if offsets and not set(range(min(offsets), top)) <= offsets:
+                raise ValueError("unsupported time accesses to `%s`" % f.name)
+
+        # Only the Iteration nests computing values which are then read need to be
+        # extended into the halo
+        readf = {f for f, _ in incoming} | {f for f, _, _ in freach}
+        extended = set()
+        for e in exprs:
+            if e.is_tensor and e.write in readf:
+                extended.update(i for i in chains.get(e, [])
+                                if i.dim in e.write._dist_dimensions)
+        for e in exprs:
+            if e.is_tensor and any(i in extended for i in chains.get(e, [])):
+                for d, side in product(e.write._dist_dimensions, (LEFT, RIGHT)):
+                    freach.setdefault((e.write, d, side), 0)
+
+        # The maximum period such that no value beyond the halo is ever accessed.
+        # Also, a halo exchange only provides valid values up to the size of the
+        # neighbour's domain
+        kmax = None
+        for (f, d, side), r in freach.items():
+            v = reach[(d, side)]
+            if v == 0:
+                continue
+            depth = min(getattr(f._size_halo[d], side.name),
+                        min(len(i) for i in f._distributor.decomposition[d]))
+            k = (depth - r) // v + 1
+            kmax = k if kmax is None else min(kmax, k)
+        if kmax is None:
+            raise ValueError("no stencil")
+        if kmax < 2:
+            raise ValueError("halos too narrow; try a larger `halo-depth`")
+
+        return kmax, reach, incoming, extended
+
+
 class MPIStatusObject(LocalObject):
 
     dtype = type('MPI_Status', (c_void_p,), {})
@@ -921,18 +1420,33 @@ class MPIMsg(CompositeObject):
     def npeers(self):
         return len(self._halos)
 
+    def _buffer_shape(self, function, halo):
+        """The shape of the send/recv buffers for the peer ``halo``."""
+        shape = []
+        for dim, side in zip(*halo):
+            try:
+                shape.append(getattr(function._size_owned[dim], side.name))
+            except AttributeError:
+                assert side is CENTER
+                shape.append(function._size_domain[dim])
+        return shape
+
+    def _mem_nbytes(self, alias=None):
+        """
+        The amount of memory, in bytes, taken by the send/recv buffers allocated
+        for all peers, without actually allocating them.
+        """
+        function = alias or self.function
+        itemsize = np.dtype(function.dtype).itemsize
+        return sum(2*reduce(mul, self._buffer_shape(function, i))*itemsize
+                   for i in self.halos)
+
     def _arg_defaults(self, alias=None):
         function = alias or self.function
         for i, halo in enumerate(self.halos):
             entry = self.value[i]
             # Buffer size for this peer
-            shape = []
-            for dim, side in zip(*halo):
-                try:
-                    shape.append(getattr(function._size_owned[dim], side.name))
-                except AttributeError:
-                    assert side is CENTER
-                    shape.append(function._size_domain[dim])
+            shape = self._buffer_shape(function, halo)
             entry.sizes = (c_int*len(shape))(*shape)
             # Allocate the send/recv buffers
             size = reduce(mul, shape)
@@ -1005,6 +1519,46 @@ class MPIMsgEnriched(MPIMsg):
         return {self.name: self.value}
 
 
+class MPIMsgPersistent(MPIMsgEnriched):
+
+    """
+    An MPIMsgEnriched whose ``rrecv`` and ``rsend`` are persistent requests,
+    initialized upon buffer allocation and freed along with the buffers.
+    """
+
+    def __init__(self, name, function, halos):
+        super(MPIMsgPersistent, self).__init__(name, function, halos)
+        self._requests = []
+
+    def _C_memfree(self):
+        # The persistent requests must be freed before their buffers
+        if not MPI.Is_finalized():
+            for i in self._requests:
+                i.Free()
+        self._requests[:] = []
+        super(MPIMsgPersistent, self)._C_memfree()
+
+    def _arg_defaults(self, alias=None):
+        super(MPIMsgPersistent, self)._arg_defaults(alias)
+
+        function = alias or self.function
+        comm = function.grid.distributor.comm
+        ctype = dtype_to_ctype(function.dtype)
+        mpitype = MPI._typedict[np.dtype(function.dtype).char]
+        for i, halo in enumerate(self.halos):
+            entry = self.value[i]
+            size = reduce(mul, self._buffer_shape(function, halo))
+            bufg = np.ctypeslib.as_array((ctype*size).from_address(entry.bufg))
+            bufs = np.ctypeslib.as_array((ctype*size).from_address(entry.bufs))
+            rrecv = comm.Recv_init([bufs, mpitype], source=entry.fromrank, tag=13)
+            rsend = comm.Send_init([bufg, mpitype], dest=entry.torank, tag=13)
+            entry.rrecv = MPI._handleof(rrecv)
+            entry.rsend = MPI._handleof(rsend)
+            self._requests.extend([rrecv, rsend])
+
+        return {self.name: self.value}
+
+
 class MPIRegion(CompositeObject):
 
     def __init__(self, name, arguments, owned):
@@ -1058,3 +1612,71 @@ class MPIRegion(CompositeObject):
 
     # Pickling support
     _pickle_args = ['name', 'arguments', 'owned']
+
+
+class MPIProfile(Object):
+
+    """
+    Per-neighbour halo exchange statistics. For each Function and each peer
+    rank, the halo exchange routines accumulate the bytes sent, the time spent
+    packing (gather) and unpacking (scatter) the halo buffers, and the time spent
+    waiting for the messages to complete. In C-land, this is a flat array of
+    doubles; in Python-land, after an Operator run, ``data`` is an array of
+    shape ``(len(functions), nprocs, len(metrics))``.
+    """
+
+    metrics = ('nbytes', 'pack', 'unpack', 'wait')
+
+    def __init__(self, name, functions=None, nprocs=1):
+        super(MPIProfile, self).__init__(name, POINTER(c_double))
+        self.functions = list(functions or [])
+        self.nprocs = nprocs
+        self.data = None
+
+    def offset(self, f):
+        """The position of the statistics of ``f`` within the flat array."""
+        if f.name not in self.functions:
+            self.functions.append(f.name)
+        self.nprocs = f.grid.distributor.nprocs
+        return self.functions.index(f.name)*self.nprocs*len(self.metrics)
+
+    def entry(self, peer, metric):
+        """The entry for ``metric`` of the neighbour ``peer``."""
+        return IndexedPointer(self, peer*len(self.metrics) + self.metrics.index(metric))
+
+    def _arg_defaults(self):
+        self.data = np.zeros((len(self.functions), self.nprocs, len(self.metrics)))
+        return {self.name: self.data.ctypes.data_as(self.dtype)}
+
+    # Pickling support
+    _pickle_args = ['name']
+    _pickle_kwargs = ['functions', 'nprocs']
+
+
+class HaloPeriod(Constant):
+
+    """
+    The number of timesteps between two consecutive halo exchanges in a
+    time-stepping Iteration built by a DeepHaloExchangeBuilder. Any value
+    between 1 and ``max_value``, which is determined by the halo depth, is
+    legal.
+    """
+
+    def __init__(self, *args, **kwargs):
+        if not self._cached():
+            super(HaloPeriod, self).__init__(*args, **kwargs)
+            self.max_value = kwargs.get('max_value', self._value)
+
+    @classmethod
+    def __dtype_setup__(cls, **kwargs):
+        return np.int32
+
+    def _arg_check(self, args, intervals):
+        super(HaloPeriod, self)._arg_check(args, intervals)
+        value = args[self.name]
+        if not 1 <= value <= self.max_value:
+            raise InvalidArgument("Illegal `%s=%d`: the halos are deep enough for "
+                                  "a period of at most %d timesteps"
+                                  % (self.name, value, self.max_value))
+
+    _pickle_kwargs = Constant._pickle_kwargs + ['max_value']
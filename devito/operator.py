@@ -5,18 +5,20 @@ from math import ceil
 
 from cached_property import cached_property
 import ctypes
+import numpy as np
+from sympy import sympify
 
 from devito.dle import transform
 from devito.dse import rewrite
 from devito.equation import Eq
-from devito.exceptions import InvalidOperator
+from devito.exceptions import InvalidArgument, InvalidOperator
 from devito.logger import info, perf, warning
 from devito.ir.equations import LoweredEq
 from devito.ir.clusters import clusterize
-from devito.ir.iet import (Callable, MetaCall, iet_build, iet_insert_decls,
-                           iet_insert_casts, derive_parameters)
+from devito.ir.iet import (Callable, MetaCall, Specializer, iet_build,
+                           iet_insert_decls, iet_insert_casts, derive_parameters)
 from devito.ir.stree import st_build
-from devito.mpi import MPI
+from devito.mpi import MPI, MPIProfile
 from devito.parameters import configuration
 from devito.profiling import create_profile
 from devito.symbolics import indexify
@@ -48,6 +50,12 @@ class Operator(Callable):
         * dle : str
             Aggressiveness of the Devito Loop Engine for loop-level
             optimization. Defaults to ``configuration['dle']``.
+        * specialize : bool
+            If True, the loop bounds, the array strides and the grid spacing,
+            as derived from the shape of the Functions at construction time,
+            are baked into the generated code as compile-time constants.
+            The resulting Operator can only be run on Functions of such shape.
+            Defaults to False.
 
     Examples
     --------
@@ -186,6 +194,12 @@ class Operator(Callable):
         iet, self._profiler = self._profile_sections(iet)
         iet = self._specialize_iet(iet, **kwargs)
 
+        # Optionally turn runtime-invariant arguments into compile-time constants
+        self._specialization = {}
+        self._specialized_shapes = {}
+        if kwargs.get('specialize', False):
+            iet = self._specialize_args(iet)
+
         # Derive all Operator parameters based on the IET
         parameters = derive_parameters(iet, True)
 
@@ -295,15 +309,64 @@ class Operator(Callable):
 
         return iet
 
+    def _specialize_args(self, iet):
+        """
+        Replace the Dimension bounds and the grid spacing with the values derived
+        from the shape of the input Functions. The shapes of the Functions are
+        also recorded, so that casts with constant strides can be generated.
+        """
+        functions = [i for i in self._input if i.is_DiscreteFunction and
+                     not i.is_SparseFunction]
+        grids = {i.grid for i in functions} - {None}
+        if len(grids) != 1:
+            # Nothing to specialize on
+            return iet
+        grid = grids.pop()
+
+        # Default Dimension arguments, as provided by the Functions' shapes
+        sizes = {}
+        for f in functions:
+            for d, s in zip(f.dimensions, f.shape):
+                sizes.setdefault(d, set()).add(s)
+        args = {}
+        for d in grid.dimensions:
+            if len(sizes.get(d, ())) == 1:
+                args.update(d._arg_defaults(_min=0, size=sizes[d].pop()))
+
+        mapper = {}
+        for d in grid.dimensions:
+            if d not in self._dimensions or d.size_name not in args:
+                continue
+            values = d._arg_values(args, self._dspace[d], grid)
+            mapper[d.symbolic_min] = values[d.min_name]
+            mapper[d.symbolic_max] = values[d.max_name]
+            mapper[d.symbolic_size] = args[d.size_name]
+        values = {k.name: v for k, v in mapper.items()}
+        values.update({k.name: v for k, v in grid.spacing_map.items()})
+        # Note: cast to Python float so that no digits are lost in the generated code
+        mapper.update({k: sympify(float(v)) for k, v in grid.spacing_map.items()})
+
+        iet = Specializer(mapper).visit(iet)
+        for k, (root, local) in list(self._func_table.items()):
+            if local:
+                body = Specializer(mapper).visit(root.body)
+                self._func_table[k] = MetaCall(root._rebuild(body=body), True)
+
+        self._specialization = values
+        self._specialized_shapes = {f: f.shape_allocated for f in functions}
+
+        return iet
+
     def _finalize(self, iet, parameters):
+        shapes = self._specialized_shapes
         iet = iet_insert_decls(iet, parameters)
-        iet = iet_insert_casts(iet, parameters)
+        iet = iet_insert_casts(iet, parameters, shapes)
 
         # Now do the same to each ElementalFunction
         for k, (root, local) in list(self._func_table.items()):
             if local:
                 body = iet_insert_decls(root.body, root.parameters)
-                body = iet_insert_casts(body, root.parameters)
+                body = iet_insert_casts(body, root.parameters, shapes)
                 self._func_table[k] = MetaCall(root._rebuild(body=body), True)
 
         return iet
@@ -362,6 +425,15 @@ class Operator(Callable):
             args.update(o._arg_values(args, **kwargs))
 
         # Sanity check
+        for k, v in self._specialization.items():
+            if k in args and args[k] != v:
+                raise InvalidArgument("Operator specialized for `%s=%s`, but got `%s`"
+                                      % (k, v, args[k]))
+        for f, shape in self._specialized_shapes.items():
+            if args[f.name].shape[1:] != shape[1:]:
+                raise InvalidArgument("Operator specialized for `%s` of shape `%s`, "
+                                      "but got shape `%s`" %
+                                      (f.name, shape, args[f.name].shape))
         for p in self.parameters:
             p._arg_check(args, self._dspace[p])
         for d in self.dimensions:
@@ -557,6 +629,11 @@ class Operator(Callable):
 
         summary = self._profiler.summary(args, self._dtype, reduce_over='apply')
 
+        # Add in the per-neighbour halo exchange statistics, if collected
+        for i in self.objects:
+            if isinstance(i, MPIProfile):
+                summary.add_comms(i, args.comm)
+
         if summary.globals:
             indent = " "*2
 
@@ -601,6 +678,17 @@ class Operator(Callable):
                 perf("%s* %s%s computed in %.2f s"
                      % (indent, name, rank, fround(v.time)))
 
+        # Emit the halo exchange statistics, summed over all neighbours
+        if summary.comms:
+            perf("Halo exchange performance indicators")
+            nbytes = summary.comm_matrix('nbytes')
+            times = [summary.comm_matrix(i) for i in ('pack', 'unpack', 'wait')]
+            for rank in range(len(nbytes)):
+                perf("%s* [rank%d] sent %.2f MB to %d peers; pack %.2f s, unpack %.2f s, "
+                     "wait %.2f s" % (indent, rank, nbytes[rank].sum()/10**6,
+                                      (nbytes[rank] > 0).sum(),
+                                      *[fround(i[rank].sum()) for i in times]))
+
         perf("Configuration:  %s" % self._state['optimizations'])
 
         return summary
@@ -635,6 +723,76 @@ class Operator(Callable):
 
         return summary
 
+    def estimate_memory(self, **kwargs):
+        """
+        Estimate the amount of memory, in bytes, required to run the Operator,
+        without allocating any data.
+
+        Parameters
+        ----------
+        **kwargs
+            The same arguments that would be passed to ``apply``, e.g. to override
+            a Function or a Dimension bound.
+
+        Returns
+        -------
+        A dict mapping ``'functions'``, ``'snapshots'``, ``'temporaries'`` and
+        ``'mpi'`` to dicts ``{name: nbytes}``, and ``'total'`` to the overall
+        number of bytes. ``'functions'`` includes the halo, the padding and the
+        time buffers of the input Functions; ``'snapshots'`` the TimeFunctions
+        saving all timesteps; ``'temporaries'`` the Arrays introduced by the
+        compiler; ``'mpi'`` the halo exchange buffers.
+        """
+        summary = OrderedDict([(i, OrderedDict()) for i in
+                               ('functions', 'snapshots', 'temporaries', 'mpi')])
+
+        # Data carried by the input Functions, as well as the Dimension sizes
+        # that would be inferred from them
+        args = {}
+        for p in self.input:
+            if not p.is_DiscreteFunction:
+                continue
+            f = kwargs.get(p.name, p)
+            if isinstance(f, np.ndarray):
+                nbytes = f.nbytes
+                f = p
+            else:
+                nbytes = reduce(mul, f.shape_allocated, 1)*np.dtype(f.dtype).itemsize
+            if p.is_TimeFunction and not p._time_buffering:
+                summary['snapshots'][p.name] = nbytes
+            else:
+                summary['functions'][p.name] = nbytes
+            for d, s in zip(p.indices, f.shape):
+                args.update({k: v for k, v in d._arg_defaults(_min=0, size=s).items()
+                             if k not in args})
+
+        # Dimension arguments (e.g., to size the compiler-generated temporaries)
+        grids = {getattr(p, 'grid', None) for p in self.input} - {None}
+        grid = grids.pop() if len(grids) == 1 else None
+        dag = DAG(self.dimensions,
+                  [(i, i.parent) for i in self.dimensions if i.is_Derived])
+        for d in reversed(dag.topological_sort()):
+            args.update(d._arg_values(args, self._dspace[d], grid, **dict(kwargs)))
+
+        roots = [self] + [i.root for i in self._func_table.values()]
+        for i in derive_parameters(roots):
+            if i.is_Array:
+                size = reduce(mul, i.symbolic_shape, 1)
+                size = size.subs({j: args[j.name] for j in size.free_symbols
+                                  if j.name in args})
+                summary['temporaries'][i.name] = int(size)*np.dtype(i.dtype).itemsize
+
+        # MPI message buffers
+        for i in self.objects:
+            if hasattr(i, '_mem_nbytes'):
+                f = kwargs.get(i.function.name)
+                f = f if getattr(f, 'is_DiscreteFunction', False) else None
+                summary['mpi'][i.name] = i._mem_nbytes(f)
+
+        summary['total'] = sum(sum(v.values()) for v in summary.values())
+
+        return summary
+
     # Pickling support
 
     def __getstate__(self):
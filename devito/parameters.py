@@ -117,6 +117,7 @@ env_vars_mapper = {
     'DEVITO_DLE': 'dle',
     'DEVITO_OPENMP': 'openmp',
     'DEVITO_MPI': 'mpi',
+    'DEVITO_HALO_DEPTH': 'halo-depth',
     'DEVITO_AUTOTUNING': 'autotuning',
     'DEVITO_LOGGING': 'log-level',
     'DEVITO_FIRST_TOUCH': 'first-touch',
@@ -8,6 +8,7 @@ from time import time as seq_time
 import os
 
 from cached_property import cached_property
+import numpy as np
 
 from devito.ir.iet import (Call, ExpressionBundle, List, TimedList, Section,
                            FindNodes, Transformer)
@@ -277,11 +278,13 @@ class PerformanceSummary(OrderedDict):
     PerfKey = namedtuple('PerfKey', 'name rank')
     PerfInput = namedtuple('PerfInput', 'time ops points traffic sops itershapes')
     PerfEntry = namedtuple('PerfEntry', 'time gflopss gpointss oi ops itershapes')
+    CommKey = namedtuple('CommKey', 'name metric')
 
     def __init__(self, *args, **kwargs):
         super(PerformanceSummary, self).__init__(*args, **kwargs)
         self.input = OrderedDict()
         self.globals = {}
+        self.comms = OrderedDict()
 
     def add(self, name, rank, time,
             ops=None, points=None, traffic=None, sops=None, itershapes=None):
@@ -350,6 +353,28 @@ class PerformanceSummary(OrderedDict):
 
         self.globals['fdlike'] = self.PerfEntry(time, None, gpointss, None, None, None)
 
+    def add_comms(self, profile, comm):
+        """
+        Add the per-neighbour halo exchange statistics collected in ``profile``,
+        an MPIProfile, on all ranks of ``comm``. For each Function and metric, a
+        rank-by-rank matrix is stored, whose entry ``[i, j]`` is the value
+        recorded by rank ``i`` for the neighbour ``j``.
+        """
+        data = np.array(comm.allgather(profile.data))
+        for i, name in enumerate(profile.functions):
+            for j, metric in enumerate(profile.metrics):
+                self.comms[self.CommKey(name, metric)] = data[:, i, :, j]
+
+    def comm_matrix(self, metric='nbytes', name=None):
+        """
+        The rank-by-rank communication matrix for ``metric`` (one of ``nbytes``,
+        ``pack``, ``unpack`` and ``wait``), summed over all Functions, unless a
+        Function ``name`` is provided. None if no statistics were collected.
+        """
+        matrices = [v for k, v in self.comms.items()
+                    if k.metric == metric and name in (None, k.name)]
+        return sum(matrices) if matrices else None
+
     @property
     def gflopss(self):
         return OrderedDict([(k, v.gflopss) for k, v in self.items()])
@@ -342,6 +342,14 @@ class IndexedPointer(sympy.Expr):
     def index(self):
         return self._index
 
+    @property
+    def function(self):
+        return self.base.function
+
+    @property
+    def dtype(self):
+        return self.function.dtype
+
     def __str__(self):
         return "%s%s" % (self.base, ''.join('[%s]' % i for i in self.index))
 
@@ -119,7 +119,10 @@ class CodePrinter(C99CodePrinter):
         return expr.__str__()
 
     _print_Byref = _print_IntDiv
-    _print_IndexedPointer = _print_IntDiv
+
+    def _print_IndexedPointer(self, expr):
+        indices = ''.join('[%s]' % self._print(i) for i in expr.index)
+        return "%s%s" % (expr.base, indices)
 
     def _print_TrigonometricFunction(self, expr):
         func_name = str(expr.func)
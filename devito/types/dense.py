@@ -1,6 +1,8 @@
 from collections import namedtuple
+from contextlib import contextmanager
 from ctypes import POINTER, Structure, c_void_p, c_int, cast, byref
 from functools import wraps, reduce
+from io import BytesIO
 from math import ceil
 from operator import mul
 
@@ -10,7 +12,7 @@ from psutil import virtual_memory
 from cached_property import cached_property
 from cgen import Struct, Value
 
-from devito.builtins import assign
+from devito.builtins import first_touch
 from devito.data import (DOMAIN, OWNED, HALO, NOPAD, FULL, LEFT, CENTER, RIGHT,
                          Data, default_allocator)
 from devito.exceptions import InvalidArgument
@@ -72,7 +74,14 @@ class DiscreteFunction(AbstractCachedFunction, ArgProvider):
             # Data-related properties and data initialization
             self._data = None
             self._first_touch = kwargs.get('first_touch', configuration['first-touch'])
-            self._allocator = kwargs.get('allocator', default_allocator())
+            if isinstance(self._first_touch, dict):
+                # Runtime arguments of the consuming Operator (e.g., block shape)
+                self._first_touch_args = self._first_touch
+                self._first_touch = True
+            else:
+                self._first_touch_args = {}
+            self._allocator = kwargs.get('allocator') or \
+                default_allocator(self.size_allocated*np.dtype(self.dtype).itemsize)
             initializer = kwargs.get('initializer')
             if initializer is None or callable(initializer):
                 # Initialization postponed until the first access to .data
@@ -114,8 +123,12 @@ class DiscreteFunction(AbstractCachedFunction, ArgProvider):
                 self._data = Data(self.shape_allocated, self.dtype,
                                   modulo=self._mask_modulo, allocator=self._allocator,
                                   distributor=self._distributor)
-                if self._first_touch:
-                    assign(self, 0)
+                # Memory carrying meaningful values (e.g., recycled or caller-owned
+                # buffers) mustn't be overwritten
+                memfree_args = self._data._memfree_args
+                initialized = self._allocator._is_initialized(memfree_args)
+                if self._first_touch and not initialized:
+                    first_touch(self, **self._first_touch_args)
                 if callable(self._initializer):
                     if self._first_touch:
                         warning("`first touch` together with `initializer` causing "
@@ -125,7 +138,7 @@ class DiscreteFunction(AbstractCachedFunction, ArgProvider):
                     except ValueError:
                         # Perhaps user only wants to initialise the physical domain
                         self._initializer(self.data)
-                else:
+                elif not initialized and not self._allocator._is_zeroed(memfree_args):
                     self.data_with_halo.fill(0)
             return func(self)
         return wrapper
@@ -574,6 +587,130 @@ class DiscreteFunction(AbstractCachedFunction, ArgProvider):
             return tuple(self._distributor.glb_slices.get(d, slice(0, s))
                          for s, d in zip(self.shape, self.dimensions))
 
+    def dump(self, path):
+        """
+        Write the domain data values to a file, in ``.npy`` format.
+
+        Parameters
+        ----------
+        path : str
+            The file path.
+
+        Notes
+        -----
+        In an MPI context, the file contains the *global* domain, into which each
+        MPI rank writes its own subdomain concurrently, through collective MPI-IO.
+        The file may thus be loaded with any domain decomposition, or without MPI
+        at all (e.g., through ``numpy.load``).
+        """
+        if self._distributor is None or self._distributor.nprocs == 1:
+            with open(path, 'wb') as f:
+                np.save(f, np.asarray(self.data_ro_domain))
+            return
+
+        # The header, written by rank 0 only, carries the global shape
+        header = BytesIO()
+        np.lib.format.write_array_header_1_0(header, {
+            'descr': np.lib.format.dtype_to_descr(np.dtype(self.dtype)),
+            'fortran_order': False,
+            'shape': self._mpiio_shape
+        })
+        header = header.getvalue()
+
+        fh = MPI.File.Open(self._distributor.comm, path,
+                           MPI.MODE_WRONLY | MPI.MODE_CREATE)
+        fh.Set_size(0)
+        if self._distributor.myrank == 0:
+            fh.Write_at(0, header)
+        with self._mpiio_view(fh, len(header), self.dtype):
+            fh.Write_all(np.ascontiguousarray(self.data_ro_domain))
+        fh.Close()
+
+        # Upon return, the file is complete, whatever the MPI rank
+        self._distributor.comm.Barrier()
+
+    def load(self, path):
+        """
+        Read the domain data values from a file, in ``.npy`` format.
+
+        Parameters
+        ----------
+        path : str
+            The file path. The file must contain an array with the same (global)
+            shape as the domain. Its values are cast to ``self.dtype``.
+
+        Notes
+        -----
+        In an MPI context, each MPI rank reads its own subdomain concurrently,
+        through collective MPI-IO. The file may have been written with a different
+        domain decomposition, or without MPI at all (e.g., through ``numpy.save``).
+        """
+        if self._distributor is None or self._distributor.nprocs == 1:
+            data = np.load(path, mmap_mode='r')
+            self._mpiio_check(path, data.shape, False)
+            self.data[:] = data
+            return
+
+        comm = self._distributor.comm
+
+        # The header is read by rank 0 only
+        if self._distributor.myrank == 0:
+            with open(path, 'rb') as f:
+                if np.lib.format.read_magic(f) == (1, 0):
+                    header = np.lib.format.read_array_header_1_0(f)
+                else:
+                    header = np.lib.format.read_array_header_2_0(f)
+                header += (f.tell(),)
+        else:
+            header = None
+        shape, fortran_order, dtype, offset = comm.bcast(header, root=0)
+        self._mpiio_check(path, shape, fortran_order)
+
+        data = np.empty(self.shape, dtype=dtype)
+        fh = MPI.File.Open(comm, path, MPI.MODE_RDONLY)
+        with self._mpiio_view(fh, offset, dtype):
+            fh.Read_all(data)
+        fh.Close()
+
+        self.data_domain._local[:] = data
+
+    @property
+    def _mpiio_shape(self):
+        """The global shape of the domain, as written to file."""
+        return tuple(dec.size if dec is not None else s
+                     for dec, s in zip(self._decomposition, self.shape))
+
+    def _mpiio_check(self, path, shape, fortran_order):
+        if tuple(shape) != self._mpiio_shape:
+            raise ValueError("`%s` contains an array of shape %s, but the domain "
+                             "of `%s` has shape %s" % (path, tuple(shape), self.name,
+                                                       self._mpiio_shape))
+        if fortran_order:
+            raise ValueError("`%s` contains an array in Fortran order, which is "
+                             "not supported" % path)
+
+    @contextmanager
+    def _mpiio_view(self, fh, offset, dtype):
+        """
+        Set the view of the MPI file ``fh`` to the calling MPI rank's subdomain,
+        stored, as part of the global domain, from ``offset`` bytes onwards.
+        """
+        etype = MPI._typedict[np.dtype(dtype).char]
+        if any(s == 0 for s in self.shape):
+            # Nothing to read/write, but still part of the collective operation
+            fh.Set_view(offset, etype, etype)
+            yield
+            return
+        starts = [dec.loc_abs_min if dec is not None else 0
+                  for dec in self._decomposition]
+        filetype = etype.Create_subarray(self._mpiio_shape, self.shape, starts)
+        filetype.Commit()
+        fh.Set_view(offset, etype, filetype)
+        try:
+            yield
+        finally:
+            filetype.Free()
+
     @cached_property
     def space_dimensions(self):
         """Tuple of Dimensions defining the physical space."""
@@ -810,6 +947,9 @@ class DiscreteFunction(AbstractCachedFunction, ArgProvider):
         if key.dtype != self.dtype:
             warning("Data type %s of runtime value `%s` does not match the "
                     "Function data type %s" % (key.dtype, self.name, self.dtype))
+        if not key.flags.c_contiguous:
+            # The generated code only takes the base address, not the strides
+            raise InvalidArgument("Runtime value `%s` is not C-contiguous" % self.name)
         for i, s in zip(self.dimensions, key.shape):
             i._arg_check(args, s, intervals[i])
 
@@ -821,6 +961,16 @@ class DiscreteFunction(AbstractCachedFunction, ArgProvider):
     _pickle_kwargs = AbstractCachedFunction._pickle_kwargs +\
         ['grid', 'staggered', 'initializer']
 
+    def __getnewargs_ex__(self):
+        args, kwargs = super(DiscreteFunction, self).__getnewargs_ex__()
+        # Shareable data (e.g., in shared memory) is pickled by reference
+        if self._data is not None:
+            allocator = self._allocator._attach(self._data._memfree_args)
+            if allocator is not None:
+                kwargs.update({'initializer': None, 'first_touch': False,
+                               'allocator': allocator})
+        return args, kwargs
+
 
 class Function(DiscreteFunction, Differentiable):
     """
@@ -863,7 +1013,15 @@ class Function(DiscreteFunction, Differentiable):
     allocator : MemoryAllocator, optional
         Controller for memory allocation. To be used, for example, when one wants
         to take advantage of the memory hierarchy in a NUMA architecture. Refer to
-        `default_allocator.__doc__` for more information.
+        `default_allocator.__doc__` for more information. Use an ExternalAllocator
+        to wrap a caller-owned buffer without copying it.
+    first_touch : bool or dict, optional
+        If True, data is zero-initialized in parallel upon allocation, through
+        loops having the same structure as those of the time-stepping Operators,
+        so that NUMA pages get placed close to the threads computing on them.
+        A dict of runtime arguments of the consuming Operator (e.g., block shape,
+        ``nthreads``) may be provided to match its schedule exactly. Defaults
+        to ``configuration['first-touch']``.
     padding : int or tuple of ints, optional
         .. deprecated:: shouldn't be used; padding is now automatically inserted.
 
@@ -997,6 +1155,8 @@ class Function(DiscreteFunction, Differentiable):
                 halo = (left_points, right_points)
             else:
                 raise TypeError("`space_order` must be int or 3-tuple of ints")
+            depth = configuration['halo-depth']
+            halo = tuple(i*depth for i in halo)
             base = [halo if i.is_Space else (0, 0) for i in self.dimensions]
             # left-/right-staggering require extra points
             extra = [(-i, 0) if i < 0 else (0, i) for i in self.staggered]
@@ -1140,7 +1300,15 @@ class TimeFunction(Function):
     allocator : MemoryAllocator, optional
         Controller for memory allocation. To be used, for example, when one wants
         to take advantage of the memory hierarchy in a NUMA architecture. Refer to
-        `default_allocator.__doc__` for more information.
+        `default_allocator.__doc__` for more information. Use an ExternalAllocator
+        to wrap a caller-owned buffer without copying it.
+    first_touch : bool or dict, optional
+        If True, data is zero-initialized in parallel upon allocation, through
+        loops having the same structure as those of the time-stepping Operators,
+        so that NUMA pages get placed close to the threads computing on them.
+        A dict of runtime arguments of the consuming Operator (e.g., block shape,
+        ``nthreads``) may be provided to match its schedule exactly. Defaults
+        to ``configuration['first-touch']``.
     padding : int or tuple of ints, optional
         .. deprecated:: shouldn't be used; padding is now automatically inserted.
 
@@ -48,6 +48,21 @@ class Grid(ArgProvider):
     comm : MPI communicator, optional
         The set of processes over which the grid is distributed. Only relevant in
         case of MPI execution.
+    topology : tuple, optional
+        The number of MPI processes along each Dimension. An entry may be an int,
+        e.g. 1 to leave the Dimension undecomposed, or ``'*'``, in which case it
+        is computed so as to minimize the halo surface. Defaults to ``'*'`` along
+        all Dimensions. Only relevant in case of MPI execution.
+    halo : int or tuple of ints, optional
+        The expected halo width, along each Dimension, of the Functions defined
+        on this Grid. Used to weigh the halo surface when computing the topology.
+        Defaults to 1. Only relevant in case of MPI execution.
+    splits : tuple, optional
+        The split points along each Dimension, that is the global indices at
+        which the subdomains after the first one begin, or None to split the
+        Dimension evenly. Defaults to None along all Dimensions. Only relevant
+        in case of MPI execution; see ``devito.mpi.balanced_splits`` to compute
+        load-balanced split points.
 
     Examples
     --------
@@ -99,7 +114,7 @@ class Grid(ArgProvider):
 
     def __init__(self, shape, extent=None, origin=None, dimensions=None,
                  time_dimension=None, dtype=np.float32, subdomains=None,
-                 comm=None):
+                 comm=None, topology=None, halo=None, splits=None):
         self._shape = as_tuple(shape)
         self._extent = as_tuple(extent or tuple(1. for _ in self.shape))
         self._dtype = dtype
@@ -139,7 +154,11 @@ class Grid(ArgProvider):
         else:
             raise ValueError("`time_dimension` must be None or of type TimeDimension")
 
-        self._distributor = Distributor(self.shape, self.dimensions, comm)
+        self._topology = topology
+        self._halo = halo
+        self._splits = splits
+        self._distributor = Distributor(self.shape, self.dimensions, comm,
+                                        topology=topology, halo=halo, splits=splits)
 
     def __repr__(self):
         return "Grid[extent=%s, shape=%s, dimensions=%s]" % (
@@ -281,9 +300,16 @@ class Grid(ArgProvider):
         return state
 
     def __setstate__(self, state):
+        # Grids pickled before `topology`, `halo` and `splits` were introduced
+        # lack the corresponding attributes
+        state = dict(state)
+        for k in ['_topology', '_halo', '_splits']:
+            state.setdefault(k, None)
         for k, v in state.items():
             setattr(self, k, v)
-        self._distributor = Distributor(self.shape, self.dimensions)
+        self._distributor = Distributor(self.shape, self.dimensions,
+                                        topology=self._topology, halo=self._halo,
+                                        splits=self._splits)
 
 
 class SubDomain(object):
@@ -1,4 +1,6 @@
 from collections import OrderedDict
+from contextlib import contextmanager
+from functools import wraps
 from itertools import product
 
 import sympy
@@ -20,6 +22,29 @@ __all__ = ['SparseFunction', 'SparseTimeFunction', 'PrecomputedSparseFunction',
            'PrecomputedSparseTimeFunction']
 
 
+def _cached_plan(func):
+    """
+    Decorator. Turn a method computing (part of) the plan through which sparse data
+    is scattered/gathered across the MPI ranks into a property, whose value is
+    cached until the sparse points move (see ``AbstractSparseFunction._dist_validate``).
+    Accessing the property is thus a collective operation.
+    """
+    @wraps(func)
+    def wrapper(self):
+        try:
+            with self._dist_planned():
+                try:
+                    return self._dist_plan[func.__name__]
+                except KeyError:
+                    ret = self._dist_plan[func.__name__] = func(self)
+                    return ret
+        except AttributeError as e:
+            # Or else `Differentiable.__getattr__` would mask the actual error
+            raise RuntimeError("Couldn't compute `%s` of `%s`: %s"
+                               % (func.__name__, self.name, e)) from e
+    return property(wrapper)
+
+
 class AbstractSparseFunction(DiscreteFunction, Differentiable):
 
     """
@@ -41,6 +66,11 @@ class AbstractSparseFunction(DiscreteFunction, Differentiable):
             self._npoint = kwargs['npoint']
             self._space_order = kwargs.get('space_order', 0)
 
+            # The scatter/gather plan, computed lazily and then cached
+            self._dist_plan = {}
+            self._dist_plan_key = None
+            self._dist_plan_validated = False
+
             # Dynamically add derivative short-cuts
             self._fd = generate_fd_shortcuts(self)
 
@@ -107,7 +137,7 @@ class AbstractSparseFunction(DiscreteFunction, Differentiable):
             ret.append(tuple(product(*support)))
         return tuple(ret)
 
-    @property
+    @_cached_plan
     def _dist_datamap(self):
         """
         Mapper ``M : MPI rank -> required sparse data``.
@@ -119,7 +149,7 @@ class AbstractSparseFunction(DiscreteFunction, Differentiable):
                 ret.setdefault(r, []).append(i)
         return {k: filter_ordered(v) for k, v in ret.items()}
 
-    @property
+    @_cached_plan
     def _dist_scatter_mask(self):
         """
         A mask to index into ``self.data``, which creates a new data array that
@@ -143,18 +173,18 @@ class AbstractSparseFunction(DiscreteFunction, Differentiable):
         """
         return self._dist_scatter_mask[self._sparse_position]
 
-    @property
+    @_cached_plan
     def _dist_gather_mask(self):
         """
         A mask to index into the ``data`` received upon returning from
         ``self._dist_alltoall``. This mask creates a new data array in which
-        duplicate sparse data values have been discarded. The resulting data
-        array can thus be used to populate ``self.data``.
+        duplicate sparse data values have been discarded, and the remaining ones
+        sorted as in ``self.data``. The resulting data array can thus be used to
+        populate ``self.data``.
         """
         ret = list(self._dist_scatter_mask)
         mask = ret[self._sparse_position]
-        ret[self._sparse_position] = [mask.tolist().index(i)
-                                      for i in filter_ordered(mask)]
+        ret[self._sparse_position] = np.unique(mask, return_index=True)[1]
         return tuple(ret)
 
     @property
@@ -166,7 +196,7 @@ class AbstractSparseFunction(DiscreteFunction, Differentiable):
         """
         return self._dist_gather_mask[self._sparse_position]
 
-    @property
+    @_cached_plan
     def _dist_count(self):
         """
         A 2-tuple of comm-sized iterables, which tells how many sparse points
@@ -190,7 +220,7 @@ class AbstractSparseFunction(DiscreteFunction, Differentiable):
         ret += tuple(i for i, d in enumerate(self.indices) if d is not self._sparse_dim)
         return ret
 
-    @property
+    @_cached_plan
     def _dist_alltoall(self):
         """
         The metadata necessary to perform an ``MPI_Alltoallv`` distributing the
@@ -240,6 +270,49 @@ class AbstractSparseFunction(DiscreteFunction, Differentiable):
         """
         raise NotImplementedError
 
+    def _dist_validate(self):
+        """
+        Drop the cached scatter/gather plan if, since it was computed, any of the
+        sparse points has moved to a different grid cell.
+
+        Notes
+        -----
+        This is a collective operation, as the plan of a given MPI rank also
+        depends on the sparse points owned by all other MPI ranks.
+        """
+        key = self.gridpoints
+        outdated = key != self._dist_plan_key
+        if self.grid.distributor.comm.allreduce(outdated, op=MPI.LOR):
+            self._dist_plan = {}
+        self._dist_plan_key = key
+
+    @contextmanager
+    def _dist_planned(self):
+        """
+        Validate the scatter/gather plan, unless already done by an enclosing
+        ``_dist_planned``, so that the plan is validated once per collective
+        operation, however many times it's accessed.
+        """
+        if self._dist_plan_validated:
+            yield
+            return
+        self._dist_validate()
+        self._dist_plan_validated = True
+        try:
+            yield
+        finally:
+            self._dist_plan_validated = False
+
+    def _dist_buffer(self, name, shape, dtype):
+        """
+        A buffer for the sparse data in transit, allocated once per plan.
+        """
+        try:
+            return self._dist_plan[name]
+        except KeyError:
+            ret = self._dist_plan[name] = np.empty(shape, dtype=dtype)
+            return ret
+
     def _dist_scatter(self):
         """
         A ``numpy.ndarray`` containing up-to-date data values belonging
@@ -255,7 +328,6 @@ class AbstractSparseFunction(DiscreteFunction, Differentiable):
         """
         raise NotImplementedError
 
-    @memoized_meth
     def _arg_defaults(self, alias=None):
         key = alias or self
         mapper = {self: key}
@@ -641,11 +713,10 @@ class SparseFunction(AbstractSparseFunction):
     def gridpoints(self):
         if self.coordinates._data is None:
             raise ValueError("No coordinates attached to this SparseFunction")
-        ret = []
-        for coords in self.coordinates.data._local:
-            ret.append(tuple(int(sympy.floor((c - o.data)/i.spacing.data)) for c, o, i in
-                             zip(coords, self.grid.origin, self.grid.dimensions)))
-        return ret
+        origin = np.array([o.data for o in self.grid.origin])
+        spacing = np.array([i.spacing.data for i in self.grid.dimensions])
+        ret = np.floor((np.asarray(self.coordinates.data._local) - origin)/spacing)
+        return [tuple(i) for i in ret.astype(int).tolist()]
 
     def interpolate(self, expr, offset=0, increment=False, self_subs={}):
         """
@@ -765,7 +836,7 @@ class SparseFunction(AbstractSparseFunction):
         mapper = {self._sparse_dim: self._distributor.decomposition[self._sparse_dim]}
         return tuple(mapper.get(d) for d in self.dimensions)
 
-    @property
+    @_cached_plan
     def _dist_subfunc_alltoall(self):
         ssparse, rsparse = self._dist_count
 
@@ -798,34 +869,40 @@ class SparseFunction(AbstractSparseFunction):
         if distributor.nprocs == 1:
             return {self: data, self.coordinates: self.coordinates.data}
 
-        comm = distributor.comm
-        mpitype = MPI._typedict[np.dtype(self.dtype).char]
-
-        # Pack sparse data values so that they can be sent out via an Alltoallv
-        data = data[self._dist_scatter_mask]
-        data = np.ascontiguousarray(np.transpose(data, self._dist_reorder_mask))
-        # Send out the sparse point values
-        _, scount, sdisp, rshape, rcount, rdisp = self._dist_alltoall
-        scattered = np.empty(shape=rshape, dtype=self.dtype)
-        comm.Alltoallv([data, scount, sdisp, mpitype],
-                       [scattered, rcount, rdisp, mpitype])
-        data = scattered
-        # Unpack data values so that they follow the expected storage layout
-        data = np.ascontiguousarray(np.transpose(data, self._dist_reorder_mask))
-
-        # Pack (reordered) coordinates so that they can be sent out via an Alltoallv
-        coords = self.coordinates.data._local[self._dist_subfunc_scatter_mask]
-        # Send out the sparse point coordinates
-        _, scount, sdisp, rshape, rcount, rdisp = self._dist_subfunc_alltoall
-        scattered = np.empty(shape=rshape, dtype=self.coordinates.dtype)
-        comm.Alltoallv([coords, scount, sdisp, mpitype],
-                       [scattered, rcount, rdisp, mpitype])
-        coords = scattered
-
-        # Translate global coordinates into local coordinates
-        coords = coords - np.array(self.grid.origin_offset, dtype=self.dtype)
-
-        return {self: data, self.coordinates: coords}
+        # Unless the sparse points have moved, reuse the plan (masks, counts,
+        # displacements and buffers) computed upon the previous scatter
+        with self._dist_planned():
+            comm = distributor.comm
+            mpitype = MPI._typedict[np.dtype(self.dtype).char]
+
+            # Pack sparse data values so that they can be sent out via an Alltoallv
+            sshape, scount, sdisp, rshape, rcount, rdisp = self._dist_alltoall
+            sbuf = self._dist_buffer('sdata', sshape, self.dtype)
+            np.take(np.transpose(np.asarray(data), self._dist_reorder_mask),
+                    self._dist_subfunc_scatter_mask, axis=0, out=sbuf, mode='raise')
+            # Send out the sparse point values
+            rbuf = self._dist_buffer('rdata', rshape, self.dtype)
+            comm.Alltoallv([sbuf, scount, sdisp, mpitype],
+                           [rbuf, rcount, rdisp, mpitype])
+            # Unpack data values so that they follow the expected storage layout
+            rbuf = np.transpose(rbuf, self._dist_reorder_mask)
+            data = self._dist_buffer('data', rbuf.shape, self.dtype)
+            data[:] = rbuf
+
+            # Pack (reordered) coordinates so that they can be sent out via an Alltoallv
+            sshape, scount, sdisp, rshape, rcount, rdisp = self._dist_subfunc_alltoall
+            sbuf = self._dist_buffer('scoords', sshape, self.coordinates.dtype)
+            np.take(np.asarray(self.coordinates.data._local),
+                    self._dist_subfunc_scatter_mask, axis=0, out=sbuf, mode='raise')
+            # Send out the sparse point coordinates
+            coords = self._dist_buffer('rcoords', rshape, self.coordinates.dtype)
+            comm.Alltoallv([sbuf, scount, sdisp, mpitype],
+                           [coords, rcount, rdisp, mpitype])
+
+            # Translate global coordinates into local coordinates
+            coords -= np.array(self.grid.origin_offset, dtype=self.dtype)
+
+            return {self: data, self.coordinates: coords}
 
     def _dist_gather(self, data, coords):
         distributor = self.grid.distributor
@@ -834,30 +911,37 @@ class SparseFunction(AbstractSparseFunction):
         if distributor.nprocs == 1:
             return
 
-        comm = distributor.comm
-
-        # Pack sparse data values so that they can be sent out via an Alltoallv
-        data = np.ascontiguousarray(np.transpose(data, self._dist_reorder_mask))
-        # Send back the sparse point values
-        sshape, scount, sdisp, _, rcount, rdisp = self._dist_alltoall
-        gathered = np.empty(shape=sshape, dtype=self.dtype)
-        mpitype = MPI._typedict[np.dtype(self.dtype).char]
-        comm.Alltoallv([data, rcount, rdisp, mpitype],
-                       [gathered, scount, sdisp, mpitype])
-        # Unpack data values so that they follow the expected storage layout
-        gathered = np.ascontiguousarray(np.transpose(gathered, self._dist_reorder_mask))
-        self._data[:] = gathered[self._dist_gather_mask]
-
-        if coords is not None:
-            # Pack (reordered) coordinates so that they can be sent out via an Alltoallv
-            coords = coords + np.array(self.grid.origin_offset, dtype=self.dtype)
-            # Send out the sparse point coordinates
-            sshape, scount, sdisp, _, rcount, rdisp = self._dist_subfunc_alltoall
-            gathered = np.empty(shape=sshape, dtype=self.coordinates.dtype)
-            mpitype = MPI._typedict[np.dtype(self.coordinates.dtype).char]
-            comm.Alltoallv([coords, rcount, rdisp, mpitype],
+        # The plan is the one used by the last scatter, which this gather mirrors,
+        # and so are the buffers (the scatter send buffers are here receive buffers)
+        with self._dist_planned():
+            comm = distributor.comm
+
+            # Pack sparse data values so that they can be sent out via an Alltoallv
+            sshape, scount, sdisp, rshape, rcount, rdisp = self._dist_alltoall
+            rbuf = self._dist_buffer('rdata', rshape, self.dtype)
+            rbuf[:] = np.transpose(data, self._dist_reorder_mask)
+            # Send back the sparse point values
+            gathered = self._dist_buffer('sdata', sshape, self.dtype)
+            mpitype = MPI._typedict[np.dtype(self.dtype).char]
+            comm.Alltoallv([rbuf, rcount, rdisp, mpitype],
                            [gathered, scount, sdisp, mpitype])
-            self._coordinates.data._local[:] = gathered[self._dist_subfunc_gather_mask]
+            # Unpack data values so that they follow the expected storage layout
+            gathered = np.transpose(gathered, self._dist_reorder_mask)
+            self._data[:] = gathered[self._dist_gather_mask]
+
+            if coords is not None:
+                # Pack (reordered) coordinates to be sent out via an Alltoallv
+                sshape, scount, sdisp, rshape, rcount, rdisp = self._dist_subfunc_alltoall
+                rbuf = self._dist_buffer('rcoords', rshape, self.coordinates.dtype)
+                np.add(coords, np.array(self.grid.origin_offset, dtype=self.dtype),
+                       out=rbuf)
+                # Send out the sparse point coordinates
+                gathered = self._dist_buffer('scoords', sshape, self.coordinates.dtype)
+                mpitype = MPI._typedict[np.dtype(self.coordinates.dtype).char]
+                comm.Alltoallv([rbuf, rcount, rdisp, mpitype],
+                               [gathered, scount, sdisp, mpitype])
+                mask = self._dist_subfunc_gather_mask
+                self._coordinates.data._local[:] = gathered[mask]
 
         # Note: this method "mirrors" `_dist_scatter`: a sparse point that is sent
         # in `_dist_scatter` is here received; a sparse point that is received in
@@ -0,0 +1,273 @@
+import os
+import shutil
+import tempfile
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+__all__ = ['SnapshotStore', 'DiskSnapshotStore', 'ShuffleCodec', 'ZFPCodec',
+           'apply_forward', 'apply_reverse']
+
+
+class ShuffleCodec(object):
+    """
+    Lossless compression of floating-point arrays. The bytes are first shuffled,
+    so that the i-th bytes of all items are stored contiguously, and then
+    compressed with zlib. The shuffle makes the (smooth) wavefields much more
+    compressible, as the most significant bytes of neighbouring items tend to be
+    identical.
+
+    Parameters
+    ----------
+    level : int, optional
+        The zlib compression level, from 1 (fastest) to 9 (best compression).
+        Defaults to 1.
+    """
+
+    def __init__(self, level=1):
+        self.level = level
+
+    def compress(self, data):
+        data = np.ascontiguousarray(data)
+        shuffled = data.view(np.uint8).reshape(-1, data.itemsize).T
+        return zlib.compress(shuffled.tobytes(), self.level)
+
+    def decompress(self, buf, out):
+        shuffled = np.frombuffer(zlib.decompress(buf), dtype=np.uint8)
+        shuffled = shuffled.reshape(out.dtype.itemsize, -1).T
+        out[:] = np.ascontiguousarray(shuffled).view(out.dtype).reshape(out.shape)
+
+
+class ZFPCodec(object):
+    """
+    Error-bounded lossy compression of floating-point arrays through ZFP.
+
+    Parameters
+    ----------
+    tolerance : float
+        The maximum absolute error tolerated in the decompressed data.
+    """
+
+    def __init__(self, tolerance):
+        try:
+            import pyzfp
+        except ImportError:
+            raise ImportError("ZFP compression requires `pyzfp` to be installed")
+        self.pyzfp = pyzfp
+        self.tolerance = tolerance
+
+    def compress(self, data):
+        data = np.ascontiguousarray(data)
+        return self.pyzfp.compress(data, tolerance=self.tolerance)
+
+    def decompress(self, buf, out):
+        out[:] = self.pyzfp.decompress(buf, out.shape, out.dtype,
+                                       tolerance=self.tolerance)
+
+
+class SnapshotStore(object):
+    """
+    An in-memory store of compressed time slices (snapshots) of a TimeFunction,
+    such as the forward wavefield required by a gradient computation. Snapshots
+    are compressed as they are saved, and decompressed one at a time upon loading.
+
+    Parameters
+    ----------
+    compression : str or codec, optional
+        Either ``'lossless'``, for a ShuffleCodec, or ``'zfp'``, for a ZFPCodec,
+        or a codec object exposing ``compress`` and ``decompress``. Defaults to
+        ``'lossless'``.
+    **kwargs
+        Passed to the codec constructor, e.g. ``tolerance`` for ZFP.
+    """
+
+    _codecs = {'lossless': ShuffleCodec, 'zfp': ZFPCodec}
+
+    def __init__(self, compression='lossless', **kwargs):
+        if isinstance(compression, str):
+            try:
+                self.codec = self._codecs[compression](**kwargs)
+            except KeyError:
+                raise ValueError("Unknown compression `%s`; accepted values are %s"
+                                 % (compression, list(self._codecs)))
+        else:
+            self.codec = compression
+        self._snapshots = {}
+        self._nbytes_raw = 0
+
+    def __contains__(self, index):
+        return index in self._snapshots
+
+    def __len__(self):
+        return len(self._snapshots)
+
+    @property
+    def nbytes(self):
+        """The memory consumption of the compressed snapshots."""
+        return sum(len(i) for i in self._snapshots.values())
+
+    @property
+    def ratio(self):
+        """The compression ratio achieved so far."""
+        return self._nbytes_raw / max(self.nbytes, 1)
+
+    def save(self, index, data):
+        """Compress and store ``data`` as the snapshot ``index``."""
+        if index not in self._snapshots:
+            self._nbytes_raw += data.nbytes
+        self._snapshots[index] = self.codec.compress(data)
+
+    def load(self, index, out):
+        """Decompress the snapshot ``index`` into ``out``."""
+        self.codec.decompress(self._snapshots[index], out)
+
+    def close(self):
+        """Release the snapshots."""
+        self._snapshots.clear()
+
+
+class DiskSnapshotStore(object):
+    """
+    A store of time slices (snapshots) of a TimeFunction streamed to disk, one
+    ``.npy`` file per snapshot. Writes are performed by a background thread, so
+    that the I/O overlaps with the computation of the next timesteps. Upon loading
+    a snapshot, the one preceding it is prefetched, as the adjoint pass consumes
+    the snapshots backwards in time.
+
+    Parameters
+    ----------
+    path : str, optional
+        The directory in which the snapshots are written. Defaults to a new
+        temporary directory, removed upon `close`.
+    depth : int, optional
+        The maximum number of snapshots being written at any time. Once reached,
+        `save` blocks until the oldest write completes. Defaults to 2, that is
+        double buffering.
+    """
+
+    def __init__(self, path=None, depth=2):
+        if path is None:
+            self.path = tempfile.mkdtemp(prefix='devito-snapshots-')
+            self._owned = True
+        else:
+            os.makedirs(path, exist_ok=True)
+            self.path = path
+            self._owned = False
+        self.depth = depth
+        self._indices = set()
+        # A single worker serializes reads after writes of the same snapshot
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._writes = deque()
+        self._prefetched = {}
+
+    def __contains__(self, index):
+        return index in self._indices
+
+    def __len__(self):
+        return len(self._indices)
+
+    def _filename(self, index):
+        return os.path.join(self.path, '%d.npy' % index)
+
+    @property
+    def nbytes(self):
+        """The disk space consumed by the snapshots written so far."""
+        self.flush()
+        return sum(os.path.getsize(self._filename(i)) for i in self._indices)
+
+    def save(self, index, data):
+        """Asynchronously write ``data`` to disk as the snapshot ``index``."""
+        while len(self._writes) >= self.depth:
+            self._writes.popleft().result()
+        self._prefetched.pop(index, None)
+        # Copy, as the caller is free to overwrite `data` as soon as we return
+        self._writes.append(self._executor.submit(np.save, self._filename(index),
+                                                  np.array(data)))
+        self._indices.add(index)
+
+    def load(self, index, out):
+        """Read the snapshot ``index`` into ``out``, and prefetch ``index-1``."""
+        future = self._prefetched.pop(index, None)
+        if future is None:
+            future = self._executor.submit(np.load, self._filename(index))
+        if index - 1 in self._indices and index - 1 not in self._prefetched:
+            self._prefetched[index - 1] = self._executor.submit(np.load,
+                                                                self._filename(index - 1))
+        out[:] = future.result()
+
+    def flush(self):
+        """Block until all pending writes have completed."""
+        while self._writes:
+            self._writes.popleft().result()
+
+    def close(self):
+        """Wait for pending I/O and, if temporary, remove the snapshots."""
+        self.flush()
+        self._prefetched.clear()
+        self._executor.shutdown()
+        if self._owned:
+            shutil.rmtree(self.path, ignore_errors=True)
+
+
+def apply_forward(store, function, op, nsteps):
+    """
+    Run ``op`` for ``nsteps`` timesteps, saving to ``store`` every time slice of
+    ``function`` as soon as it is computed.
+
+    Parameters
+    ----------
+    store : SnapshotStore or DiskSnapshotStore
+        The store for the time slices.
+    function : TimeFunction
+        The (buffered) TimeFunction whose time slices are saved.
+    op : CheckpointOperator
+        The Operator computing ``function``.
+    nsteps : int
+        The number of timesteps.
+    """
+    # Use the allocated data, rather than the domain region, as it's contiguous
+    data = function._data_allocated
+    nbuf = function._time_size
+
+    # The time slices defined before the first timestep (i.e., initial conditions)
+    for i in range(op.start_offset + 1):
+        store.save(i, data[i % nbuf])
+
+    for k in range(nsteps):
+        op.apply(k, k + 1)
+        i = k + op.start_offset + 1
+        store.save(i, data[i % nbuf])
+
+
+def apply_reverse(store, function, op, nsteps):
+    """
+    Run ``op`` for ``nsteps`` timesteps, backwards in time, loading from ``store``
+    the time slices of ``function`` accessed at each timestep. These are assumed
+    to be centered around the current timestep (e.g., ``t-1``, ``t`` and ``t+1``
+    for a TimeFunction with ``time_order=2``).
+
+    Parameters
+    ----------
+    store : SnapshotStore or DiskSnapshotStore
+        The store of the time slices.
+    function : TimeFunction
+        The (buffered) TimeFunction whose time slices are loaded.
+    op : CheckpointOperator
+        The Operator reading ``function``.
+    nsteps : int
+        The number of timesteps.
+    """
+    data = function._data_allocated
+    nbuf = function._time_size
+
+    # Moving backwards by one timestep only requires loading one new time slice
+    loaded = [None]*nbuf
+    for k in reversed(range(nsteps)):
+        t = k + op.start_offset
+        for i in range(t - nbuf//2, t - nbuf//2 + nbuf):
+            if loaded[i % nbuf] != i and i in store:
+                store.load(i, data[i % nbuf])
+                loaded[i % nbuf] = i
+        op.apply(k, k + 1)
@@ -5,6 +5,8 @@ from examples.seismic.acoustic.operators import (
     ForwardOperator, AdjointOperator, GradientOperator, BornOperator
 )
 from examples.checkpointing.checkpoint import DevitoCheckpoint, CheckpointOperator
+from examples.checkpointing.snapshots import (SnapshotStore, DiskSnapshotStore,
+                                              apply_forward, apply_reverse)
 from pyrevolve import Revolver
 
 
@@ -152,7 +154,8 @@ class AcousticWaveSolver(object):
                                       dt=kwargs.pop('dt', self.dt), **kwargs)
         return srca, v, summary
 
-    def gradient(self, rec, u, v=None, grad=None, vp=None, checkpointing=False, **kwargs):
+    def gradient(self, rec, u, v=None, grad=None, vp=None, checkpointing=False,
+                 store=None, compression=None, **kwargs):
         """
         Gradient modelling function for computing the adjoint of the
         Linearized Born modelling function, ie. the action of the
@@ -170,6 +173,15 @@ class AcousticWaveSolver(object):
             Stores the gradient field.
         vp : Function or float, optional
             The time-constant velocity.
+        checkpointing : bool, optional
+            If True, recompute the forward wavefield from a set of checkpoints.
+        store : SnapshotStore, DiskSnapshotStore or str, optional
+            If provided, recompute the forward wavefield storing every time slice
+            in the given store, or in a new one, either in memory (``'memory'``)
+            or streamed to disk (``'disk'``). A new store is closed upon return.
+        compression : str or codec, optional
+            The compression of the time slices stored in a new in-memory store,
+            ``'lossless'`` or ``'zfp'``. Implies ``store='memory'``.
 
         Returns
         -------
@@ -200,6 +212,38 @@ class AcousticWaveSolver(object):
             wrp = Revolver(cp, wrap_fw, wrap_rev, n_checkpoints, rec.data.shape[0]-2)
             wrp.apply_forward()
             summary = wrp.apply_reverse()
+        elif store is not None or compression is not None:
+            if store is None or store == 'memory':
+                store = SnapshotStore(compression or 'lossless')
+                owned = True
+            elif compression is not None:
+                raise ValueError("`compression` only applies to a new in-memory "
+                                 "store, not to `%s`" % store)
+            elif store == 'disk':
+                store = DiskSnapshotStore()
+                owned = True
+            elif isinstance(store, str):
+                raise ValueError("Unknown store `%s`; accepted values are "
+                                 "['memory', 'disk']" % store)
+            else:
+                owned = False
+
+            u = TimeFunction(name='u', grid=self.model.grid,
+                             time_order=2, space_order=self.space_order)
+            wrap_fw = CheckpointOperator(self.op_fwd(save=False), src=self.geometry.src,
+                                         u=u, vp=vp, dt=dt)
+            wrap_rev = CheckpointOperator(self.op_grad(save=False), u=u, v=v,
+                                          vp=vp, rec=rec, dt=dt, grad=grad)
+
+            # Run forward, storing the wavefield, then backward, loading it
+            nsteps = rec.data.shape[0] - 2
+            try:
+                apply_forward(store, u, wrap_fw, nsteps)
+                apply_reverse(store, u, wrap_rev, nsteps)
+            finally:
+                if owned:
+                    store.close()
+            summary = None
         else:
             summary = self.op_grad().apply(rec=rec, grad=grad, v=v, u=u, vp=vp,
                                            dt=dt, **kwargs)
@@ -0,0 +1,45 @@
+import os
+from unittest.mock import patch, mock_open
+
+import pytest
+
+from devito.archinfo import get_cpu_info
+
+
+def cpuinfo(sockets, cores):
+    lines = []
+    for s in range(sockets):
+        for c in range(cores):
+            lines.extend(['processor\t: %d' % (s*cores + c),
+                          'model name\t: Intel(R) Xeon(R) CPU',
+                          'flags\t\t: fpu avx avx2',
+                          'physical id\t: %d' % s,
+                          'cpu cores\t: %d' % cores,
+                          ''])
+    return '\n'.join(lines) + '\n'
+
+
+def listdir(nodes):
+    def _listdir(path):
+        if path == os.path.join('/sys', 'devices', 'system', 'node'):
+            return ['node%d' % i for i in range(nodes)] + ['online', 'possible']
+        raise OSError
+    return _listdir
+
+
+@pytest.mark.parametrize('sockets,cores,nodes,expected', [
+    (1, 4, 1, 1),
+    (2, 8, 2, 2),
+    (2, 8, 4, 4),  # E.g., sub-NUMA clustering
+    (2, 8, None, 2),  # No sysfs, assume one NUMA node per socket
+])
+def test_sockets_numa_nodes(sockets, cores, nodes, expected):
+    with patch('devito.archinfo.open', mock_open(read_data=cpuinfo(sockets, cores)),
+               create=True), \
+            patch('devito.archinfo.lscpu', return_value={}), \
+            patch('os.listdir', side_effect=listdir(nodes) if nodes else OSError):
+        info = get_cpu_info.func()
+
+    assert info['physical'] == sockets*cores
+    assert info['sockets'] == sockets
+    assert info['numa_nodes'] == expected
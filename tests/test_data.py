@@ -1,10 +1,19 @@
+import os
+import tempfile
+
 import pytest
 import numpy as np
+from unittest.mock import patch, mock_open
 
 from conftest import skipif
 from devito import (Grid, Function, TimeFunction, SparseTimeFunction, Dimension, # noqa
-                    Eq, Operator, ALLOC_GUARD, ALLOC_FLAT, configuration, switchconfig)
-from devito.data import LEFT, RIGHT, Decomposition, loc_data_idx, convert_index
+                    Eq, Operator, ALLOC_GUARD, ALLOC_FLAT, ExternalAllocator,
+                    MmapAllocator, PoolAllocator, clear_cache, configuration,
+                    switchconfig)
+from devito.data import (LEFT, RIGHT, ALLOC_ANON, ALLOC_HUGE, Data, Decomposition,
+                         loc_data_idx, convert_index, default_allocator)
+from devito.data.allocators import HugePageAllocator
+from devito.exceptions import InvalidArgument
 from devito.tools import as_tuple
 
 pytestmark = skipif('ops')
@@ -669,6 +678,21 @@ class TestDataDistributed(object):
         else:
             assert np.all(result4 == [[28, 27, 26]])
 
+    @pytest.mark.parallel(mode=4)
+    def test_getitem_reversed(self):
+        # Reversed slicing of uneven, multi-dimensional decompositions
+        grid = Grid(shape=(11, 6, 5))
+        glb_slices = tuple(grid.distributor.glb_slices[d] for d in grid.dimensions)
+        f = Function(name='f', grid=grid, space_order=0)
+        a = np.arange(11*6*5, dtype=np.float32).reshape(grid.shape)
+
+        f.data[:] = a
+
+        for idx in [(slice(None, None, -1),)*3,
+                    (slice(None, None, -1), slice(None), slice(None)),
+                    (slice(None), slice(None), slice(None, None, -1))]:
+            assert np.all(np.array(f.data[idx]) == a[idx][glb_slices])
+
     @pytest.mark.parallel(mode=4)
     def test_big_steps(self):
         # Test slicing with a step size > 1
@@ -1145,6 +1169,35 @@ class TestDataDistributed(object):
             # Too few entries for `shape` (two expected, for `y` and `dy`)
             assert True
 
+    @pytest.mark.parallel(mode=4)
+    def test_dump_load(self):
+        """
+        Test writing/reading distributed data to/from a single file, also with
+        a different domain decomposition.
+        """
+        grid = Grid(shape=(7, 10))
+        # All MPI ranks must use the same file
+        path = os.path.join(tempfile.gettempdir(), 'devito-test_dump_load.npy')
+
+        u = TimeFunction(name='u', grid=grid, space_order=2)
+        data = np.arange(2*7*10, dtype=np.float32).reshape(2, 7, 10)
+        u.data[:] = data
+        u.dump(path)
+        assert np.all(np.load(path) == data)
+
+        grid2 = Grid(shape=(7, 10), topology=(1, 4))
+        v = TimeFunction(name='v', grid=grid2, space_order=4)
+        v.load(path)
+        assert np.all(v.data_ro_domain._local == data[v.local_indices])
+
+        # The file contains no time dimension
+        w = Function(name='w', grid=grid)
+        with pytest.raises(ValueError):
+            w.load(path)
+
+        if grid.distributor.myrank == 0:
+            os.remove(path)
+
     @pytest.mark.parallel(mode=4)
     def test_misc_data(self):
         """
@@ -1220,6 +1273,200 @@ def test_oob_guard():
     Operator(Eq(u[2000, 0], 1.0)).apply()
 
 
+def test_dump_load(tmpdir):
+    """
+    Test writing/reading Function data to/from a file in ``.npy`` format.
+    """
+    path = str(tmpdir.join('u.npy'))
+
+    grid = Grid(shape=(4, 5))
+    u = Function(name='u', grid=grid, space_order=2)
+    data = np.arange(20, dtype=np.float32).reshape(4, 5)
+    u.data[:] = data
+    u.dump(path)
+    assert np.all(np.load(path) == data)
+
+    v = Function(name='v', grid=grid, dtype=np.float64)
+    v.load(path)
+    assert np.all(v.data == data)
+
+    np.save(path, data.T)
+    with pytest.raises(ValueError):
+        v.load(path)
+
+
+def test_mmap_allocator(tmpdir):
+    """
+    Test that a file-backed allocator can be used for saved wavefields.
+    """
+    allocator = MmapAllocator(path=str(tmpdir))
+
+    grid = Grid(shape=(4, 4))
+    u = TimeFunction(name='u', grid=grid, save=5, allocator=allocator)
+    assert np.all(u.data == 0.)
+
+    Operator(Eq(u.forward, u + 1.)).apply()
+    assert all(np.all(u.data[i] == i) for i in range(5))
+
+    # The backing files are not visible in the file system
+    assert not tmpdir.listdir()
+
+
+@switchconfig(develop_mode=False)
+def test_hugepage_allocator():
+    """
+    Test that large allocations are aligned to, and backed by, huge pages.
+    """
+    if not HugePageAllocator.available():
+        pytest.skip("Transparent huge pages not supported")
+
+    assert not isinstance(default_allocator(1024), HugePageAllocator)
+    allocator = default_allocator(HugePageAllocator.threshold)
+    assert isinstance(allocator, HugePageAllocator)
+
+    grid = Grid(shape=(4, 4))
+    u = Function(name='u', grid=grid, allocator=ALLOC_HUGE)
+    assert u._data_allocated.ctypes.data % HugePageAllocator.hugepage_size == 0
+
+    Operator(Eq(u, u + 1.)).apply()
+    assert np.all(u.data == 1.)
+
+
+@pytest.mark.parametrize('thp,expected', [
+    ('always [madvise] never', True),
+    ('always madvise [never]', False)
+])
+def test_hugepage_allocator_available(thp, expected):
+    """
+    Test that huge pages are deemed unavailable if disabled in the kernel,
+    whatever the allocators initialized before.
+    """
+    if not ALLOC_ANON.available():
+        pytest.skip("Anonymous memory mappings not supported")
+
+    with patch.object(HugePageAllocator, '_attempted_init', False), \
+            patch.object(HugePageAllocator, 'lib', None), \
+            patch('devito.data.allocators.open', mock_open(read_data=thp),
+                  create=True):
+        assert HugePageAllocator.available() is expected
+
+
+def test_pool_allocator():
+    """
+    Test that a pooling allocator recycles the buffers of dead Functions, and
+    that, by default, the recycled buffers are zero-initialized.
+    """
+    allocator = PoolAllocator(ALLOC_FLAT)
+
+    grid = Grid(shape=(4, 4))
+    for i in range(3):
+        u = TimeFunction(name='u', grid=grid, allocator=allocator)
+        assert np.all(u.data == 0.)
+        Operator(Eq(u.forward, u + 1.)).apply(time_M=0)
+        assert np.all(u.data[1] == 1.)
+        del u
+        clear_cache()
+
+    assert allocator.stats['misses'] == 1
+    assert allocator.stats['hits'] == 2
+    assert allocator.pooled > 0
+
+    allocator.clear()
+    assert allocator.pooled == 0
+
+
+def test_pool_allocator_nozero():
+    """
+    Test that, if zeroing is explicitly disabled, the recycled buffers retain
+    their content, and that they are not touched at all upon allocation.
+    """
+    allocator = PoolAllocator(ALLOC_FLAT, zero=False)
+
+    grid = Grid(shape=(4, 4))
+    u = Function(name='u', grid=grid, space_order=2, allocator=allocator)
+    u.data_with_halo[:] = 3.
+    del u
+    clear_cache()
+
+    with patch.object(Data, 'fill', side_effect=AssertionError), \
+            patch('devito.types.dense.first_touch', side_effect=AssertionError):
+        v = Function(name='v', grid=grid, space_order=2, allocator=allocator,
+                     first_touch=True)
+        assert np.all(v.data_with_halo == 3.)
+    assert allocator.stats['hits'] == 1
+
+
+@pytest.mark.parametrize('allocator', [ALLOC_ANON, ALLOC_HUGE, MmapAllocator()])
+def test_zeroed_allocators(allocator):
+    """
+    Test that no explicit zero-initialization takes place if the allocator
+    returns zero-initialized memory.
+    """
+    if not allocator.available():
+        pytest.skip("Allocator not supported")
+    assert allocator.is_zeroed
+
+    grid = Grid(shape=(4, 4))
+    u = Function(name='u', grid=grid, space_order=2, allocator=allocator)
+    with patch.object(Data, 'fill', side_effect=AssertionError):
+        assert np.all(u.data_with_halo == 0.)
+
+    Operator(Eq(u, u + 1.)).apply()
+    assert np.all(u.data == 1.)
+
+
+@switchconfig(autopadding=False)
+def test_external_allocator():
+    """
+    Test that a Function wraps a caller-owned buffer without copying it.
+    """
+    grid = Grid(shape=(4, 4))
+    # A 64-byte aligned buffer, including the halo
+    nbytes = 8*8*np.dtype(np.float32).itemsize
+    raw = np.zeros(nbytes + 64, dtype=np.uint8)
+    offset = -raw.ctypes.data % 64
+    array = raw[offset:offset + nbytes].view(np.float32).reshape(8, 8)
+    array[:] = 2.
+
+    # The caller's values are preserved, even with first touch on
+    u = Function(name='u', grid=grid, space_order=2, first_touch=True,
+                 allocator=ExternalAllocator(array))
+    assert np.all(u.data_with_halo == 2.)
+    assert np.shares_memory(u.data_with_halo, array)
+
+    Operator(Eq(u, u + 1.)).apply()
+    assert np.all(array[2:-2, 2:-2] == 3.)
+
+    # Shape mismatch
+    v = Function(name='v', grid=grid, space_order=1,
+                 allocator=ExternalAllocator(array))
+    with pytest.raises(ValueError):
+        v.data
+    # Non-contiguous or misaligned buffers
+    with pytest.raises(ValueError):
+        ExternalAllocator(array[:, ::2])
+    with pytest.raises(ValueError):
+        ExternalAllocator(raw[offset + 4:offset + 4 + nbytes].view(np.float32))
+
+    # A non-contiguous runtime value is rejected rather than misread
+    with pytest.raises(InvalidArgument):
+        Operator(Eq(u, u + 1.)).apply(u=np.zeros((8, 16), dtype=np.float32)[:, ::2])
+
+
+@pytest.mark.skipif(not hasattr(np, 'from_dlpack'), reason="Requires NumPy >= 1.22")
+def test_dlpack_export():
+    """
+    Test that the data of a Function can be exported without copying it.
+    """
+    grid = Grid(shape=(4, 4))
+    u = Function(name='u', grid=grid, space_order=2)
+    u.data[:] = 1.
+
+    exported = np.from_dlpack(u.data_with_halo)
+    assert np.shares_memory(exported, u.data_with_halo)
+    assert np.all(exported[2:-2, 2:-2] == 1.)
+
+
 # Skip for YASK because we can't guarantee contiguous memory
 @skipif('yask')
 def test_numpy_c_contiguous():
@@ -1,21 +1,25 @@
 from functools import reduce
 from operator import mul
 
-from sympy import Add
+from sympy import Add, sin
 import numpy as np
 import pytest
 
 from conftest import EVAL, skipif
-from devito import (Grid, Function, TimeFunction, SparseTimeFunction, SubDimension,
-                    Eq, Operator, solve, switchconfig)
-from devito.dle import BlockDimension, NThreads, transform
-from devito.dle.parallelizer import nhyperthreads
+from devito import (Grid, Constant, Function, TimeFunction, SparseFunction,
+                    SparseTimeFunction, Dimension, SubDimension, Eq, Inc, Operator,
+                    solve, switchconfig)
+from devito.dle import BlockDimension, Intel64Rewriter, NThreads, transform
+from devito.dle.parallelizer import Ompizer, ParallelRegion, nhyperthreads
 from devito.exceptions import InvalidArgument
 from devito.ir.equations import DummyEq
 from devito.ir.iet import (Call, Expression, Iteration, Conditional, FindNodes,
-                           FindSymbols, iet_analyze, retrieve_iteration_tree)
+                           FindSymbols, List, Section, PARALLEL, iet_analyze,
+                           retrieve_iteration_tree)
 from devito.tools import as_tuple
-from unittest.mock import patch
+from devito.types import Symbol
+from unittest.mock import PropertyMock, patch
+from examples.seismic.acoustic import acoustic_setup
 
 pytestmark = skipif(['yask', 'ops'])
 
@@ -410,6 +414,178 @@ class TestNodeParallelism(object):
         assert not iterations[3].is_Affine
         assert 'schedule(static)' in iterations[3].pragmas[0].value
 
+    def test_reductions(self):
+        grid = Grid(shape=(8, 8))
+
+        i = Dimension(name='i')
+        n = Function(name='n', shape=(1,), dimensions=(i,))
+        f = Function(name='f', grid=grid)
+
+        op = Operator(Inc(n[0], f*f), dle='openmp')
+
+        iterations = FindNodes(Iteration).visit(op)
+        assert iterations[0].is_ParallelAtomic
+        assert 'reduction(+:n[0:1])' in iterations[0].pragmas[0].value
+        assert 'omp atomic' not in str(op)
+
+    def test_atomics_if_not_reduction(self):
+        grid = Grid(shape=(8, 8))
+
+        f = Function(name='f', grid=grid)
+        sf = SparseFunction(name='sf', grid=grid, npoint=1)
+
+        op = Operator(sf.inject(field=f, expr=sf), dle='openmp')
+
+        iterations = [i for i in FindNodes(Iteration).visit(op) if i.pragmas]
+        assert iterations[0].is_ParallelAtomic
+        assert 'reduction' not in iterations[0].pragmas[0].value
+        assert 'omp atomic' in str(op)
+
+    def test_reduction_result(self):
+        grid = Grid(shape=(17, 17, 17))
+
+        i = Dimension(name='i')
+        n = Function(name='n', shape=(1,), dimensions=(i,))
+        f = Function(name='f', grid=grid)
+        f.data[:] = 2.
+
+        op = Operator(Inc(n[0], f), dle='openmp')
+        op.apply(nthreads=4)
+
+        assert n.data[0] == 2.*17**3
+
+    def test_reduction_no_array_sections(self):
+        grid = Grid(shape=(17, 17, 17))
+
+        i = Dimension(name='i')
+        n = Function(name='n', shape=(2,), dimensions=(i,))
+        f = Function(name='f', grid=grid)
+        f.data[:] = 2.
+
+        # E.g., gcc<6 doesn't support reductions over array sections, so the
+        # reductions are carried out over scalars
+        with patch('devito.dle.parallelizer.array_reductions', return_value=False):
+            op = Operator([Inc(n[0], f), Inc(n[1], f*f)], dle='openmp')
+
+        iterations = FindNodes(Iteration).visit(op)
+        assert 'reduction(+:red0,red1)' in iterations[0].pragmas[0].value
+        assert 'n[0] += red0;' in str(op)
+        assert 'omp atomic' not in str(op)
+
+        op.apply(nthreads=4)
+
+        assert np.all(n.data == [2.*17**3, 4.*17**3])
+
+    def test_reduction_no_array_sections_w_dse(self):
+        grid = Grid(shape=(17, 17, 17))
+
+        i = Dimension(name='i')
+        n = Function(name='n', shape=(1,), dimensions=(i,))
+        f = Function(name='f', grid=grid)
+        f.data[:] = 2.
+        c = Constant(name='c', value=0.5)
+
+        # The DSE introduces its own temporaries, which must not clash with
+        # the reduction accumulators
+        eq = Inc(n[0], f*(c*c + sin(c)) + f*f*(c*c + sin(c)))
+        with patch('devito.dle.parallelizer.array_reductions', return_value=False):
+            op = Operator(eq, dse='advanced', dle='openmp')
+
+        assert any(e.write.name.startswith('r') and e.write.name[1:].isdigit()
+                   for e in FindNodes(Expression).visit(op))
+
+        op.apply(nthreads=4)
+
+        assert np.isclose(n.data[0], 6.*(0.5**2 + np.sin(0.5))*17**3, rtol=1e-4)
+
+    def test_independent_parregions(self):
+        grid = Grid(shape=(16, 16))
+
+        f = Function(name='f', grid=grid)
+        g = Function(name='g', grid=grid)
+        h = Function(name='h', grid=grid)
+        h.data[:] = 1.
+
+        op = Operator([Eq(f, h + 1), Eq(g, h + 2, subdomain=grid.interior)],
+                      dle='openmp')
+
+        # A single parallel region, with no barrier after the first loop nest
+        assert str(op).count('omp parallel') == 1
+        iterations = [i for i in FindNodes(Iteration).visit(op) if i.ncollapsed]
+        assert len(iterations) == 2
+        assert iterations[0].pragmas[0].value.endswith('nowait')
+        assert not iterations[1].pragmas[0].value.endswith('nowait')
+
+        op.apply(nthreads=2)
+        assert np.all(f.data == 2.)
+        assert np.all(g.data[1:-1, 1:-1] == 3.)
+        assert np.all(g.data[0] == 0.)
+
+    @switchconfig(openmp=True)
+    def test_independent_parregions_across_sections(self):
+        kwargs = dict(shape=(20, 20, 20), spacing=(10., 10., 10.), nbpml=4,
+                      tn=20., space_order=4)
+
+        solver = acoustic_setup(dle=('advanced', {'openmp': False}), **kwargs)
+        rec0, u0, _ = solver.forward(save=False)
+
+        solver = acoustic_setup(**kwargs)
+        op = solver.op_fwd(save=False)
+        rec1, u1, summary = solver.forward(save=False)
+
+        # The source injection and the receiver interpolation, each in its
+        # own Section, share a single parallel region (the stencil is
+        # parallelized within the blocked functions), so there is one
+        # `omp parallel` rather than two in the time loop
+        parregions = FindNodes(ParallelRegion).visit(op)
+        assert len(parregions) == 1
+        sections = FindNodes(Section).visit(parregions[0])
+        assert len(sections) == 2
+        assert all(i.name in [k.name for k in summary] for i in sections)
+        assert str(op).count('omp master') == 2
+
+        assert np.allclose(rec0.data, rec1.data, atol=1e-5)
+        assert np.allclose(u0.data, u1.data, atol=1e-5)
+
+    def test_independent_parregions_guarded(self):
+        grid = Grid(shape=(16,))
+        x, = grid.dimensions
+
+        f = Function(name='f', grid=grid)
+        g = Function(name='g', grid=grid)
+        h = Function(name='h', grid=grid)
+
+        # Loop nests with symbolic steps are guarded against 0-valued steps
+        s0 = Symbol(name='s0')
+        s1 = Symbol(name='s1')
+        iterations = [Iteration(Expression(DummyEq(f[x], h[x] + 1)), x,
+                                (x.symbolic_min, x.symbolic_max, s0),
+                                properties=PARALLEL),
+                      Iteration(Expression(DummyEq(g[x], h[x] + 2)), x,
+                                (x.symbolic_min, x.symbolic_max, s1),
+                                properties=PARALLEL)]
+        iet, _ = Ompizer().make_parallel(List(body=iterations))
+
+        parregions = FindNodes(ParallelRegion).visit(iet)
+        assert len(parregions) == 1
+        conds = FindNodes(Conditional).visit(parregions[0])
+        assert [str(i.condition) for i in conds] == ['Ne(s0, 0)', 'Ne(s1, 0)']
+        assert 'return' not in str(iet)
+
+    def test_dependent_parregions(self):
+        grid = Grid(shape=(16, 16))
+        x, y = grid.dimensions
+
+        f = Function(name='f', grid=grid)
+        g = Function(name='g', grid=grid)
+        h = Function(name='h', grid=grid)
+
+        op = Operator([Eq(f, h + 1), Eq(g, f[x+1, y] + 2, subdomain=grid.interior)],
+                      dle='openmp')
+
+        assert str(op).count('omp parallel') == 2
+        assert 'nowait' not in str(op)
+
 
 class TestNestedParallelism(object):
 
@@ -540,6 +716,45 @@ def test_minimize_reminders_due_to_autopadding():
     assert np.all(u.data == exp)
 
 
+@pytest.mark.parametrize('shape,expected', [
+    ((8, 8, 8), None),
+    ((64, 64, 64), 'vector nontemporal(u,usave)')
+])
+@switchconfig(platform='skx')
+@patch("devito.archinfo.Platform.llc_size", new_callable=PropertyMock,
+       return_value=2**20)
+def test_nontemporal_stores(llc_size, shape, expected):
+    """
+    Check that nontemporal stores are only used for the Functions written but
+    not read back within a loop nest whose working set exceeds the LLC size.
+    """
+    grid = Grid(shape=shape)
+
+    f = Function(name='f', grid=grid)
+    u = TimeFunction(name='u', grid=grid, space_order=4)
+    usave = TimeFunction(name='usave', grid=grid, save=10)
+
+    eqns = [Eq(u.forward, u.laplace + u*f),
+            Eq(usave, u),
+            Eq(f, f + 1)]
+
+    lang = Intel64Rewriter.lang_intel_common
+    with patch.object(Intel64Rewriter, '_backend_compiler_pragma',
+                      lambda self, name, default=None: lang.get(name, default)):
+        op = Operator(eqns, dle='advanced')
+
+    pragmas = [j.value for i in FindNodes(Iteration).visit(op) for j in i.pragmas]
+    pragmas += [j.value for v in op._func_table.values()
+                for i in FindNodes(Iteration).visit(v.root) for j in i.pragmas]
+    ntstores = [i for i in pragmas if i.startswith('vector nontemporal')]
+    if expected is None:
+        assert len(ntstores) == 0
+        assert '_mm_sfence' not in str(op)
+    else:
+        assert ntstores == [expected]
+        assert '_mm_sfence' in str(op)
+
+
 @pytest.mark.parametrize("shape", [(41,), (20, 33), (45, 31, 45)])
 def test_composite_transformation(shape):
     wo_blocking, _ = _new_operator1(shape, dle='noop')
@@ -1,3 +1,5 @@
+import tempfile
+
 import numpy as np
 import pytest
 from numpy import linalg
@@ -6,6 +8,7 @@ from conftest import skipif
 from devito import Function, info, clear_cache
 from examples.seismic.acoustic.acoustic_example import smooth, acoustic_setup as setup
 from examples.seismic import Receiver
+from examples.checkpointing.snapshots import SnapshotStore, DiskSnapshotStore
 
 pytestmark = skipif(['yask', 'ops'])
 
@@ -61,6 +64,53 @@ class TestGradient(object):
         gradient2, _ = wave.gradient(residual, u0, vp=v0, checkpointing=False)
         assert np.allclose(gradient.data, gradient2.data)
 
+    @pytest.mark.parametrize('space_order', [4])
+    @pytest.mark.parametrize('kernel', ['OT2'])
+    @pytest.mark.parametrize('shape', [(70, 80)])
+    @pytest.mark.parametrize('storage', ['memory', 'disk', 'disk-owned'])
+    def test_gradient_snapshots(self, shape, kernel, space_order, storage, tmpdir,
+                                monkeypatch):
+        """
+        This test ensures that the FWI gradient computed with the forward wavefield
+        stored in compressed form, or streamed to disk, matches the one computed
+        with the full wavefield.
+        """
+        spacing = tuple(10. for _ in shape)
+        wave = setup(shape=shape, spacing=spacing, dtype=np.float64,
+                     kernel=kernel, space_order=space_order,
+                     nbpml=40)
+
+        v0 = Function(name='v0', grid=wave.model.grid, space_order=space_order)
+        smooth(v0, wave.model.vp)
+
+        rec, u, _ = wave.forward()
+        rec0, u0, _ = wave.forward(vp=v0, save=True)
+
+        residual = Receiver(name='rec', grid=wave.model.grid, data=rec0.data - rec.data,
+                            time_range=wave.geometry.time_axis,
+                            coordinates=wave.geometry.rec_positions)
+
+        if storage == 'memory':
+            store = SnapshotStore('lossless')
+        elif storage == 'disk':
+            store = DiskSnapshotStore(path=str(tmpdir))
+        else:
+            # A new store, removed by `gradient` upon return
+            monkeypatch.setattr(tempfile, 'tempdir', str(tmpdir))
+            store = 'disk'
+        gradient, _ = wave.gradient(residual, u0, vp=v0, store=store)
+        gradient2, _ = wave.gradient(residual, u0, vp=v0, checkpointing=False)
+        assert np.allclose(gradient.data, gradient2.data)
+        if storage == 'memory':
+            assert len(store) == wave.geometry.nt
+            assert store.ratio > 1
+        elif storage == 'disk':
+            assert len(store) == wave.geometry.nt
+            store.close()
+            assert len(tmpdir.listdir()) == wave.geometry.nt
+        else:
+            assert not tmpdir.listdir()
+
     @pytest.mark.parametrize('space_order', [4])
     @pytest.mark.parametrize('kernel', ['OT2'])
     @pytest.mark.parametrize('shape', [(70, 80)])
@@ -7,8 +7,13 @@ from devito import (Grid, Constant, Function, TimeFunction, SparseFunction,
                     SparseTimeFunction, Dimension, ConditionalDimension,
                     SubDimension, Eq, Inc, NODE, Operator, norm, inner, switchconfig)
 from devito.data import LEFT, RIGHT
-from devito.ir.iet import Call, Conditional, Iteration, FindNodes, retrieve_iteration_tree
+from devito.dle.parallelizer import ParallelRegion
+from devito.exceptions import InvalidArgument
+from devito.ir.iet import (Call, Conditional, Increment, Iteration, FindNodes,
+                           retrieve_iteration_tree)
 from devito.mpi import MPI
+from devito.mpi.distributed import balanced_splits, compute_dims, cost_from_summary
+from devito.profiling import PerformanceSummary
 from examples.seismic.acoustic import acoustic_setup
 
 pytestmark = skipif(['yask', 'ops', 'nompi'])
@@ -46,6 +51,80 @@ class TestDistributor(object):
         }
         assert f.shape == expected[distributor.nprocs][distributor.myrank]
 
+    @pytest.mark.parametrize('nprocs,shape,kwargs,expected', [
+        (64, (400, 400, 400), {}, (4, 4, 4)),
+        (64, (2000, 2000, 400), {}, (8, 8, 1)),
+        (4, (21, 31, 21), {}, (2, 2, 1)),
+        (12, (100, 100, 100), {'halo': (4, 4, 1)}, (2, 1, 6)),
+        (64, (400, 400, 400), {'topology': ('*', '*', 1)}, (8, 8, 1)),
+        (8, (400, 400, 400), {'topology': (1, '*', '*')}, (1, 4, 2)),
+        (3, (1, 1), {}, (3, 1)),
+    ])
+    def test_compute_dims(self, nprocs, shape, kwargs, expected):
+        assert compute_dims(nprocs, len(shape), shape=shape, **kwargs) == expected
+
+    @pytest.mark.parallel(mode=4)
+    def test_custom_topology(self):
+        grid = Grid(shape=(16, 16, 4), topology=('*', 1, '*'))
+        f = Function(name='f', grid=grid)
+
+        assert grid.distributor.topology == (4, 1, 1)
+        assert f.shape == (4, 16, 4)
+
+        with pytest.raises(ValueError):
+            Grid(shape=(16, 16, 4), topology=(3, '*', '*'))
+
+    @pytest.mark.parametrize('cost,topology,expected', [
+        (np.ones(12), (4,), ([3, 6, 9],)),
+        ([1, 1, 1, 1, 4, 4], (3,), ([4, 5],)),
+        (([1, 1, 1, 1, 4, 4], [1, 1, 1, 1]), (2, 2), ([4], [2])),
+        (np.pad(np.ones((2, 2)), 3, constant_values=10), (2, 3), ([4], [3, 5])),
+        ([0, 0, 0, 9], (3,), ([2, 3],)),
+    ])
+    def test_balanced_splits(self, cost, topology, expected):
+        assert balanced_splits(cost, topology) == expected
+
+    @pytest.mark.parallel(mode=4)
+    def test_custom_splits(self):
+        grid = Grid(shape=(12, 8), splits=([3], None))
+        f = Function(name='f', grid=grid)
+
+        distributor = grid.distributor
+        assert distributor.topology == (2, 2)
+        expected = [(3, 4), (3, 4), (9, 4), (9, 4)]
+        assert f.shape == expected[distributor.myrank]
+
+        # Load balance based on the timings of a (fake) previous run, in which
+        # the ranks at the top have been 3 times slower than the others
+        summary = PerformanceSummary()
+        for rank in range(distributor.nprocs):
+            summary.add('section0', rank, 3. if distributor.all_coords[rank][0] == 0
+                        else 1.)
+        cost = cost_from_summary(summary, distributor)
+        assert np.allclose(cost[0], [2.]*3 + [2/9]*9)
+        assert np.allclose(cost[1], [1.]*8)
+        assert balanced_splits(cost, distributor.topology) == ([2], [4])
+
+        with pytest.raises(ValueError):
+            Grid(shape=(12, 8), splits=([3, 2], None))
+        with pytest.raises(ValueError):
+            Grid(shape=(12, 8), splits=([3], None), topology=(4, 1))
+
+    @pytest.mark.parallel(mode=4)
+    def test_custom_splits_stencil(self):
+        grids = [Grid(shape=(12, 12), extent=(11., 11.), splits=i)
+                 for i in [None, ([2], [8]), ([7], None)]]
+
+        norms = []
+        for grid in grids:
+            u = TimeFunction(name='u', grid=grid, space_order=2)
+            u.data[0, 4:8, 4:8] = 1.
+            op = Operator(Eq(u.forward, u + 0.1*u.laplace))
+            op.apply(time_M=5)
+            norms.append(norm(u))
+
+        assert np.allclose(norms, norms[0], rtol=1e-6)
+
     @pytest.mark.parallel(mode=9)
     def test_neighborhood_horizontal_2d(self):
         grid = Grid(shape=(3, 3))
@@ -402,6 +481,44 @@ class TestSparseFunction(object):
         assert len(sf.data) == 1
         assert np.all(sf.data == data[sf.local_indices]*2)
 
+    @pytest.mark.parallel(mode=4)
+    def test_scatter_gather_plan(self):
+        """
+        Test that the plan to scatter/gather the sparse data is only recomputed
+        once the sparse points move to a different grid cell.
+        """
+        grid = Grid(shape=(4, 4), extent=(4.0, 4.0))
+        myrank = grid.distributor.myrank
+
+        data = np.array([3, 2, 1, 0])
+        coords = np.array([(3., 3.), (3., 1.), (1., 3.), (1., 1.)])
+        sf = SparseFunction(name='sf', grid=grid, npoint=len(coords), coordinates=coords)
+        sf.data[:] = data
+
+        loc_data = sf._dist_scatter()[sf]
+        alltoall = sf._dist_alltoall
+        assert loc_data[0] == myrank
+
+        # Same plan, and same buffers
+        assert sf._dist_scatter()[sf] is loc_data
+        assert sf._dist_alltoall is alltoall
+
+        # The sparse points move, but within the same grid cells
+        sf.coordinates.data[:] = coords + 0.25
+        assert sf._dist_scatter()[sf] is loc_data
+        assert sf._dist_alltoall is alltoall
+        assert loc_data[0] == myrank
+
+        # Now each sparse point moves to the domain of the MPI rank owning it
+        sf.coordinates.data[:] = coords[::-1]
+        loc_data = sf._dist_scatter()[sf]
+        assert sf._dist_alltoall is not alltoall
+        assert loc_data[0] == data[myrank]
+
+        # The plan is up-to-date even if accessed without scattering first
+        sf.coordinates.data[:] = coords
+        assert sf._dist_datamap == {3 - myrank: [0]}
+
     @pytest.mark.parallel(mode=4)
     def test_sparse_coords(self):
         grid = Grid(shape=(21, 31, 21), extent=(20, 30, 20))
@@ -491,7 +608,8 @@ class TestOperatorSimple(object):
             assert np.all(f.data_ro_domain[-1, :-time_M] == 31.)
 
     @pytest.mark.parallel(mode=[(4, 'basic'), (4, 'diag'), (4, 'overlap'),
-                                (4, 'overlap2'), (4, 'full')])
+                                (4, 'overlap2'), (4, 'full'), (4, 'progress'),
+                                (4, 'persistent'), (4, 'deep')])
     def test_trivial_eq_2d(self):
         grid = Grid(shape=(8, 8,))
         x, y = grid.dimensions
@@ -527,7 +645,7 @@ class TestOperatorSimple(object):
             assert np.all(f.data_ro_domain[0, -1:, :-1] == side)
 
     @pytest.mark.parallel(mode=[(8, 'basic'), (8, 'diag'), (8, 'overlap'),
-                                (8, 'overlap2'), (8, 'full')])
+                                (8, 'overlap2'), (8, 'full'), (8, 'progress')])
     def test_trivial_eq_3d(self):
         grid = Grid(shape=(8, 8, 8))
         x, y, z = grid.dimensions
@@ -841,6 +959,117 @@ class TestCodeGeneration(object):
         assert call.name == 'pokempi0'
         assert call.arguments[0].name == 'msg0'
 
+    @pytest.mark.parallel(mode=[(1, 'progress')])
+    @switchconfig(openmp=True)
+    def test_progress_threads(self):
+        grid = Grid(shape=(4, 4))
+        x, y = grid.dimensions
+        t = grid.stepping_dim
+
+        f = TimeFunction(name='f', grid=grid)
+
+        eqn = Eq(f.forward, f[t, x-1, y] + f[t, x+1, y] + f[t, x, y-1] + f[t, x, y+1])
+        op = Operator(eqn)
+
+        # No MPI_Test pokes, as the halo exchange is driven by reserved threads
+        assert 'pokempi0' not in op._func_table
+        assert 'nthreads_comm' in [i.name for i in op.parameters]
+
+        # The master thread starts and completes the halo exchange, while
+        # the other threads compute over the CORE region
+        conds = [i for i in FindNodes(Conditional).visit(op)
+                 if str(i.condition) == 'Eq(omp_get_thread_num(), 0)']
+        assert len(conds) == 1
+        calls = FindNodes(Call).visit(conds[0].then_body)
+        assert [i.name for i in calls] == ['haloupdate0', 'compute0', 'halowait0']
+        assert calls[0].arguments[-1].name == 'nthreads_comm'
+        assert str(calls[1].arguments[-1]) == 'nthreads - nthreads_comm'
+        calls = FindNodes(Call).visit(conds[0].else_body)
+        assert [i.name for i in calls] == ['compute0']
+
+        # Nested parallelism is enabled only around the overlap, and the
+        # previous setting is restored afterwards
+        calls = [i for i in FindNodes(Call).visit(op)
+                 if i.name == 'omp_set_max_active_levels']
+        assert len(calls) == 2
+        assert calls[1].arguments[0].name == 'maxlevels'
+
+        with pytest.raises(InvalidArgument):
+            op.apply(time_M=1, nthreads_comm=0)
+
+    @pytest.mark.parallel(mode=1)
+    @switchconfig(profiling='advanced')
+    def test_halo_exchange_stats(self):
+        grid = Grid(shape=(4, 4))
+
+        f = TimeFunction(name='f', grid=grid)
+        g = TimeFunction(name='g', grid=grid)
+
+        op = Operator([Eq(f.forward, f.dx + 1), Eq(g.forward, g.dy + f)])
+
+        # Each Function gets its own entries
+        calls = [i for i in FindNodes(Call).visit(op) if i.name.startswith('haloupdate')]
+        assert len(calls) == 2
+        assert '&(mpiprofile[0])' in [str(i) for i in calls[0].arguments]
+        assert '&(mpiprofile[4])' in [str(i) for i in calls[1].arguments]
+        assert 'mpiprofile' in [i.name for i in op.parameters]
+        assert 'MPI_Wtime()' in str(op._func_table['sendrecv_txy'].root)
+
+        # Bytes sent, pack, wait and unpack times
+        incs = FindNodes(Increment).visit(op._func_table['sendrecv_txy'].root)
+        assert len(incs) == 4
+        assert all(i.write.name == 'mpiprofile' for i in incs)
+
+    @pytest.mark.parallel(mode=1)
+    def test_halo_copy_flattened(self):
+        grid = Grid(shape=(4, 4, 4))
+
+        f = TimeFunction(name='f', grid=grid)
+
+        op = Operator(Eq(f.forward, f.dx + 1))
+
+        for name in ['gather_txyz', 'scatter_txyz']:
+            efunc = op._func_table[name].root
+            # A single Iteration over all rows, each of which is copied through
+            # either `memcpy` or the innermost Iteration
+            trees = retrieve_iteration_tree(efunc)
+            assert len(trees) == 2
+            assert len(trees[0]) == 1
+            assert trees[0].root is trees[1].root
+            assert trees[1].root.dim.name == 'row'
+            assert trees[1].root.is_Parallel
+            assert trees[1].inner.dim is grid.dimensions[-1]
+            assert trees[1].inner.is_Vectorizable
+            calls = FindNodes(Call).visit(efunc)
+            assert len(calls) == 1
+            assert calls[0].name == 'memcpy'
+            assert len(FindNodes(Conditional).visit(efunc)) == 1
+
+    @pytest.mark.parallel(mode=[(1, 'overlap2'), (1, 'persistent')])
+    @switchconfig(openmp=True)
+    def test_halo_copy_batched(self):
+        grid = Grid(shape=(4, 4, 4))
+
+        f = TimeFunction(name='f', grid=grid)
+
+        op = Operator(Eq(f.forward, f.dx + 1))
+
+        # The rows are shared among the threads of the caller's parallel region
+        for name in ['gather_0', 'scatter_0']:
+            efunc = op._func_table[name].root
+            assert 'omp parallel' not in str(efunc)
+            iterations = FindNodes(Iteration).visit(efunc)
+            assert iterations[0].is_Orphaned
+            assert iterations[0].pragmas[0].value.endswith('nowait')
+            assert 'nthreads' not in [i.name for i in efunc.parameters]
+
+        # All messages are packed within a single parallel region, while the
+        # MPI calls are issued outside of it
+        parregions = FindNodes(ParallelRegion).visit(op._func_table['haloupdate0'])
+        calls = [[j.name for j in FindNodes(Call).visit(i)] for i in parregions]
+        assert len([i for i in calls if 'gather_0' in i]) == 1
+        assert all(not j.startswith('MPI_') for i in calls for j in i)
+
 
 class TestOperatorAdvanced(object):
 
@@ -875,6 +1104,26 @@ class TestOperatorAdvanced(object):
 
         assert np.all(f.data == 1.25)
 
+    @pytest.mark.parallel(mode=4)
+    def test_injection_multiple_applies(self):
+        """
+        Test that the injected values are up-to-date across multiple applies,
+        as the sparse data is scattered upon each of them.
+        """
+        grid = Grid(shape=(4, 4), extent=(3.0, 3.0))
+
+        f = Function(name='f', grid=grid, space_order=0)
+        coords = np.array([(0.5, 0.5), (0.5, 2.5), (2.5, 0.5), (2.5, 2.5)])
+        sf = SparseFunction(name='sf', grid=grid, npoint=len(coords), coordinates=coords)
+
+        op = Operator(sf.inject(field=f, expr=sf + 1))
+
+        for i in range(3):
+            f.data[:] = 0.
+            sf.data[:] = 4.*i
+            op.apply()
+            assert np.all(f.data == (4.*i + 1)/4)
+
     @pytest.mark.parallel(mode=4)
     def test_injection_wodup_wtime(self):
         """
@@ -1275,7 +1524,8 @@ class TestOperatorAdvanced(object):
         if not glb_pos_map[x] and not glb_pos_map[y]:
             assert np.all(u.data_ro_domain[1] == 3)
 
-    @pytest.mark.parallel(mode=[(4, 'basic'), (4, 'overlap'), (4, 'full', True)])
+    @pytest.mark.parallel(mode=[(4, 'basic'), (4, 'overlap'), (4, 'full', True),
+                                (4, 'persistent'), (4, 'deep')])
     def test_coupled_eqs_mixed_dims(self):
         """
         Test an Operator that computes coupled equations over partly disjoint sets
@@ -1449,6 +1699,97 @@ class TestOperatorAdvanced(object):
         assert np.isclose(norm(uxx), 60904.192, rtol=1.e-4)
         assert np.isclose(norm(uxy), 58555.359, rtol=1.e-4)
 
+    @pytest.mark.parallel(mode=[(4, 'deep')])
+    @switchconfig(halo_depth=2)
+    def test_deep_halo(self):
+        """
+        Test that exchanging deep halos once every few timesteps, and recomputing
+        the halo values locally in between, gives the same result as exchanging
+        them at every timestep.
+        """
+        grid = Grid(shape=(12, 12), extent=(11., 11.))
+
+        u = TimeFunction(name='u', grid=grid, space_order=2)
+        m = Function(name='m', grid=grid, space_order=2)
+        m.data[:] = 0.1
+
+        op = Operator(Eq(u.forward, u + m*u.laplace))
+
+        # The halo is 4 points deep, while the stencil reach is 1 point
+        assert op.halo_period.max_value == 4
+        assert op.halo_period.data == 4
+        # The halo exchange of `u` is performed at the beginning of each period
+        conditionals = [i for i in FindNodes(Conditional).visit(op)
+                        if FindNodes(Call).visit(i)]
+        assert len(conditionals) == 1
+        assert len(FindNodes(Call).visit(conditionals[0])) == 1
+
+        for halo_period in range(1, 5):
+            u.data[:] = 0.
+            u.data[0, 4:8, 5:7] = 1.
+            op.apply(time_M=9, halo_period=halo_period)
+            if halo_period == 1:
+                expected = np.array(u.data_ro_domain[0])
+            else:
+                assert np.all(u.data_ro_domain[0] == expected)
+
+        # Expected norm computed "manually" from a sequential run
+        assert np.isclose(norm(u), 1.97172, rtol=1.e-5)
+
+        # The halo isn't deep enough
+        with pytest.raises(InvalidArgument):
+            op.apply(time_M=9, halo_period=5)
+
+    @pytest.mark.parallel(mode=[(4, 'progress')])
+    @switchconfig(openmp=True)
+    def test_progress_threads(self):
+        grid = Grid(shape=(12, 12), extent=(11., 11.))
+
+        u = TimeFunction(name='u', grid=grid, space_order=2)
+
+        op = Operator(Eq(u.forward, u + 0.1*u.laplace))
+
+        # With a single thread, there are no threads left to drive the halo
+        # exchange, so the CORE region computation isn't overlapped
+        norms = []
+        for nthreads, nthreads_comm in [(1, 1), (2, 1), (3, 1), (3, 2)]:
+            u.data[:] = 0.
+            u.data[0, 4:8, 4:8] = 1.
+            op.apply(time_M=5, nthreads=nthreads, nthreads_comm=nthreads_comm)
+            norms.append(norm(u))
+
+        assert np.allclose(norms, norms[0], rtol=1e-6)
+
+    @pytest.mark.parallel(mode=[(4, 'basic'), (4, 'overlap2')])
+    @switchconfig(profiling='advanced')
+    def test_halo_exchange_stats(self):
+        grid = Grid(shape=(12, 12))
+
+        u = TimeFunction(name='u', grid=grid, space_order=2)
+        v = TimeFunction(name='v', grid=grid, space_order=2)
+
+        op = Operator([Eq(u.forward, u.laplace + 1), Eq(v.forward, v.laplace + u)])
+        summary = op.apply(time_M=4)
+
+        # In a 2x2 topology, each rank only talks to its two face neighbours
+        nbytes = summary.comm_matrix()
+        mask = np.array([[0, 1, 1, 0], [1, 0, 0, 1], [1, 0, 0, 1], [0, 1, 1, 0]])
+        assert np.all(nbytes[mask == 1] > 0)
+        assert np.all(nbytes[mask == 0] == 0)
+        assert np.all(nbytes == nbytes.T)
+        assert np.all(summary.comm_matrix(name='u') == summary.comm_matrix(name='v'))
+        assert np.all(summary.comm_matrix(name='u') + summary.comm_matrix(name='v') ==
+                      nbytes)
+
+        for metric in ['pack', 'unpack', 'wait']:
+            times = summary.comm_matrix(metric)
+            assert np.all(times[mask == 0] == 0)
+            assert np.all(times >= 0)
+
+        # The statistics are reset at each run
+        summary2 = op.apply(time_M=4)
+        assert np.all(summary2.comm_matrix() == nbytes)
+
 
 class TestIsotropicAcoustic(object):
 
@@ -1511,7 +1852,8 @@ class TestIsotropicAcoustic(object):
         ((60, 70, 80), 'OT2', 12, 10, False, 151.6396, 205.9027, 27484.635, 11736.917)
     ])
     @pytest.mark.parallel(mode=[(4, 'basic'), (4, 'diag', True), (4, 'overlap', True),
-                                (4, 'overlap2', True), (4, 'full', True)])
+                                (4, 'overlap2', True), (4, 'full', True),
+                                (4, 'progress', True), (4, 'persistent')])
     def test_adjoint_F(self, shape, kernel, space_order, nbpml, save,
                        Eu, Erec, Ev, Esrca):
         self.run_adjoint_F(shape, kernel, space_order, nbpml, save, Eu, Erec, Ev, Esrca)
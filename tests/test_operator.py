@@ -1,15 +1,17 @@
 import numpy as np
 import pytest
+from sympy import cos, sin
 
 from conftest import skipif, EVAL, time, x, y, z
 from devito import (clear_cache, Grid, Eq, Operator, Constant, Function, TimeFunction,
                     SparseFunction, SparseTimeFunction, Dimension, error, SpaceDimension,
                     NODE, CELL, configuration)
+from devito.exceptions import InvalidArgument
 from devito.ir.iet import (Expression, Iteration, FindNodes, IsPerfectIteration,
-                           retrieve_iteration_tree)
+                           FindSymbols, retrieve_iteration_tree)
 from devito.ir.support import Any, Backward, Forward
 from devito.symbolics import indexify, retrieve_indexed
-from devito.tools import flatten
+from devito.tools import flatten, prod
 from devito.types import Array, Scalar
 
 pytestmark = skipif(['yask', 'ops'])
@@ -409,6 +411,20 @@ class TestAllocation(object):
         assert(np.allclose(m2.data, 0))
         assert(np.array_equal(m.data, m2.data))
 
+    @pytest.mark.parametrize('save', [None, 3])
+    def test_first_touch_timefunction(self, save):
+        grid = Grid(shape=(20, 20, 20))
+        u = TimeFunction(name='u', grid=grid, save=save, first_touch=True)
+        assert np.all(u.data_with_halo == 0)
+        assert u.data.shape[0] == (save or 2)
+
+    def test_first_touch_w_args(self):
+        grid = Grid(shape=(20, 20, 20))
+        first_touch = {'x0_blk0_size': 4, 'y0_blk0_size': 4, 'nthreads': 2,
+                       'unknown_arg': 1}
+        m = Function(name='m', grid=grid, first_touch=first_touch)
+        assert np.all(m.data_with_halo == 0)
+
     @pytest.mark.parametrize('stagg, ndim', [
         (NODE, 2), (y, 2), (x, 2), (CELL, 2),
         (NODE, 3), (x, 3), (y, 3), (z, 3),
@@ -963,6 +979,81 @@ class TestArguments(object):
         except:
             assert False
 
+    def test_specialize(self):
+        """
+        Test that a specialized Operator bakes bounds, strides and spacing
+        into the generated code, and that it rejects incompatible arguments.
+        """
+        grid = Grid(shape=(10, 10))
+        u = TimeFunction(name='u', grid=grid, space_order=2)
+        eq = Eq(u.forward, u.laplace + 1.)
+
+        op0 = Operator(eq)
+        op1 = Operator(eq, specialize=True)
+
+        assert op0._soname != op1._soname
+        assert 'x_M' not in [i.name for i in op1.parameters]
+        assert 'h_x' not in [i.name for i in op1.parameters]
+        assert '(float (*)[%d][%d])' % u.shape_allocated[1:] in str(op1)
+
+        u.data[:] = 1.
+        op0.apply(time_M=2)
+        expected = u.data.copy()
+        u.data[:] = 1.
+        op1.apply(time_M=2)
+        assert np.allclose(u.data, expected)
+
+        with pytest.raises(InvalidArgument):
+            op1.apply(time_M=2, x_M=5)
+        u1 = TimeFunction(name='u', grid=Grid(shape=(12, 12)), space_order=2)
+        with pytest.raises(InvalidArgument):
+            op1.apply(time_M=2, u=u1)
+
+    def test_estimate_memory(self):
+        """
+        Test that the memory estimate accounts for Function data, snapshots and
+        compiler-generated temporaries, without allocating any data.
+        """
+        grid = Grid(shape=(10, 10))
+        c = Function(name='c', grid=grid)
+        u = TimeFunction(name='u', grid=grid, space_order=2)
+        usave = TimeFunction(name='usave', grid=grid, save=5)
+        eqs = [Eq(u.forward, u.laplace*sin(c)*cos(c)), Eq(usave, u)]
+
+        op = Operator(eqs, dse='aggressive')
+        summary = op.estimate_memory()
+
+        def nbytes(f):
+            return prod(f.shape_allocated)*np.dtype(f.dtype).itemsize
+
+        def nbytes_temp(grid):
+            array, = [i for i in FindSymbols().visit(op) if i.is_Array]
+            shape = [s + sum(h) + sum(p)
+                     for s, h, p in zip(grid.shape, array.halo, array.padding)]
+            return prod(shape)*np.dtype(array.dtype).itemsize
+
+        assert all(f._data is None for f in [c, u, usave])
+        assert summary['functions'] == {'c': nbytes(c), 'u': nbytes(u)}
+        assert summary['snapshots'] == {'usave': nbytes(usave)}
+        assert len(summary['temporaries']) == 1
+        assert list(summary['temporaries'].values()) == [nbytes_temp(grid)]
+        assert summary['total'] == (nbytes(c) + nbytes(u) + nbytes(usave) +
+                                    nbytes_temp(grid))
+
+        # The estimate matches the data actually allocated
+        assert summary['functions'] == {f.name: f._data_allocated.nbytes
+                                        for f in [c, u]}
+        assert summary['snapshots'] == {'usave': usave._data_allocated.nbytes}
+
+        # Overrides are honored
+        c1 = Function(name='c', grid=Grid(shape=(20, 20)))
+        u1 = TimeFunction(name='u', grid=c1.grid, space_order=2)
+        usave1 = TimeFunction(name='usave', grid=c1.grid, save=5)
+        summary = op.estimate_memory(c=c1, u=u1, usave=usave1)
+        assert summary['functions'] == {'c': nbytes(c1), 'u': nbytes(u1)}
+        assert summary['snapshots'] == {'usave': nbytes(usave1)}
+        assert list(summary['temporaries'].values()) == [nbytes_temp(c1.grid)]
+
 
 class TestDeclarator(object):
 
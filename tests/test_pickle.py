@@ -1,3 +1,6 @@
+import multiprocessing
+import os
+
 import pytest
 import numpy as np
 from sympy import Symbol
@@ -5,7 +8,8 @@ import cloudpickle as pickle
 
 from conftest import skipif
 from devito import (Constant, Eq, Function, TimeFunction, SparseFunction, Grid,
-                    TimeDimension, SteppingDimension, Operator)
+                    TimeDimension, SteppingDimension, Operator, ALLOC_SHM,
+                    SharedMemoryAllocator, switchconfig)
 from devito.mpi.routines import MPIStatusObject, MPIRequestObject
 from devito.types import Symbol as dSymbol, Scalar
 from devito.profiling import Timer
@@ -46,6 +50,94 @@ def test_function():
     assert f.shape == new_f.shape
 
 
+def test_grid_legacy_state():
+    grid = Grid(shape=(4, 4))
+    state = grid.__getstate__()
+    # As pickled before `topology`, `halo` and `splits` were introduced
+    for k in ['_topology', '_halo', '_splits']:
+        state.pop(k)
+
+    new_grid = Grid.__new__(Grid)
+    new_grid.__setstate__(state)
+
+    assert new_grid.shape == grid.shape
+    assert new_grid.distributor.shape == grid.distributor.shape
+    assert pickle.loads(pickle.dumps(new_grid)).shape == grid.shape
+
+
+def _shared_sum(pkl_f):
+    f = pickle.loads(pkl_f)
+    return float(np.sum(f.data_with_halo))
+
+
+@switchconfig(first_touch=True)
+def _shared_sum_first_touch(pkl_f):
+    return _shared_sum(pkl_f)
+
+
+_shared_leaked = []
+
+
+def _shared_leak(path):
+    f = Function(name='f', grid=Grid(shape=(4, 4)),
+                 allocator=SharedMemoryAllocator(path))
+    f.data[:] = 1.
+    # Alive until the worker is terminated
+    _shared_leaked.append(f)
+    return os.getpid()
+
+
+def test_function_shared_memory():
+    if not ALLOC_SHM.available():
+        pytest.skip("Shared memory not available")
+
+    grid = Grid(shape=(100, 100))
+    f = Function(name='f', grid=grid, allocator=ALLOC_SHM)
+    f.data[:] = 1.
+
+    pkl_f = pickle.dumps(f)
+    # Only a reference to the shared memory segment has been pickled
+    assert len(pkl_f) < f.data_with_halo.nbytes
+    new_f = pickle.loads(pkl_f)
+
+    assert np.all(new_f.data == 1.)
+    assert np.sum(new_f.data_with_halo) == 100*100
+    # Same memory, different mappings
+    f.data[0, 0] = 2.
+    assert new_f.data[0, 0] == 2.
+
+    # Worker processes attach to the same memory too
+    with multiprocessing.get_context('fork').Pool(2) as pool:
+        assert pool.map(_shared_sum, [pkl_f]*2) == [100*100 + 1.]*2
+        # Attaching never initializes the data, not even through first touch
+        assert pool.map(_shared_sum_first_touch, [pkl_f]*2) == [100*100 + 1.]*2
+    assert np.sum(f.data_with_halo) == 100*100 + 1.
+
+
+def test_shared_memory_cleanup(tmpdir):
+    if not ALLOC_SHM.available():
+        pytest.skip("Shared memory not available")
+    path = str(tmpdir)
+
+    f = Function(name='f', grid=Grid(shape=(4, 4)),
+                 allocator=SharedMemoryAllocator(path))
+    f.data[:] = 2.
+
+    # The workers are terminated without freeing their data
+    with multiprocessing.get_context('fork').Pool(2) as pool:
+        pids = set(pool.map(_shared_leak, [path]*4))
+    leaked = [i.basename for i in tmpdir.listdir()]
+    assert len(leaked) == 5
+    assert {int(i.split('-')[2]) for i in leaked} == pids | {os.getpid()}
+
+    SharedMemoryAllocator.cleanup(path)
+    assert not tmpdir.listdir()
+
+    # The mapped data outlives its segment
+    assert np.all(f.data == 2.)
+    del f
+
+
 def test_sparse_function():
     grid = Grid(shape=(3,))
     sf = SparseFunction(name='sf', grid=grid, npoint=3, space_order=2,